@@ -139,6 +139,24 @@ int ipmi_sel_clear(ipmi_sel_info_t       *sel,
 		   ipmi_sel_op_done_cb_t handler,
 		   void                  *cb_data);
 
+/* Delete a set of events in one operation.  The events are checked
+   against the SEL before being deleted, as ipmi_sel_del_event()
+   does.  If they are every event in the SEL, the SEL is cleared
+   instead of deleting them one at a time.  The handler is called
+   once when all the events are done with the record ids and an error
+   for each (0 if it was deleted); err is the first error seen. */
+typedef void (*ipmi_sel_del_events_done_cb_t)(ipmi_sel_info_t *sel,
+					      void            *cb_data,
+					      int             err,
+					      unsigned int    count,
+					      unsigned int    *record_ids,
+					      int             *errs);
+int ipmi_sel_del_events(ipmi_sel_info_t               *sel,
+			ipmi_event_t                  **events,
+			unsigned int                  count,
+			ipmi_sel_del_events_done_cb_t handler,
+			void                          *cb_data);
+
 /* Get various information from the IPMI SEL info commands. */
 int ipmi_sel_get_major_version(ipmi_sel_info_t *sel, int *val);
 int ipmi_sel_get_minor_version(ipmi_sel_info_t *sel, int *val);
@@ -281,6 +281,24 @@ int ipmi_mc_del_event(ipmi_mc_t                 *mc,
 		      ipmi_mc_del_event_done_cb handler,
 		      void                      *cb_data);
 
+/* Delete a set of events as a single operation.  This is much faster
+   than deleting them one at a time, the deletes are pipelined and if
+   the events are everything in the SEL it is simply cleared.  The
+   handler is called once when all are done, with the record ids of
+   the events and an error for each one (0 if it was deleted).  err
+   is the first error that occurred, or 0 if all succeeded. */
+typedef void (*ipmi_mc_del_events_done_cb)(ipmi_mc_t    *mc,
+					   int          err,
+					   unsigned int count,
+					   unsigned int *record_ids,
+					   int          *errs,
+					   void         *cb_data);
+int ipmi_mc_del_events(ipmi_mc_t                  *mc,
+		       ipmi_event_t               **events,
+		       unsigned int               count,
+		       ipmi_mc_del_events_done_cb handler,
+		       void                       *cb_data);
+
 /* Clear out all the events in the SEL if and only if the last_event
    passed in is the last event in the SEL.  Note that use of this is
    *HIGHLY* discouraged.  This is only here for HPI support.  In
@@ -481,6 +499,10 @@ int ipmi_channel_access_setall(ipmi_channel_access_t *access);
    ceases to exist. */
 ipmi_mc_t *ipmi_sensor_get_mc(ipmi_sensor_t *sensor);
 
+/* Get the MC that the message is sent to for reading and setting the
+   control.  The same refcount rules as ipmi_sensor_get_mc() apply. */
+ipmi_mc_t *ipmi_control_get_mc(ipmi_control_t *control);
+
 
 /***********************************************************************
  *
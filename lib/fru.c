@@ -1288,6 +1288,46 @@ i_ipmi_fru_new_update_record(ipmi_fru_t   *fru,
     return 0;
 }
 
+/*
+ * The FRU type code adds an update record for each changed field, in
+ * whatever order it formats them.  Sort them and merge the ones that
+ * touch or overlap, so a run of changed fields (like the strings that
+ * move when one before them changes length) goes out in as few write
+ * commands as possible instead of one per field.
+ */
+static void
+coalesce_update_records(ipmi_fru_t *fru)
+{
+    fru_update_t *sorted = NULL, *urec, **pos;
+
+    /* Insertion sort by offset, there are only a few records. */
+    while (fru->update_recs) {
+	urec = fru->update_recs;
+	fru->update_recs = urec->next;
+	pos = &sorted;
+	while (*pos && ((*pos)->offset <= urec->offset))
+	    pos = &(*pos)->next;
+	urec->next = *pos;
+	*pos = urec;
+    }
+
+    urec = sorted;
+    while (urec && urec->next) {
+	fru_update_t *next = urec->next;
+
+	if (next->offset <= urec->offset + urec->length) {
+	    if (next->offset + next->length > urec->offset + urec->length)
+		urec->length = next->offset + next->length - urec->offset;
+	    urec->next = next->next;
+	    ipmi_mem_free(next);
+	} else
+	    urec = next;
+    }
+
+    fru->update_recs = sorted;
+    fru->update_recs_tail = urec;
+}
+
 static int next_fru_write(ipmi_domain_t *domain, ipmi_fru_t *fru);
 void write_complete(ipmi_domain_t *domain, ipmi_fru_t *fru, int err);
 
@@ -1530,6 +1570,8 @@ start_domain_fru_write(ipmi_domain_t *domain, void *cb_data)
 	return;
     }
 
+    coalesce_update_records(fru);
+
     fru_get(fru);
     fru->write_prepared = 0;
 
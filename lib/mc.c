@@ -1086,6 +1086,156 @@ ipmi_mc_sel_clear(ipmi_mc_t                 *mc,
     return rv;
 }
 
+typedef struct sel_del_events_info_s sel_del_events_info_t;
+
+typedef struct sel_del_events_oem_s
+{
+    sel_del_events_info_t *info;
+    unsigned int          idx;
+} sel_del_events_oem_t;
+
+struct sel_del_events_info_s
+{
+    ipmi_mc_t                  *mc;
+    ipmi_mc_del_events_done_cb done;
+    void                       *cb_data;
+
+    /* Only used when going through the OEM delete handler. */
+    unsigned int               count;
+    unsigned int               outstanding;
+    int                        err;
+    unsigned int               *record_ids;
+    int                        *errs;
+    sel_del_events_oem_t       *oem;
+};
+
+static void
+sel_del_events_info_free(sel_del_events_info_t *info)
+{
+    if (info->record_ids)
+	ipmi_mem_free(info->record_ids);
+    if (info->errs)
+	ipmi_mem_free(info->errs);
+    if (info->oem)
+	ipmi_mem_free(info->oem);
+    ipmi_mem_free(info);
+}
+
+static void
+sel_del_events_done(ipmi_sel_info_t *sel,
+		    void            *cb_data,
+		    int             err,
+		    unsigned int    count,
+		    unsigned int    *record_ids,
+		    int             *errs)
+{
+    sel_del_events_info_t *info = cb_data;
+
+    /* No need to refcount, the domain/mc should already be locked. */
+    if (info->done)
+        info->done(info->mc, err, count, record_ids, errs, info->cb_data);
+    sel_del_events_info_free(info);
+}
+
+static void
+sel_del_events_oem_put(sel_del_events_info_t *info)
+{
+    info->outstanding--;
+    if (info->outstanding > 0)
+	return;
+    if (info->done)
+        info->done(info->mc, info->err, info->count, info->record_ids,
+		   info->errs, info->cb_data);
+    sel_del_events_info_free(info);
+}
+
+static void
+sel_del_events_oem_done(ipmi_mc_t *mc, int err, void *cb_data)
+{
+    sel_del_events_oem_t  *oem = cb_data;
+    sel_del_events_info_t *info = oem->info;
+
+    info->errs[oem->idx] = err;
+    if (err && !info->err)
+	info->err = err;
+    sel_del_events_oem_put(info);
+}
+
+/* The OEM code only knows how to delete one event at a time, so do
+   them all and report back when the last one finishes. */
+static int
+sel_del_events_oem(sel_del_events_info_t *info,
+		   ipmi_event_t          **events,
+		   unsigned int          count)
+{
+    ipmi_mc_t    *mc = info->mc;
+    unsigned int i;
+    int          rv;
+
+    info->count = count;
+    info->record_ids = ipmi_mem_alloc(sizeof(unsigned int) * count);
+    info->errs = ipmi_mem_alloc(sizeof(int) * count);
+    info->oem = ipmi_mem_alloc(sizeof(sel_del_events_oem_t) * count);
+    if (!info->record_ids || !info->errs || !info->oem) {
+	sel_del_events_info_free(info);
+	return ENOMEM;
+    }
+
+    /* Hold a count until everything is started. */
+    info->outstanding = 1;
+    for (i=0; i<count; i++) {
+	info->record_ids[i] = ipmi_event_get_record_id(events[i]);
+	info->errs[i] = 0;
+	info->oem[i].info = info;
+	info->oem[i].idx = i;
+	info->outstanding++;
+	rv = mc->sel_del_event_handler(mc, events[i], sel_del_events_oem_done,
+				       &info->oem[i]);
+	if (rv)
+	    sel_del_events_oem_done(mc, rv, &info->oem[i]);
+    }
+    sel_del_events_oem_put(info);
+
+    return 0;
+}
+
+int
+ipmi_mc_del_events(ipmi_mc_t                  *mc,
+		   ipmi_event_t               **events,
+		   unsigned int               count,
+		   ipmi_mc_del_events_done_cb handler,
+		   void                       *cb_data)
+{
+    sel_del_events_info_t *info;
+    int                   rv;
+
+    if (!mc->devid.SEL_device_support)
+	return EINVAL;
+
+    if (count == 0)
+	return EINVAL;
+
+    info = ipmi_mem_alloc(sizeof(*info));
+    if (!info)
+	return ENOMEM;
+    memset(info, 0, sizeof(*info));
+
+    info->mc = mc;
+    info->done = handler;
+    info->cb_data = cb_data;
+
+    /* If we have an OEM handler, use it for each event. */
+    if (mc->sel_del_event_handler)
+	return sel_del_events_oem(info, events, count);
+
+    rv = ipmi_sel_del_events(mc->sel, events, count, sel_del_events_done,
+			     info);
+    if (rv)
+	sel_del_events_info_free(info);
+
+    return rv;
+}
+
 typedef struct sel_add_op_done_info_s
 {
     ipmi_mc_t                 *mc;
@@ -1993,6 +1993,818 @@ ipmi_sel_clear(ipmi_sel_info_t       *sel,
 			 cmp_event, 1);
 }
 
+/*
+ * Bulk delete.  All the given events are deleted by a single
+ * operation on the SEL's queue.  If they cover every event in the
+ * SEL, the SEL is cleared (after checking that the last event is
+ * still the last one).  Otherwise one reservation is taken and the
+ * check/delete pairs are sent for several records at once instead of
+ * waiting for each record to finish before starting the next.
+ */
+
+/* How many records may have commands outstanding at once. */
+#define MAX_BULK_DEL_IN_FLIGHT		4
+
+enum sel_bulk_del_state {
+    SEL_BULK_DEL_RESERVE,
+    SEL_BULK_DEL_CHECK,
+    SEL_BULK_DEL_DELETE,
+    SEL_BULK_DEL_CLEAR_CHECK,
+    SEL_BULK_DEL_CLEAR
+};
+
+typedef struct sel_bulk_del_s sel_bulk_del_t;
+
+typedef struct sel_bulk_del_rec_s
+{
+    sel_bulk_del_t          *bulk;
+    unsigned int            idx;
+    enum sel_bulk_del_state state;
+} sel_bulk_del_rec_t;
+
+struct sel_bulk_del_s
+{
+    ipmi_sel_info_t               *sel;
+    ipmi_sel_del_events_done_cb_t handler;
+    void                          *cb_data;
+    unsigned int                  lun;
+    unsigned int                  count;
+    ipmi_event_t                  **events;
+    sel_event_holder_t            **holders;
+    unsigned int                  *record_ids;
+    int                           *errs;
+    sel_bulk_del_rec_t            *recs;
+
+    /* Records waiting to be sent.  A record is only ever in here
+       once, so a ring of count entries is big enough. */
+    unsigned int                  *pending;
+    unsigned int                  pend_head;
+    unsigned int                  num_pending;
+
+    unsigned int                  in_flight;
+    unsigned int                  reservation;
+    unsigned int                  reserve_count;
+    int                           need_reserve;
+    int                           cancelled;
+
+    /* If true, every event in the SEL is being deleted so a clear is
+       tried first.  clear_idx is the last event in the SEL. */
+    int                           do_clear;
+    unsigned int                  clear_idx;
+
+    /* Used for the reserve and clear messages. */
+    sel_bulk_del_rec_t            op_rec;
+};
+
+static void
+bulk_del_push(sel_bulk_del_t *bulk, unsigned int idx)
+{
+    bulk->pending[(bulk->pend_head + bulk->num_pending) % bulk->count] = idx;
+    bulk->num_pending++;
+}
+
+static unsigned int
+bulk_del_pop(sel_bulk_del_t *bulk)
+{
+    unsigned int idx = bulk->pending[bulk->pend_head];
+
+    bulk->pend_head = (bulk->pend_head + 1) % bulk->count;
+    bulk->num_pending--;
+    return idx;
+}
+
+static void
+bulk_del_fail_pending(sel_bulk_del_t *bulk, int err)
+{
+    while (bulk->num_pending > 0)
+	bulk->errs[bulk_del_pop(bulk)] = err;
+}
+
+static void
+bulk_del_free(sel_bulk_del_t *bulk)
+{
+    unsigned int i;
+
+    if (bulk->events) {
+	for (i=0; i<bulk->count; i++) {
+	    if (bulk->events[i])
+		ipmi_event_free(bulk->events[i]);
+	}
+	ipmi_mem_free(bulk->events);
+    }
+    if (bulk->holders)
+	ipmi_mem_free(bulk->holders);
+    if (bulk->record_ids)
+	ipmi_mem_free(bulk->record_ids);
+    if (bulk->errs)
+	ipmi_mem_free(bulk->errs);
+    if (bulk->recs)
+	ipmi_mem_free(bulk->recs);
+    if (bulk->pending)
+	ipmi_mem_free(bulk->pending);
+    ipmi_mem_free(bulk);
+}
+
+static sel_bulk_del_t *
+bulk_del_alloc(unsigned int count)
+{
+    sel_bulk_del_t *bulk;
+
+    bulk = ipmi_mem_alloc(sizeof(*bulk));
+    if (!bulk)
+	return NULL;
+    memset(bulk, 0, sizeof(*bulk));
+    bulk->count = count;
+    bulk->events = ipmi_mem_alloc(sizeof(ipmi_event_t *) * count);
+    bulk->holders = ipmi_mem_alloc(sizeof(sel_event_holder_t *) * count);
+    bulk->record_ids = ipmi_mem_alloc(sizeof(unsigned int) * count);
+    bulk->errs = ipmi_mem_alloc(sizeof(int) * count);
+    bulk->recs = ipmi_mem_alloc(sizeof(sel_bulk_del_rec_t) * count);
+    bulk->pending = ipmi_mem_alloc(sizeof(unsigned int) * count);
+    if (!bulk->events || !bulk->holders || !bulk->record_ids || !bulk->errs
+	|| !bulk->recs || !bulk->pending)
+    {
+	if (bulk->events) {
+	    ipmi_mem_free(bulk->events);
+	    bulk->events = NULL;
+	}
+	bulk_del_free(bulk);
+	return NULL;
+    }
+    memset(bulk->events, 0, sizeof(ipmi_event_t *) * count);
+    memset(bulk->holders, 0, sizeof(sel_event_holder_t *) * count);
+    memset(bulk->errs, 0, sizeof(int) * count);
+    return bulk;
+}
+
+/* Called with the SEL lock held, it will be released. */
+static void
+bulk_del_done(sel_bulk_del_t *bulk, int do_op_done)
+{
+    ipmi_sel_info_t *sel = bulk->sel;
+    unsigned int    i;
+    int             err = 0;
+
+    for (i=0; i<bulk->count; i++) {
+	sel_event_holder_t *holder = bulk->holders[i];
+
+	if (bulk->errs[i]) {
+	    if (!err)
+		err = bulk->errs[i];
+	    if (holder && holder->deleted && !holder->cancelled) {
+		/* The event is still in the SEL, make it visible
+		   again. */
+		holder->deleted = 0;
+		sel->num_sels++;
+		sel->del_sels--;
+	    }
+	}
+	if (holder) {
+	    sel_event_holder_put(holder);
+	    bulk->holders[i] = NULL;
+	}
+    }
+
+    sel_unlock(sel);
+
+    if (bulk->handler)
+	bulk->handler(sel, bulk->cb_data, err, bulk->count,
+		      bulk->record_ids, bulk->errs);
+
+    sel_lock(sel);
+
+    if (sel->in_destroy) {
+	/* Nothing to do */
+	sel_unlock(sel);
+    } else if (sel->destroyed) {
+	/* This will unlock the lock. */
+	internal_destroy_sel(sel);
+    } else {
+	sel_unlock(sel);
+	if (do_op_done)
+	    opq_op_done(sel->opq);
+    }
+    bulk_del_free(bulk);
+}
+
+static void handle_bulk_del_rsp(ipmi_mc_t  *mc,
+				ipmi_msg_t *rsp,
+				void       *rsp_data);
+
+static int
+send_bulk_del(sel_bulk_del_rec_t *rec, ipmi_mc_t *mc)
+{
+    sel_bulk_del_t *bulk = rec->bulk;
+    unsigned char  cmd_data[MAX_IPMI_DATA_SIZE];
+    ipmi_msg_t     cmd_msg;
+    int            rv;
+
+    cmd_msg.data = cmd_data;
+    cmd_msg.netfn = IPMI_STORAGE_NETFN;
+    switch (rec->state) {
+    case SEL_BULK_DEL_RESERVE:
+	cmd_msg.cmd = IPMI_RESERVE_SEL_CMD;
+	cmd_msg.data_len = 0;
+	rv = ipmi_mc_send_command_sideeff(mc, bulk->lun, &cmd_msg,
+					  handle_bulk_del_rsp, rec);
+	break;
+
+    case SEL_BULK_DEL_CHECK:
+    case SEL_BULK_DEL_CLEAR_CHECK:
+	cmd_msg.cmd = IPMI_GET_SEL_ENTRY_CMD;
+	cmd_msg.data_len = 6;
+	ipmi_set_uint16(cmd_msg.data, 0);
+	ipmi_set_uint16(cmd_msg.data+2, bulk->record_ids[rec->idx]);
+	cmd_msg.data[4] = 0;
+	cmd_msg.data[5] = 0xff;
+	rv = ipmi_mc_send_command(mc, bulk->lun, &cmd_msg,
+				  handle_bulk_del_rsp, rec);
+	break;
+
+    case SEL_BULK_DEL_DELETE:
+	cmd_msg.cmd = IPMI_DELETE_SEL_ENTRY_CMD;
+	cmd_msg.data_len = 4;
+	ipmi_set_uint16(cmd_msg.data, bulk->reservation);
+	ipmi_set_uint16(cmd_msg.data+2, bulk->record_ids[rec->idx]);
+	rv = ipmi_mc_send_command(mc, bulk->lun, &cmd_msg,
+				  handle_bulk_del_rsp, rec);
+	break;
+
+    case SEL_BULK_DEL_CLEAR:
+	cmd_msg.cmd = IPMI_CLEAR_SEL_CMD;
+	cmd_msg.data_len = 6;
+	ipmi_set_uint16(cmd_msg.data, bulk->reservation);
+	cmd_msg.data[2] = 'C';
+	cmd_msg.data[3] = 'L';
+	cmd_msg.data[4] = 'R';
+	cmd_msg.data[5] = 0xaa;
+	rv = ipmi_mc_send_command(mc, bulk->lun, &cmd_msg,
+				  handle_bulk_del_rsp, rec);
+	break;
+
+    default:
+	rv = EINVAL;
+    }
+
+    if (!rv)
+	bulk->in_flight++;
+    return rv;
+}
+
+/*
+ * Clearing didn't work out, delete the records one at a time
+ * instead.  If the SEL can't do that, fail the remaining records.
+ */
+static void
+bulk_del_clear_fallback(sel_bulk_del_t *bulk, int err)
+{
+    bulk->do_clear = 0;
+    if (!bulk->sel->supports_delete_sel)
+	bulk_del_fail_pending(bulk, err);
+}
+
+/*
+ * Start as many records as we can and finish the operation if
+ * nothing is left.  Called with the SEL lock held, it will be
+ * released.
+ */
+static void
+bulk_del_next(sel_bulk_del_t *bulk, ipmi_mc_t *mc)
+{
+    ipmi_sel_info_t *sel = bulk->sel;
+    int             rv;
+
+    if (bulk->cancelled)
+	bulk_del_fail_pending(bulk, ECANCELED);
+
+    while (!bulk->do_clear && !bulk->need_reserve
+	   && (bulk->num_pending > 0)
+	   && (bulk->in_flight < MAX_BULK_DEL_IN_FLIGHT))
+    {
+	sel_bulk_del_rec_t *rec = bulk->recs + bulk_del_pop(bulk);
+
+	if (bulk->holders[rec->idx]->cancelled)
+	    /* Deleted by a clear, everything is ok. */
+	    continue;
+
+	rec->state = SEL_BULK_DEL_CHECK;
+	rv = send_bulk_del(rec, mc);
+	if (rv) {
+	    ipmi_log(IPMI_LOG_ERR_INFO,
+		     "%ssel.c(bulk_del_next): "
+		     "Could not send SEL get command: %x", sel->name, rv);
+	    bulk->errs[rec->idx] = rv;
+	}
+    }
+
+    if (bulk->in_flight > 0) {
+	/* Wait for the outstanding responses. */
+	sel_unlock(sel);
+	return;
+    }
+
+    if (bulk->need_reserve && (bulk->num_pending > 0)) {
+	bulk->need_reserve = 0;
+	bulk->op_rec.state = SEL_BULK_DEL_RESERVE;
+	rv = send_bulk_del(&bulk->op_rec, mc);
+	if (!rv) {
+	    sel_unlock(sel);
+	    return;
+	}
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(bulk_del_next): "
+		 "Could not send SEL reserve command: %x", sel->name, rv);
+	bulk_del_fail_pending(bulk, rv);
+    }
+
+    bulk_del_done(bulk, 1);
+}
+
+static void
+handle_bulk_del_clear_check(sel_bulk_del_t *bulk,
+			    ipmi_mc_t      *mc,
+			    ipmi_msg_t     *rsp)
+{
+    ipmi_sel_info_t *sel = bulk->sel;
+    ipmi_event_t    *ch_event;
+    ipmi_time_t     timestamp;
+    int             rv;
+
+    if (rsp->data[0] || (rsp->data_len < 19)) {
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(handle_bulk_del_clear_check): "
+		 "IPMI error from SEL check: %x", sel->name, rsp->data[0]);
+	bulk_del_clear_fallback(bulk, IPMI_IPMI_ERR_VAL(rsp->data[0]));
+	return;
+    }
+
+    if (rsp->data[5] < 0xe0)
+	timestamp = ipmi_get_uint32(rsp->data+6);
+    else
+	timestamp = -1;
+    ch_event = ipmi_event_alloc(ipmi_mc_convert_to_id(mc),
+				ipmi_get_uint16(rsp->data+3),
+				rsp->data[5],
+				timestamp,
+				rsp->data+6,
+				13);
+    if (!ch_event) {
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(handle_bulk_del_clear_check): "
+		 "Could not allocate memory", sel->name);
+	bulk_del_clear_fallback(bulk, ENOMEM);
+	return;
+    }
+
+    if ((event_cmp(ch_event, bulk->events[bulk->clear_idx]) != 0)
+	|| (ipmi_get_uint16(rsp->data+1) != 0xffff))
+    {
+	/* A new event was added after this one, the clear would lose
+	   it.  Delete the records individually. */
+	ipmi_event_free(ch_event);
+	bulk_del_clear_fallback(bulk, EAGAIN);
+	return;
+    }
+    ipmi_event_free(ch_event);
+
+    bulk->op_rec.state = SEL_BULK_DEL_CLEAR;
+    rv = send_bulk_del(&bulk->op_rec, mc);
+    if (rv) {
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(handle_bulk_del_clear_check): "
+		 "Could not send SEL clear command: %x", sel->name, rv);
+	bulk_del_clear_fallback(bulk, rv);
+    }
+}
+
+static void
+handle_bulk_del_check(sel_bulk_del_rec_t *rec,
+		      ipmi_mc_t          *mc,
+		      ipmi_msg_t         *rsp)
+{
+    sel_bulk_del_t  *bulk = rec->bulk;
+    ipmi_sel_info_t *sel = bulk->sel;
+    unsigned int    idx = rec->idx;
+    ipmi_event_t    *ch_event;
+    ipmi_time_t     timestamp;
+    int             rv;
+
+    if (rsp->data[0] == IPMI_NOT_PRESENT_CC) {
+	/* The entry is already gone, so just return no error. */
+	return;
+    } else if (rsp->data[0]) {
+	if (sel->sel_delete_errors)
+	    ipmi_domain_stat_add(sel->sel_delete_errors, 1);
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(handle_bulk_del_check): "
+		 "IPMI error from SEL check: %x", sel->name, rsp->data[0]);
+	bulk->errs[idx] = IPMI_IPMI_ERR_VAL(rsp->data[0]);
+	return;
+    }
+
+    if (rsp->data[5] < 0xe0)
+	timestamp = ipmi_get_uint32(rsp->data+6);
+    else
+	timestamp = -1;
+    ch_event = ipmi_event_alloc(ipmi_mc_convert_to_id(mc),
+				ipmi_get_uint16(rsp->data+3),
+				rsp->data[5],
+				timestamp,
+				rsp->data+6,
+				13);
+    if (!ch_event) {
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(handle_bulk_del_check): Could not allocate memory",
+		 sel->name);
+	bulk->errs[idx] = ENOMEM;
+	return;
+    }
+
+    if (event_cmp(ch_event, bulk->events[idx]) != 0) {
+	/* The event's don't match, so just finish. */
+	ipmi_event_free(ch_event);
+	return;
+    }
+    ipmi_event_free(ch_event);
+
+    if (bulk->need_reserve) {
+	/* The reservation is already known to be lost, wait for the
+	   new one. */
+	bulk_del_push(bulk, idx);
+	return;
+    }
+
+    rec->state = SEL_BULK_DEL_DELETE;
+    rv = send_bulk_del(rec, mc);
+    if (rv) {
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(handle_bulk_del_check): "
+		 "Could not send SEL delete command: %x", sel->name, rv);
+	bulk->errs[idx] = rv;
+    } else if (bulk->record_ids[idx] == sel->start_rec_id)
+	/* We are deleting our "current" record (used for finding the
+	   next record), make sure we start again from scratch on the
+	   next fetch. */
+	sel->start_rec_id = 0;
+}
+
+static void
+handle_bulk_del_delete(sel_bulk_del_rec_t *rec,
+		       ipmi_msg_t         *rsp)
+{
+    sel_bulk_del_t     *bulk = rec->bulk;
+    ipmi_sel_info_t    *sel = bulk->sel;
+    unsigned int       idx = rec->idx;
+    sel_event_holder_t *real_holder;
+    ilist_iter_t       iter;
+
+    if (rsp->data[0] == 0x80) {
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(handle_bulk_del_delete): "
+		 "Operation not supported on SEL delete",
+		 sel->name);
+	bulk->errs[idx] = ENOSYS;
+    } else if ((rsp->data[0] == 0x81)
+	       || (rsp->data[0] == IPMI_NOT_PRESENT_CC))
+    {
+	/* Being erased or already gone, either way it's deleted. */
+    } else if ((rsp->data[0] == IPMI_INVALID_RESERVATION_CC)
+	       && (bulk->need_reserve
+		   || (bulk->reserve_count < MAX_DEL_RESERVE_RETRIES)))
+    {
+	/* Lost our reservation, get a new one once everything
+	   outstanding has come back and retry the record. */
+	if (!bulk->need_reserve) {
+	    if (sel->sel_delete_lost_reservation)
+		ipmi_domain_stat_add(sel->sel_delete_lost_reservation, 1);
+	    bulk->reserve_count++;
+	    bulk->need_reserve = 1;
+	}
+	bulk_del_push(bulk, idx);
+    } else if (rsp->data[0]) {
+	if (rsp->data[0] == IPMI_INVALID_RESERVATION_CC) {
+	    if (sel->sel_fail_delete_lost_reservation)
+		ipmi_domain_stat_add(sel->sel_fail_delete_lost_reservation, 1);
+	} else {
+	    if (sel->sel_delete_errors)
+		ipmi_domain_stat_add(sel->sel_delete_errors, 1);
+	}
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(handle_bulk_del_delete): "
+		 "IPMI error from SEL delete: %x", sel->name, rsp->data[0]);
+	bulk->errs[idx] = IPMI_IPMI_ERR_VAL(rsp->data[0]);
+    } else {
+	/* We deleted the entry, so remove it from our database. */
+	ilist_init_iter(&iter, sel->events);
+	ilist_unpositioned(&iter);
+	real_holder = ilist_search_iter(&iter, recid_search_cmp,
+					&(bulk->record_ids[idx]));
+	if (real_holder) {
+	    ilist_delete(&iter);
+	    sel_event_holder_put(real_holder);
+	    sel->del_sels--;
+	}
+    }
+}
+
+static void
+handle_bulk_del_rsp(ipmi_mc_t  *mc,
+		    ipmi_msg_t *rsp,
+		    void       *rsp_data)
+{
+    sel_bulk_del_rec_t *rec = rsp_data;
+    sel_bulk_del_t     *bulk = rec->bulk;
+    ipmi_sel_info_t    *sel = bulk->sel;
+    int                rv;
+
+    sel_lock(sel);
+    bulk->in_flight--;
+    if (sel->destroyed || !mc) {
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(handle_bulk_del_rsp): "
+		 "SEL info or MC went away while SEL delete was in progress",
+		 sel->name);
+	bulk->cancelled = 1;
+	if (rec != &bulk->op_rec)
+	    bulk->errs[rec->idx] = ECANCELED;
+	goto out;
+    }
+
+    switch (rec->state) {
+    case SEL_BULK_DEL_RESERVE:
+	if (rsp->data[0] != 0) {
+	    if (sel->sel_delete_errors)
+		ipmi_domain_stat_add(sel->sel_delete_errors, 1);
+	    ipmi_log(IPMI_LOG_ERR_INFO,
+		     "%ssel.c(handle_bulk_del_rsp): "
+		     "IPMI error from SEL delete reservation: %x",
+		     sel->name, rsp->data[0]);
+	    bulk_del_fail_pending(bulk, IPMI_IPMI_ERR_VAL(rsp->data[0]));
+	    break;
+	}
+	bulk->reservation = ipmi_get_uint16(rsp->data+1);
+	if (bulk->do_clear) {
+	    rec->state = SEL_BULK_DEL_CLEAR_CHECK;
+	    rv = send_bulk_del(rec, mc);
+	    if (rv) {
+		ipmi_log(IPMI_LOG_ERR_INFO,
+			 "%ssel.c(handle_bulk_del_rsp): "
+			 "Could not send SEL get command: %x", sel->name, rv);
+		bulk_del_clear_fallback(bulk, rv);
+	    }
+	}
+	break;
+
+    case SEL_BULK_DEL_CLEAR_CHECK:
+	handle_bulk_del_clear_check(bulk, mc, rsp);
+	break;
+
+    case SEL_BULK_DEL_CLEAR:
+	if (rsp->data[0] == 0) {
+	    if (sel->sel_good_clears)
+		ipmi_domain_stat_add(sel->sel_good_clears, 1);
+	    free_all_events(sel);
+	    sel->num_sels = 0;
+	    /* Everything we were asked to delete is gone. */
+	    bulk->num_pending = 0;
+	} else if ((rsp->data[0] == IPMI_INVALID_RESERVATION_CC)
+		   && (bulk->reserve_count < MAX_DEL_RESERVE_RETRIES))
+	{
+	    if (sel->sel_delete_lost_reservation)
+		ipmi_domain_stat_add(sel->sel_delete_lost_reservation, 1);
+	    bulk->reserve_count++;
+	    bulk->need_reserve = 1;
+	} else {
+	    if (sel->sel_clear_errors)
+		ipmi_domain_stat_add(sel->sel_clear_errors, 1);
+	    ipmi_log(IPMI_LOG_ERR_INFO,
+		     "%ssel.c(handle_bulk_del_rsp): "
+		     "IPMI error clearing SEL: 0x%x",
+		     sel->name, rsp->data[0]);
+	    bulk_del_clear_fallback(bulk, IPMI_IPMI_ERR_VAL(rsp->data[0]));
+	}
+	break;
+
+    case SEL_BULK_DEL_CHECK:
+	handle_bulk_del_check(rec, mc, rsp);
+	break;
+
+    case SEL_BULK_DEL_DELETE:
+	handle_bulk_del_delete(rec, rsp);
+	break;
+    }
+
+ out:
+    bulk_del_next(bulk, mc);
+}
+
+static void
+start_bulk_del_cb(ipmi_mc_t *mc, void *cb_data)
+{
+    sel_bulk_del_t  *bulk = cb_data;
+    ipmi_sel_info_t *sel = bulk->sel;
+    int             rv;
+
+    /* Called with SEL lock held. */
+    if (sel->destroyed) {
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(start_bulk_del_cb): "
+		 "SEL info was destroyed while an operation was in progress",
+		 sel->name);
+	bulk->cancelled = 1;
+	bulk_del_fail_pending(bulk, ECANCELED);
+	bulk_del_done(bulk, 1);
+	return;
+    }
+
+    if (bulk->do_clear && bulk->holders[bulk->clear_idx]->cancelled)
+	/* Someone else already cleared the SEL. */
+	bulk->do_clear = 0;
+
+    if (sel->supports_reserve_sel) {
+	bulk->need_reserve = 1;
+    } else if (bulk->do_clear) {
+	bulk->op_rec.state = SEL_BULK_DEL_CLEAR_CHECK;
+	rv = send_bulk_del(&bulk->op_rec, mc);
+	if (rv) {
+	    ipmi_log(IPMI_LOG_ERR_INFO,
+		     "%ssel.c(start_bulk_del_cb): could not send cmd: %x",
+		     sel->name, rv);
+	    bulk_del_clear_fallback(bulk, rv);
+	}
+    }
+
+    bulk_del_next(bulk, mc);
+}
+
+static int
+start_bulk_del(void *cb_data, int shutdown)
+{
+    sel_bulk_del_t  *bulk = cb_data;
+    ipmi_sel_info_t *sel = bulk->sel;
+    int             rv;
+
+    sel_lock(sel);
+    if (shutdown) {
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(start_bulk_del): "
+		 "SEL info was destroyed while an operation was in progress",
+		 sel->name);
+	bulk->cancelled = 1;
+	bulk_del_fail_pending(bulk, ECANCELED);
+	bulk_del_done(bulk, 0);
+	return OPQ_HANDLER_ABORTED;
+    }
+
+    rv = ipmi_mc_pointer_cb(sel->mc, start_bulk_del_cb, bulk);
+    if (rv) {
+	ipmi_log(IPMI_LOG_ERR_INFO,
+		 "%ssel.c(start_bulk_del): MC went away during delete",
+		 sel->name);
+	bulk->cancelled = 1;
+	bulk_del_fail_pending(bulk, ECANCELED);
+	bulk_del_done(bulk, 0);
+	return OPQ_HANDLER_ABORTED;
+    }
+
+    return OPQ_HANDLER_STARTED;
+}
+
+typedef struct sel_del_events_info_s
+{
+    sel_bulk_del_t *bulk;
+    int            rv;
+} sel_del_events_info_t;
+
+static void
+sel_del_events_cb(ipmi_mc_t *mc, void *cb_data)
+{
+    sel_del_events_info_t *info = cb_data;
+    sel_bulk_del_t        *bulk = info->bulk;
+    ipmi_sel_info_t       *sel = bulk->sel;
+    sel_event_holder_t    *last = NULL;
+    sel_event_holder_t    *holder;
+    ilist_iter_t          iter;
+    opq_elem_t            *elem;
+    unsigned int          i;
+
+    sel_lock(sel);
+    if (sel->destroyed) {
+	info->rv = EINVAL;
+	goto out_unlock;
+    }
+
+    /* Find the last live event, if it is being deleted along with
+       everything else the SEL can just be cleared. */
+    ilist_init_iter(&iter, sel->events);
+    if (ilist_last(&iter)) {
+	do {
+	    holder = ilist_get(&iter);
+	    if (!holder->deleted) {
+		last = holder;
+		break;
+	    }
+	} while (ilist_prev(&iter));
+    }
+
+    for (i=0; i<bulk->count; i++) {
+	holder = find_event(sel->events, bulk->record_ids[i]);
+	if (!holder || holder->deleted
+	    || (event_cmp(bulk->events[i], holder->event) != 0))
+	{
+	    bulk->errs[i] = EINVAL;
+	    continue;
+	}
+
+	holder->deleted = 1;
+	sel->num_sels--;
+	sel->del_sels++;
+	sel_event_holder_get(holder);
+	bulk->holders[i] = holder;
+	if (holder == last)
+	    bulk->clear_idx = i;
+	bulk_del_push(bulk, i);
+    }
+    bulk->op_rec.idx = bulk->clear_idx;
+
+    /* A single record is no cheaper to clear than to delete. */
+    bulk->do_clear = (sel->num_sels == 0) && (bulk->num_pending > 1);
+
+    if ((bulk->num_pending == 0)
+	|| (!sel->supports_delete_sel && !bulk->do_clear))
+    {
+	/* Nothing to send.  If the SEL can't delete, don't really
+	   delete the events, but report them as done. */
+	bulk->num_pending = 0;
+	bulk_del_done(bulk, 0);
+	return;
+    }
+
+    elem = opq_alloc_elem();
+    if (!elem) {
+	for (i=0; i<bulk->count; i++) {
+	    holder = bulk->holders[i];
+	    if (holder) {
+		holder->deleted = 0;
+		sel->num_sels++;
+		sel->del_sels--;
+		sel_event_holder_put(holder);
+		bulk->holders[i] = NULL;
+	    }
+	}
+	info->rv = ENOMEM;
+	goto out_unlock;
+    }
+
+    sel_unlock(sel);
+    opq_new_op_prio(sel->opq, start_bulk_del, bulk, 0, OPQ_ADD_TAIL, elem);
+    return;
+
+ out_unlock:
+    sel_unlock(sel);
+}
+
+int
+ipmi_sel_del_events(ipmi_sel_info_t               *sel,
+		    ipmi_event_t                  **events,
+		    unsigned int                  count,
+		    ipmi_sel_del_events_done_cb_t handler,
+		    void                          *cb_data)
+{
+    sel_del_events_info_t info;
+    sel_bulk_del_t        *bulk;
+    unsigned int          i;
+    int                   rv;
+
+    if (count == 0)
+	return EINVAL;
+
+    bulk = bulk_del_alloc(count);
+    if (!bulk)
+	return ENOMEM;
+
+    bulk->sel = sel;
+    bulk->handler = handler;
+    bulk->cb_data = cb_data;
+    bulk->lun = sel->lun;
+    bulk->op_rec.bulk = bulk;
+    for (i=0; i<count; i++) {
+	bulk->events[i] = ipmi_event_dup(events[i]);
+	bulk->record_ids[i] = ipmi_event_get_record_id(events[i]);
+	bulk->recs[i].bulk = bulk;
+	bulk->recs[i].idx = i;
+    }
+
+    info.bulk = bulk;
+    info.rv = 0;
+    rv = ipmi_mc_pointer_cb(sel->mc, sel_del_events_cb, &info);
+    if (!rv)
+	rv = info.rv;
+    if (rv)
+	bulk_del_free(bulk);
+    return rv;
+}
+
 int
 ipmi_get_sel_count(ipmi_sel_info_t *sel,
 		   unsigned int    *count)
@@ -64,6 +64,7 @@
 
 /* For ipmi_debug_malloc_cleanup() */
 #include <OpenIPMI/internal/ipmi_malloc.h>
+#include <OpenIPMI/internal/ipmi_locks.h>
 
 #include "OpenIPMI.h"
 
@@ -356,6 +357,12 @@ typedef struct iargarray
     ipmi_args_t **val;
     int         len;
 } iargarray;
+/* For input only */
+typedef struct eventarray
+{
+    ipmi_event_t **val;
+    int          len;
+} eventarray;
 %}
 typedef struct strconstarray
 {
@@ -372,6 +379,11 @@ typedef struct iargarray
     ipmi_args_t **val;
     int        len;
 } iargarray;
+typedef struct eventarray
+{
+    ipmi_event_t **val;
+    int          len;
+} eventarray;
 
 %include "OpenIPMI_lang.i"
 
@@ -675,6 +687,99 @@ domain_iterate_mcs_handler(ipmi_domain_t *domain, ipmi_mc_t *mc, void *cb_data)
     swig_free_ref_check(mc_ref, ipmi_mc_t);
 }
 
+/* Convert a FRU node field into the string form the scripting
+   languages see.  The type is set to the name of the field type. */
+static char *
+fru_field_to_str(enum ipmi_fru_data_type_e dtype,
+		 int                       intval,
+		 time_t                    time,
+		 double                    floatval,
+		 char                      *data,
+		 unsigned int              data_len,
+		 const char                **type)
+{
+    int  len;
+    char dummy[1];
+    char *str, *s;
+    int  i;
+
+    switch(dtype) {
+    case IPMI_FRU_DATA_INT:
+	len = snprintf(dummy, 1, "%d", intval);
+	str = malloc(len + 1);
+	sprintf(str, "%d", intval);
+	*type = "integer";
+	break;
+
+    case IPMI_FRU_DATA_BOOLEAN:
+	len = snprintf(dummy, 1, "%d", intval);
+	str = malloc(len + 1);
+	sprintf(str, "%d", intval);
+	*type = "boolean";
+	break;
+
+    case IPMI_FRU_DATA_TIME:
+	len = snprintf(dummy, 1, "%ld", (long) time);
+	str = malloc(len + 1);
+	sprintf(str, "%ld", (long) time);
+	*type = "time";
+	break;
+
+    case IPMI_FRU_DATA_FLOAT:
+	len = snprintf(dummy, 1, "%lf", floatval);
+	str = malloc(len + 1);
+	sprintf(str, "%lf", floatval);
+	*type = "float";
+	break;
+
+    case IPMI_FRU_DATA_BINARY:
+	len = data_len * 5;
+	str = malloc(len + 1);
+	s = str;
+	if (data_len > 0)
+	    s += sprintf(s, "0x%2.2x", (unsigned char) data[0]);
+	else
+	    *s = '\0';
+	for (i=1; i<data_len; i++)
+	    s += sprintf(s, " 0x%2.2x", (unsigned char) data[i]);
+	*type = "binary";
+	break;
+
+    case IPMI_FRU_DATA_UNICODE:
+	len = data_len * 5;
+	str = malloc(len + 1);
+	s = str;
+	if (data_len > 0)
+	    s += sprintf(s, "0x%2.2x", (unsigned char) data[0]);
+	else
+	    *s = '\0';
+	for (i=1; i<data_len; i++)
+	    s += sprintf(s, " 0x%2.2x", (unsigned char) data[i]);
+	*type = "unicode";
+	break;
+
+    case IPMI_FRU_DATA_ASCII:
+	str = strdup(data);
+	*type = "ascii";
+	break;
+
+    case IPMI_FRU_DATA_SUB_NODE:
+	str = NULL;
+	*type = "subnode";
+
+	/* Put the array length (or the -1) in the value */
+	len = snprintf(dummy, 1, "%d", intval);
+	str = malloc(len + 1);
+	sprintf(str, "%d", intval);
+	break;
+
+    default:
+	str = NULL;
+    }
+
+    return str;
+}
+
 static void
 fru_written_done(ipmi_domain_t *domain, ipmi_fru_t *fru,
 		 int err, void *cb_data)
@@ -1178,6 +1283,25 @@ mc_reread_sel_handler(ipmi_mc_t *mc, int err, void *cb_data)
     deref_swig_cb_val(cb);
 }
 
+static void
+mc_del_events_handler(ipmi_mc_t    *mc,
+		      int          err,
+		      unsigned int count,
+		      unsigned int *record_ids,
+		      int          *errs,
+		      void         *cb_data)
+{
+    swig_cb_val *cb = cb_data;
+    swig_ref    mc_ref;
+
+    mc_ref = swig_make_ref(mc, ipmi_mc_t);
+    swig_call_cb(cb, "mc_del_events_cb", "%p%d%*p%*p", &mc_ref, err,
+		 count, (int *) record_ids, count, errs);
+    swig_free_ref_check(mc_ref, ipmi_mc_t);
+    /* One-time call, get rid of the CB. */
+    deref_swig_cb_val(cb);
+}
+
 static void
 mc_sel_get_time_cb(ipmi_mc_t     *mc,
 		   int           err,
@@ -1778,6 +1902,59 @@ discrete_states_to_str(ipmi_states_t *states)
     return str;
 }
 
+/*
+ * Integer versions of the above for the *_mask_cb callbacks.  The
+ * flags are a combination of the STATES_FLAG_xxx values, the mask has
+ * bit n set if threshold n (IPMI_LOWER_NON_CRITICAL is bit 0) is out
+ * of range or discrete offset n is set.
+ */
+#define STATES_FLAG_EVENTS_ENABLED	(1 << 0)
+#define STATES_FLAG_SCANNING_ENABLED	(1 << 1)
+#define STATES_FLAG_BUSY		(1 << 2)
+
+static int
+states_to_flags(ipmi_states_t *states)
+{
+    int flags = 0;
+
+    if (ipmi_is_event_messages_enabled(states))
+	flags |= STATES_FLAG_EVENTS_ENABLED;
+    if (ipmi_is_sensor_scanning_enabled(states))
+	flags |= STATES_FLAG_SCANNING_ENABLED;
+    if (ipmi_is_initial_update_in_progress(states))
+	flags |= STATES_FLAG_BUSY;
+    return flags;
+}
+
+static int
+threshold_states_to_mask(ipmi_states_t *states)
+{
+    enum ipmi_thresh_e thresh;
+    int                mask = 0;
+
+    for (thresh = IPMI_LOWER_NON_CRITICAL;
+	 thresh <= IPMI_UPPER_NON_RECOVERABLE; 
+	 thresh++)
+    {
+	if (ipmi_is_threshold_out_of_range(states, thresh))
+	    mask |= 1 << thresh;
+    }
+    return mask;
+}
+
+static int
+discrete_states_to_mask(ipmi_states_t *states)
+{
+    int offset;
+    int mask = 0;
+
+    for (offset=0; offset<15; offset++) {
+	if (ipmi_is_state_set(states, offset))
+	    mask |= 1 << offset;
+    }
+    return mask;
+}
+
 static char *
 thresholds_to_str(ipmi_thresholds_t *t)
 {
@@ -2162,6 +2339,267 @@ sensor_get_states_handler(ipmi_sensor_t *sensor,
     deref_swig_cb_val(cb);
 }
 
+static void
+sensor_get_reading_mask_handler(ipmi_sensor_t             *sensor,
+				int                       err,
+				enum ipmi_value_present_e value_present,
+				unsigned int              raw_value,
+				double                    value,
+				ipmi_states_t             *states,
+				void                      *cb_data)
+{
+    swig_cb_val *cb = cb_data;
+    swig_ref    sensor_ref;
+    int         raw_set = 0;
+    int         value_set = 0;
+
+    if (value_present == IPMI_RAW_VALUE_PRESENT)
+	raw_set = 1;
+    if (value_present == IPMI_BOTH_VALUES_PRESENT) {
+	raw_set = 1;
+	value_set = 1;
+    }
+    sensor_ref = swig_make_ref(sensor, ipmi_sensor_t);
+    swig_call_cb(cb, "threshold_reading_mask_cb", "%p%d%d%d%d%f%d%d",
+		 &sensor_ref, err, raw_set, raw_value, value_set, value,
+		 states_to_flags(states), threshold_states_to_mask(states));
+    swig_free_ref_check(sensor_ref, ipmi_sensor_t);
+    /* One-time call, get rid of the CB. */
+    deref_swig_cb_val(cb);
+}
+
+static void
+sensor_get_states_mask_handler(ipmi_sensor_t *sensor,
+			       int           err,
+			       ipmi_states_t *states,
+			       void          *cb_data)
+{
+    swig_cb_val *cb = cb_data;
+    swig_ref    sensor_ref;
+
+    sensor_ref = swig_make_ref(sensor, ipmi_sensor_t);
+    swig_call_cb(cb, "discrete_states_mask_cb", "%p%d%d%d", &sensor_ref,
+		 err, states_to_flags(states), discrete_states_to_mask(states));
+    swig_free_ref_check(sensor_ref, ipmi_sensor_t);
+    /* One-time call, get rid of the CB. */
+    deref_swig_cb_val(cb);
+}
+
+/*
+ * Read every readable sensor of an entity or MC and deliver all the
+ * results in one callback.
+ */
+typedef struct sensor_read_all_s sensor_read_all_t;
+
+typedef struct sensor_read_all_item_s
+{
+    sensor_read_all_t *info;
+    int               idx;
+} sensor_read_all_item_t;
+
+struct sensor_read_all_s
+{
+    swig_cb_val            *cb;
+    ipmi_lock_t            *lock;
+    ipmi_mc_t              *mc; /* If set, only sensors on this MC */
+    int                    size;
+    int                    count;
+    int                    outstanding;
+    int                    err;
+    swig_sensor_reading    *readings;
+    sensor_read_all_item_t *items;
+};
+
+static void
+sensor_read_all_free(sensor_read_all_t *info)
+{
+    int i;
+
+    for (i=0; i<info->count; i++) {
+	if (info->readings[i].name)
+	    free(info->readings[i].name);
+	if (info->readings[i].states)
+	    free(info->readings[i].states);
+    }
+    if (info->readings)
+	free(info->readings);
+    if (info->items)
+	free(info->items);
+    if (info->lock)
+	ipmi_destroy_lock(info->lock);
+    free(info);
+}
+
+static void
+sensor_read_all_put(sensor_read_all_t *info, int err)
+{
+    int done;
+
+    ipmi_lock(info->lock);
+    if (err && !info->err)
+	info->err = err;
+    info->outstanding--;
+    done = info->outstanding == 0;
+    ipmi_unlock(info->lock);
+    if (!done)
+	return;
+
+    swig_call_cb(info->cb, "sensor_read_all_cb", "%d%*r", info->err,
+		 info->count, info->readings);
+    /* One-time call, get rid of the CB. */
+    deref_swig_cb_val(info->cb);
+    sensor_read_all_free(info);
+}
+
+static void
+sensor_read_all_reading(ipmi_sensor_t             *sensor,
+			int                       err,
+			enum ipmi_value_present_e value_present,
+			unsigned int              raw_value,
+			double                    value,
+			ipmi_states_t             *states,
+			void                      *cb_data)
+{
+    sensor_read_all_item_t *item = cb_data;
+    swig_sensor_reading    *r = &item->info->readings[item->idx];
+
+    if (!err) {
+	if (value_present == IPMI_RAW_VALUE_PRESENT)
+	    r->raw_set = 1;
+	if (value_present == IPMI_BOTH_VALUES_PRESENT) {
+	    r->raw_set = 1;
+	    r->value_set = 1;
+	}
+	r->raw = raw_value;
+	r->value = value;
+	r->states = threshold_states_to_str(states);
+    }
+    sensor_read_all_put(item->info, err);
+}
+
+static void
+sensor_read_all_states(ipmi_sensor_t *sensor,
+		       int           err,
+		       ipmi_states_t *states,
+		       void          *cb_data)
+{
+    sensor_read_all_item_t *item = cb_data;
+    swig_sensor_reading    *r = &item->info->readings[item->idx];
+
+    if (!err)
+	r->states = discrete_states_to_str(states);
+    sensor_read_all_put(item->info, err);
+}
+
+static void
+sensor_read_all_count(ipmi_entity_t *entity,
+		      ipmi_sensor_t *sensor,
+		      void          *cb_data)
+{
+    sensor_read_all_t *info = cb_data;
+
+    if (info->mc && (ipmi_sensor_get_mc(sensor) != info->mc))
+	return;
+    info->size++;
+}
+
+static void
+sensor_read_all_issue(ipmi_entity_t *entity,
+		      ipmi_sensor_t *sensor,
+		      void          *cb_data)
+{
+    sensor_read_all_t      *info = cb_data;
+    sensor_read_all_item_t *item;
+    char                   name[IPMI_SENSOR_NAME_LEN];
+    int                    rv;
+
+    if (info->mc && (ipmi_sensor_get_mc(sensor) != info->mc))
+	return;
+    if (info->count >= info->size)
+	return;
+    if (!ipmi_sensor_get_is_readable(sensor))
+	return;
+
+    item = &info->items[info->count];
+    item->info = info;
+    item->idx = info->count;
+    ipmi_sensor_get_name(sensor, name, sizeof(name));
+    info->readings[info->count].name = strdup(name);
+    info->count++;
+
+    ipmi_lock(info->lock);
+    info->outstanding++;
+    ipmi_unlock(info->lock);
+    if (ipmi_sensor_get_event_reading_type(sensor)
+	== IPMI_EVENT_READING_TYPE_THRESHOLD)
+	rv = ipmi_sensor_get_reading(sensor, sensor_read_all_reading, item);
+    else
+	rv = ipmi_sensor_get_states(sensor, sensor_read_all_states, item);
+    if (rv)
+	sensor_read_all_put(info, rv);
+}
+
+static void
+sensor_read_all_entity_count(ipmi_entity_t *entity, void *cb_data)
+{
+    ipmi_entity_iterate_sensors(entity, sensor_read_all_count, cb_data);
+}
+
+static void
+sensor_read_all_entity_issue(ipmi_entity_t *entity, void *cb_data)
+{
+    ipmi_entity_iterate_sensors(entity, sensor_read_all_issue, cb_data);
+}
+
+/*
+ * Read all the sensors of the entity, or all the sensors in the
+ * domain that belong to the MC if mc is set.
+ */
+static int
+sensor_read_all(ipmi_entity_t *entity, ipmi_mc_t *mc, swig_cb_val *cb)
+{
+    sensor_read_all_t *info;
+    int               rv;
+
+    info = malloc(sizeof(*info));
+    if (!info)
+	return ENOMEM;
+    memset(info, 0, sizeof(*info));
+    info->mc = mc;
+    rv = ipmi_create_lock_os_hnd(swig_os_hnd, &info->lock);
+    if (rv) {
+	free(info);
+	return rv;
+    }
+
+    /* Count first, so the arrays never move while reads are out. */
+    if (entity)
+	ipmi_entity_iterate_sensors(entity, sensor_read_all_count, info);
+    else
+	ipmi_domain_iterate_entities(ipmi_mc_get_domain(mc),
+				     sensor_read_all_entity_count, info);
+    if (info->size > 0) {
+	info->readings = malloc(info->size * sizeof(*info->readings));
+	info->items = malloc(info->size * sizeof(*info->items));
+	if (!info->readings || !info->items) {
+	    sensor_read_all_free(info);
+	    return ENOMEM;
+	}
+	memset(info->readings, 0, info->size * sizeof(*info->readings));
+    }
+
+    /* Hold a count while issuing so nothing completes early. */
+    info->cb = cb;
+    info->outstanding = 1;
+    if (entity)
+	ipmi_entity_iterate_sensors(entity, sensor_read_all_issue, info);
+    else
+	ipmi_domain_iterate_entities(ipmi_mc_get_domain(mc),
+				     sensor_read_all_entity_issue, info);
+    sensor_read_all_put(info, 0);
+    return 0;
+}
+
 static int
 str_to_color(char *s, int len, int *color)
 {
@@ -3002,6 +3440,299 @@ init_glib_shim(char *ver)
 }
 #endif
 
+/*
+ * An OS handler that hands file descriptor and timer handling off to
+ * an event loop in the scripting language.  Everything else (logs,
+ * random numbers, the database, time) comes from a non-threaded POSIX
+ * OS handler.  The language object registered with init_loop() gets
+ * the following methods called on it:
+ *   fd_enables(fd, read, write) - start/change watching the fd.
+ *   remove_fd(fd) - stop watching the fd.
+ *   start_timer(id, seq, timeout) - call loop_timer_expired(id, seq)
+ *      after timeout (a float, in seconds).
+ *   stop_timer(id, seq) - cancel the given timer.
+ *   perform_one_op(timeout) - run the loop until one operation is done
+ *      or timeout (a float, in seconds) expires.
+ * The loop reports events back with loop_fd_ready() and
+ * loop_timer_expired().
+ */
+static swig_cb_val *swig_loop_handler;
+static void (*swig_loop_posix_free)(os_handler_t *os_hnd);
+
+struct os_hnd_fd_id_s
+{
+    int                fd;
+    void               *cb_data;
+    os_data_ready_t    data_ready;
+    os_data_ready_t    write_ready;
+    os_data_ready_t    except_ready;
+    os_handler_t       *handler;
+    os_fd_data_freed_t freed;
+    int                in_handler;
+    int                removed;
+};
+
+struct os_hnd_timer_id_s
+{
+    void           *cb_data;
+    os_timed_out_t timed_out;
+    int            running;
+    int            id;
+    int            seq;
+    os_handler_t   *handler;
+};
+
+/* Both of these are indexed directly, fds by fd number and timers by
+   the slot handed out at allocation, so the loop callbacks are O(1). */
+static os_hnd_fd_id_t **swig_loop_fds;
+static int swig_loop_fds_len;
+static os_hnd_timer_id_t **swig_loop_timers;
+static int swig_loop_timers_len;
+
+static void
+loop_free_fd_data(os_hnd_fd_id_t *fd_data)
+{
+    if (fd_data->freed)
+	fd_data->freed(fd_data->fd, fd_data->cb_data);
+    free(fd_data);
+}
+
+static int
+loop_add_fd(os_handler_t       *handler,
+	    int                fd,
+	    os_data_ready_t    data_ready,
+	    void               *cb_data,
+	    os_fd_data_freed_t freed,
+	    os_hnd_fd_id_t     **id)
+{
+    os_hnd_fd_id_t *fd_data;
+
+    if (fd < 0)
+	return EINVAL;
+
+    if (fd >= swig_loop_fds_len) {
+	os_hnd_fd_id_t **nfds;
+	int            nlen = swig_loop_fds_len * 2;
+
+	if (nlen <= fd)
+	    nlen = fd + 16;
+	nfds = realloc(swig_loop_fds, nlen * sizeof(*nfds));
+	if (!nfds)
+	    return ENOMEM;
+	memset(nfds + swig_loop_fds_len, 0,
+	       (nlen - swig_loop_fds_len) * sizeof(*nfds));
+	swig_loop_fds = nfds;
+	swig_loop_fds_len = nlen;
+    }
+    if (swig_loop_fds[fd])
+	return EBUSY;
+
+    fd_data = malloc(sizeof(*fd_data));
+    if (!fd_data)
+	return ENOMEM;
+    memset(fd_data, 0, sizeof(*fd_data));
+
+    fd_data->fd = fd;
+    fd_data->cb_data = cb_data;
+    fd_data->data_ready = data_ready;
+    fd_data->handler = handler;
+    fd_data->freed = freed;
+    swig_loop_fds[fd] = fd_data;
+
+    swig_call_cb(swig_loop_handler, "fd_enables", "%d%d%d", fd, 1, 0);
+
+    *id = fd_data;
+    return 0;
+}
+
+static int
+loop_remove_fd(os_handler_t *handler, os_hnd_fd_id_t *fd_data)
+{
+    swig_loop_fds[fd_data->fd] = NULL;
+    swig_call_cb(swig_loop_handler, "remove_fd", "%d", fd_data->fd);
+    /* If we are being called from the fd's own handler, the free is
+       done when the handler returns. */
+    if (fd_data->in_handler)
+	fd_data->removed = 1;
+    else
+	loop_free_fd_data(fd_data);
+    return 0;
+}
+
+static void
+loop_set_fd_handlers(os_handler_t *handler, os_hnd_fd_id_t *id,
+		     os_data_ready_t write_ready,
+		     os_data_ready_t except_ready)
+{
+    id->write_ready = write_ready;
+    id->except_ready = except_ready;
+}
+
+static int
+loop_set_fd_enables(os_handler_t *handler, os_hnd_fd_id_t *id,
+		    int read, int write, int except)
+{
+    /* Language event loops generally have no exception handling, so
+       except is ignored. */
+    swig_call_cb(swig_loop_handler, "fd_enables", "%d%d%d",
+		 id->fd, read != 0, write != 0);
+    return 0;
+}
+
+static int
+loop_alloc_timer(os_handler_t      *handler,
+		 os_hnd_timer_id_t **id)
+{
+    os_hnd_timer_id_t *timer_data;
+    int               i;
+
+    for (i=0; i<swig_loop_timers_len; i++) {
+	if (!swig_loop_timers[i])
+	    break;
+    }
+    if (i == swig_loop_timers_len) {
+	os_hnd_timer_id_t **ntimers;
+	int               nlen = swig_loop_timers_len * 2;
+
+	if (nlen == 0)
+	    nlen = 16;
+	ntimers = realloc(swig_loop_timers, nlen * sizeof(*ntimers));
+	if (!ntimers)
+	    return ENOMEM;
+	memset(ntimers + swig_loop_timers_len, 0,
+	       (nlen - swig_loop_timers_len) * sizeof(*ntimers));
+	swig_loop_timers = ntimers;
+	swig_loop_timers_len = nlen;
+    }
+
+    timer_data = malloc(sizeof(*timer_data));
+    if (!timer_data)
+	return ENOMEM;
+    memset(timer_data, 0, sizeof(*timer_data));
+
+    timer_data->id = i;
+    timer_data->handler = handler;
+    swig_loop_timers[i] = timer_data;
+
+    *id = timer_data;
+    return 0;
+}
+
+static int
+loop_free_timer(os_handler_t *handler, os_hnd_timer_id_t *id)
+{
+    if (id->running)
+	return EBUSY;
+
+    swig_loop_timers[id->id] = NULL;
+    free(id);
+    return 0;
+}
+
+static int
+loop_start_timer(os_handler_t      *handler,
+		 os_hnd_timer_id_t *id,
+		 struct timeval    *timeout,
+		 os_timed_out_t    timed_out,
+		 void              *cb_data)
+{
+    double secs;
+
+    if (id->running)
+	return EBUSY;
+
+    id->running = 1;
+    id->cb_data = cb_data;
+    id->timed_out = timed_out;
+    /* A new sequence each start so a stale expiry can be detected. */
+    id->seq++;
+
+    secs = timeout->tv_sec + (timeout->tv_usec / 1000000.0);
+    swig_call_cb(swig_loop_handler, "start_timer", "%d%d%f",
+		 id->id, id->seq, secs);
+    return 0;
+}
+
+static int
+loop_stop_timer(os_handler_t *handler, os_hnd_timer_id_t *id)
+{
+    if (!id->running)
+	return EINVAL;
+
+    id->running = 0;
+    swig_call_cb(swig_loop_handler, "stop_timer", "%d%d", id->id, id->seq);
+    return 0;
+}
+
+static int
+loop_perform_one_op(os_handler_t   *os_hnd,
+		    struct timeval *timeout)
+{
+    double secs = -1.0;
+
+    if (timeout)
+	secs = timeout->tv_sec + (timeout->tv_usec / 1000000.0);
+    swig_call_cb(swig_loop_handler, "perform_one_op", "%f", secs);
+    return 0;
+}
+
+static void
+loop_operation_loop(os_handler_t *os_hnd)
+{
+    for (;;)
+	loop_perform_one_op(os_hnd, NULL);
+}
+
+static void
+loop_free_os_handler(os_handler_t *os_hnd)
+{
+    int i;
+
+    for (i=0; i<swig_loop_fds_len; i++) {
+	if (swig_loop_fds[i])
+	    loop_free_fd_data(swig_loop_fds[i]);
+    }
+    free(swig_loop_fds);
+    swig_loop_fds = NULL;
+    swig_loop_fds_len = 0;
+    for (i=0; i<swig_loop_timers_len; i++) {
+	if (swig_loop_timers[i])
+	    free(swig_loop_timers[i]);
+    }
+    free(swig_loop_timers);
+    swig_loop_timers = NULL;
+    swig_loop_timers_len = 0;
+
+    deref_swig_cb_val(swig_loop_handler);
+    swig_loop_handler = NULL;
+    swig_loop_posix_free(os_hnd);
+}
+
+static os_handler_t *
+loop_get_os_handler(swig_cb_val *handler)
+{
+    os_handler_t *os_hnd;
+
+    os_hnd = ipmi_posix_setup_os_handler();
+    if (!os_hnd)
+	return NULL;
+
+    swig_loop_handler = handler;
+    swig_loop_posix_free = os_hnd->free_os_handler;
+    os_hnd->add_fd_to_wait_for = loop_add_fd;
+    os_hnd->remove_fd_to_wait_for = loop_remove_fd;
+    os_hnd->set_fd_handlers = loop_set_fd_handlers;
+    os_hnd->set_fd_enables = loop_set_fd_enables;
+    os_hnd->alloc_timer = loop_alloc_timer;
+    os_hnd->free_timer = loop_free_timer;
+    os_hnd->start_timer = loop_start_timer;
+    os_hnd->stop_timer = loop_stop_timer;
+    os_hnd->perform_one_op = loop_perform_one_op;
+    os_hnd->operation_loop = loop_operation_loop;
+    os_hnd->free_os_handler = loop_free_os_handler;
+    return os_hnd;
+}
+
 %}
 
 typedef struct {
@@ -3188,6 +3919,95 @@ init_posix(void)
     return 0;
 }
 
+/*
+ * Initialize the OS handler to use an event loop in the scripting
+ * language.  See loop_get_os_handler() for the methods the handler
+ * object must provide.  In Python, use init_asyncio() instead of
+ * calling this directly.
+ */
+int
+init_loop(swig_cb *handler)
+{
+    swig_cb_val *handler_val;
+
+    if (swig_os_hnd)
+	return 0;
+    if (! valid_swig_cb(handler, start_timer))
+	return EINVAL;
+#ifdef OpenIPMI_HAVE_INIT_LANG
+    init_lang();
+#endif
+    handler_val = ref_swig_cb(handler, start_timer);
+    swig_os_hnd = loop_get_os_handler(handler_val);
+    if (!swig_os_hnd) {
+	deref_swig_cb_val(handler_val);
+	return ENOMEM;
+    }
+    swig_os_hnd->set_log_handler(swig_os_hnd, openipmi_swig_vlog);
+    ipmi_init(swig_os_hnd);
+    ipmi_cmdlang_init(swig_os_hnd);
+    return 0;
+}
+
+/*
+ * Called by the language event loop when an fd registered with
+ * fd_enables() is ready.  If write is true, the fd is ready for
+ * writing, otherwise it is ready for reading.
+ */
+void
+loop_fd_ready(int fd, int write)
+{
+    os_hnd_fd_id_t  *fd_data;
+    os_data_ready_t handler;
+
+    if ((fd < 0) || (fd >= swig_loop_fds_len))
+	return;
+    fd_data = swig_loop_fds[fd];
+    if (!fd_data)
+	return;
+    if (write)
+	handler = fd_data->write_ready;
+    else
+	handler = fd_data->data_ready;
+    if (!handler)
+	return;
+
+    IPMI_SWIG_C_CB_ENTRY
+    fd_data->in_handler++;
+    handler(fd, fd_data->cb_data, fd_data);
+    fd_data->in_handler--;
+    if (fd_data->removed && !fd_data->in_handler)
+	loop_free_fd_data(fd_data);
+    IPMI_SWIG_C_CB_EXIT
+}
+
+/*
+ * Called by the language event loop when a timer started with
+ * start_timer() expires.
+ */
+void
+loop_timer_expired(int id, int seq)
+{
+    os_hnd_timer_id_t *timer_data;
+    /* Make a copy of this, because the handler may delete the timer
+       data. */
+    void              *cb_data;
+    os_timed_out_t    timed_out;
+
+    if ((id < 0) || (id >= swig_loop_timers_len))
+	return;
+    timer_data = swig_loop_timers[id];
+    if (!timer_data || !timer_data->running || (timer_data->seq != seq))
+	return;
+
+    timed_out = timer_data->timed_out;
+    cb_data = timer_data->cb_data;
+    timer_data->running = 0;
+    IPMI_SWIG_C_CB_ENTRY
+    timed_out(cb_data, timer_data);
+    IPMI_SWIG_C_CB_EXIT
+}
+
 /*
  * Initialize the OS handler with the default version.  This is glib
  * if it is present, POSIX if it is not.
@@ -4246,7 +5066,7 @@ char *get_error_string(unsigned int val);
 
     /*
      * Iterate through all the entities in the object.  The
-     * domain_iter_entities_cb method will be called on the first
+     * domain_iter_entity_cb method will be called on the first
      * parameter for each entity in the domain.  The parameters it
      * receives will be: <self> <domain> <entity>.
      */
@@ -4256,10 +5076,10 @@ char *get_error_string(unsigned int val);
 	int         rv = 0;
 
 	IPMI_SWIG_C_CB_ENTRY
-	if (! valid_swig_cb(handler, domain_iter_entities_cb))
+	if (! valid_swig_cb(handler, domain_iter_entity_cb))
 	    rv = EINVAL;
 	else {
-	    handler_val = get_swig_cb(handler, domain_iter_entities_cb);
+	    handler_val = get_swig_cb(handler, domain_iter_entity_cb);
 	    ipmi_domain_iterate_entities(self, domain_iterate_entities_handler,
 					 handler_val);
 	}
@@ -4362,10 +5182,10 @@ char *get_error_string(unsigned int val);
      * Send a command to a given address (parm 1) with the given lun
      * (parm 2), netfn (parm 3), command (parm 4).  Parm 5 is the
      * message data in an array reference.  Parm 6 is the handler, it
-     * will be called with the response.  The addr_cmd_cb method will
-     * be called on the handler handler if it is provided and defined;
-     * its parameters are: <domain> <addr> <lun> <netfn> <cmd>
-     * <response data>
+     * will be called with the response.  The domain_addr_cmd_cb
+     * method will be called on the handler handler if it is provided
+     * and defined; its parameters are: <domain> <addr> <lun> <netfn>
+     * <cmd> <response data>
      */
     int send_command_addr(char *addr, int lun, int netfn, int cmd,
 			  intarray msg_data, swig_cb *handler = NULL)
@@ -4393,12 +5213,12 @@ char *get_error_string(unsigned int val);
 	    goto out_err;
 
 	if (!nil_swig_cb(handler)) {
-	    if (!valid_swig_cb(handler, addr_cmd_cb)) {
+	    if (!valid_swig_cb(handler, domain_addr_cmd_cb)) {
 		rv = EINVAL;
 		goto out_err;
 	    }
 	    msg_cb = domain_msg_cb;
-	    handler_val = ref_swig_cb(handler, addr_cmd_cb);
+	    handler_val = ref_swig_cb(handler, domain_addr_cmd_cb);
 	}
 	rv = ipmi_send_command_addr(self, &iaddr, addr_len, &msg,
 				    msg_cb, handler_val, NULL);
@@ -5072,6 +5892,34 @@ ipmi_args_t *alloc_parse_args(argarray *args);
 	return rv;
     }
 
+    /*
+     * Read all the readable sensors of the entity.  When all the
+     * reads are done, the sensor_read_all_cb method will be called on
+     * the first parameter with the following parameters: <self> <err>
+     * <readings>.  err is the first error seen, if any.  readings is
+     * a list with one (name, value, raw, states) entry per sensor;
+     * value and raw are None if not present, and all three are None
+     * if that sensor's read failed.  states is formatted as in
+     * threshold_reading_cb or discrete_states_cb.
+     */
+    int read_all_sensors(swig_cb *handler)
+    {
+	swig_cb_val *handler_val;
+	int         rv;
+
+	IPMI_SWIG_C_CB_ENTRY
+	if (! valid_swig_cb(handler, sensor_read_all_cb))
+	    rv = EINVAL;
+	else {
+	    handler_val = ref_swig_cb(handler, sensor_read_all_cb);
+	    rv = sensor_read_all(self, NULL, handler_val);
+	    if (rv)
+		deref_swig_cb_val(handler_val);
+	}
+	IPMI_SWIG_C_CB_EXIT
+	return rv;
+    }
+
     /*
      * Iterate through all the entity's controls.  The
      * entity_iter_controls_cb method will be called on the first
@@ -5895,6 +6743,20 @@ ipmi_args_t *alloc_parse_args(argarray *args);
 	return ipmi_cmp_mc_id(*self, *other);
     }
 
+    /*
+     * The channel and IPMB address of the MC the id refers to.
+     * Together these identify the MC within its domain.
+     */
+    int get_channel()
+    {
+	return self->channel;
+    }
+
+    int get_address()
+    {
+	return self->mc_num;
+    }
+
     /*
      * Convert a mc id to a mc pointer.  The "mc_cb" method
      * will be called on the first parameter with the following parameters:
@@ -5927,6 +6789,29 @@ ipmi_args_t *alloc_parse_args(argarray *args);
 	return ipmi_mc_get_domain(self);
     }
 
+    /*
+     * Read all the readable sensors whose messages go to this MC.
+     * The results are delivered the same way as the entity
+     * read_all_sensors() method.
+     */
+    int read_all_sensors(swig_cb *handler)
+    {
+	swig_cb_val *handler_val;
+	int         rv;
+
+	IPMI_SWIG_C_CB_ENTRY
+	if (! valid_swig_cb(handler, sensor_read_all_cb))
+	    rv = EINVAL;
+	else {
+	    handler_val = ref_swig_cb(handler, sensor_read_all_cb);
+	    rv = sensor_read_all(NULL, self, handler_val);
+	    if (rv)
+		deref_swig_cb_val(handler_val);
+	}
+	IPMI_SWIG_C_CB_EXIT
+	return rv;
+    }
+
     %newobject get_name;
     /*
      * Get the name of an mc.
@@ -6461,6 +7346,40 @@ ipmi_args_t *alloc_parse_args(argarray *args);
 	return rv;
     }
 
+    /*
+     * Delete a list of events from the MC's SEL as one operation.
+     * The events are checked against the SEL before being deleted.
+     * Deletes are pipelined, and if the events are everything in the
+     * SEL it is cleared instead.  When all the events are done, the
+     * mc_del_events_cb method will be called on the handler (parm 2,
+     * if it is supplied) with the parameters: <self> <mc> <err>
+     * <record ids> <errors>.  The last two are lists with an entry
+     * for each event, the error is 0 if the event was deleted.
+     */
+    int del_events(eventarray *events, swig_cb *handler = NULL)
+    {
+	swig_cb_val                *handler_val = NULL;
+	ipmi_mc_del_events_done_cb done = NULL;
+	int                        rv;
+
+	IPMI_SWIG_C_CB_ENTRY
+	if (!nil_swig_cb(handler)) {
+	    if (! valid_swig_cb(handler, mc_del_events_cb)) {
+		rv = EINVAL;
+		goto out_err;
+	    }
+	    handler_val = ref_swig_cb(handler, mc_del_events_cb);
+	    done = mc_del_events_handler;
+	}
+	rv = ipmi_mc_del_events(self, events->val, events->len, done,
+				handler_val);
+	if (rv && handler_val)
+	    deref_swig_cb_val(handler_val);
+    out_err:
+	IPMI_SWIG_C_CB_EXIT
+	return rv;
+    }
+
     /*
      * Fetch the current time from the SEL.  When the operation
      * completes, the mc_get_sel_time_cb method will be called on the
@@ -7822,6 +8741,63 @@ ipmi_args_t *alloc_parse_args(argarray *args);
 	return rv;
     }
 
+%constant int STATES_FLAG_EVENTS_ENABLED = STATES_FLAG_EVENTS_ENABLED;
+%constant int STATES_FLAG_SCANNING_ENABLED = STATES_FLAG_SCANNING_ENABLED;
+%constant int STATES_FLAG_BUSY = STATES_FLAG_BUSY;
+%constant int LOWER_NON_CRITICAL = IPMI_LOWER_NON_CRITICAL;
+%constant int LOWER_CRITICAL = IPMI_LOWER_CRITICAL;
+%constant int LOWER_NON_RECOVERABLE = IPMI_LOWER_NON_RECOVERABLE;
+%constant int UPPER_NON_CRITICAL = IPMI_UPPER_NON_CRITICAL;
+%constant int UPPER_CRITICAL = IPMI_UPPER_CRITICAL;
+%constant int UPPER_NON_RECOVERABLE = IPMI_UPPER_NON_RECOVERABLE;
+
+    /* Like get_value, but the states are delivered as integers
+       instead of strings.  If this is a discrete sensor, the
+       discrete_states_mask_cb method of the first parameter will be
+       called with the following parameters: <self> <sensor> <err>
+       <flags> <states>.  If this is a threshold sensor, the
+       threshold_reading_mask_cb method of the first parameter will
+       be called with the following parameters: <self> <sensor>
+       <err> <raw_set> <raw> <value_set> <value> <flags> <states>.
+       flags is a combination of the STATES_FLAG_xxx values.  For a
+       threshold sensor, bit n of states is set if threshold n (see
+       LOWER_NON_CRITICAL, etc.) is out of range, for a discrete
+       sensor bit n is set if offset n is set. */
+    int get_value_mask(swig_cb *handler)
+    {
+	int                    rv;
+	swig_cb_val            *handler_val = NULL;
+
+	IPMI_SWIG_C_CB_ENTRY
+	if (ipmi_sensor_get_event_reading_type(self)
+	    == IPMI_EVENT_READING_TYPE_THRESHOLD)
+	{
+	    if (!valid_swig_cb(handler, threshold_reading_mask_cb))
+		rv = EINVAL;
+	    else {
+		handler_val = ref_swig_cb(handler, threshold_reading_mask_cb);
+		rv = ipmi_sensor_get_reading(self,
+					     sensor_get_reading_mask_handler,
+					     handler_val);
+		if (rv)
+		    deref_swig_cb_val(handler_val);
+	    }
+	} else {
+	    if (!valid_swig_cb(handler, discrete_states_mask_cb))
+		rv = EINVAL;
+	    else {
+		handler_val = ref_swig_cb(handler, discrete_states_mask_cb);
+		rv = ipmi_sensor_get_states(self,
+					    sensor_get_states_mask_handler,
+					    handler_val);
+		if (rv)
+		    deref_swig_cb_val(handler_val);
+	    }
+	}
+	IPMI_SWIG_C_CB_EXIT
+	return rv;
+    }
+
     /* 
      * Return the LUN for the sensor (with respect to the MC).
      */
@@ -8548,6 +9524,14 @@ ipmi_args_t *alloc_parse_args(argarray *args);
  */
 %extend ipmi_control_t {
 
+    /*
+     * Return the MC that owns the control.
+     */
+    ipmi_mc_t *get_mc()
+    {
+	return ipmi_control_get_mc(self);
+    }
+
     %newobject get_name;
     /*
      * Get the name of an control.
@@ -9608,10 +10592,6 @@ extern int ipmi_fru_str_to_index(char *name);
 	time_t                    time;
 	char                      *data = NULL;
 	unsigned int              data_len;
-	int                       len;
-	char                      dummy[1];
-	char                      *str, *s;
-	int                       i;
 	
 	rv = ipmi_fru_node_get_field(self,
 				     index,
@@ -9626,88 +10606,94 @@ extern int ipmi_fru_str_to_index(char *name);
 	if (rv)
 	    return rv;
 
-	switch(dtype) {
-	case IPMI_FRU_DATA_INT:
-	    len = snprintf(dummy, 1, "%d", intval);
-	    str = malloc(len + 1);
-	    sprintf(str, "%d", intval);
-	    *type = "integer";
-	    break;
-
-	case IPMI_FRU_DATA_BOOLEAN:
-	    len = snprintf(dummy, 1, "%d", intval);
-	    str = malloc(len + 1);
-	    sprintf(str, "%d", intval);
-	    *type = "boolean";
-	    break;
-
-	case IPMI_FRU_DATA_TIME:
-	    len = snprintf(dummy, 1, "%ld", (long) time);
-	    str = malloc(len + 1);
-	    sprintf(str, "%ld", (long) time);
-	    *type = "time";
-	    break;
-
-	case IPMI_FRU_DATA_FLOAT:
-	    len = snprintf(dummy, 1, "%lf", floatval);
-	    str = malloc(len + 1);
-	    sprintf(str, "%lf", floatval);
-	    *type = "float";
-	    break;
-
-	case IPMI_FRU_DATA_BINARY:
-	    len = data_len * 5;
-	    str = malloc(len + 1);
-	    s = str;
-	    if (data_len > 0)
-		s += sprintf(s, "0x%2.2x", (unsigned char) data[0]);
-	    else
-		*s = '\0';
-	    for (i=1; i<data_len; i++)
-		s += sprintf(s, " 0x%2.2x", (unsigned char) data[i]);
-	    *type = "binary";
-	    break;
-
-	case IPMI_FRU_DATA_UNICODE:
-	    len = data_len * 5;
-	    str = malloc(len + 1);
-	    s = str;
-	    if (data_len > 0)
-		s += sprintf(s, "0x%2.2x", (unsigned char) data[0]);
-	    else
-		*s = '\0';
-	    for (i=1; i<data_len; i++)
-		s += sprintf(s, " 0x%2.2x", (unsigned char) data[i]);
-	    *type = "unicode";
-	    break;
-
-	case IPMI_FRU_DATA_ASCII:
-	    str = strdup(data);
-	    *type = "ascii";
-	    break;
-
-	case IPMI_FRU_DATA_SUB_NODE:
-	    str = NULL;
-	    *type = "subnode";
-
-	    /* Put the array length (or the -1) in the value */
-	    len = snprintf(dummy, 1, "%d", intval);
-	    str = malloc(len + 1);
-	    sprintf(str, "%d", intval);
-	    break;
-
-	default:
-	    str = NULL;
-	}
+	*value = fru_field_to_str(dtype, intval, time, floatval, data, data_len,
+				  type);
 
 	if (data)
 	    ipmi_fru_data_free(data);
 
-	*value = str;
-
 	return 0;
     }
 
+    /*
+     * Get the fields from index start through start+count-1 in one
+     * call, or through the end of the node if count is negative.
+     * For each field the fru_node_field_cb method of the handler is
+     * called with: <self> <index> <name> <type> <value> <subnode>.
+     * These are the same as the get_field() values, except that an
+     * unnamed field has an empty name and the value of a binary or
+     * unicode field is the raw data as a byte string, not hex text.
+     * Fields that return an error are skipped.
+     */
+    int get_fields(unsigned int start, int count, swig_cb *handler)
+    {
+	int                       rv = 0;
+	swig_cb_val               *handler_val;
+	unsigned int              i;
+	enum ipmi_fru_data_type_e dtype;
+	int                       intval;
+	double                    floatval;
+	time_t                    time;
+	char                      *data;
+	unsigned int              data_len;
+	const char                *name;
+	const char                *type;
+	char                      *value;
+	ipmi_fru_node_t           *sub_node;
+	swig_ref                  node_ref;
+
+	IPMI_SWIG_C_CB_ENTRY
+	if (! valid_swig_cb(handler, fru_node_field_cb)) {
+	    rv = EINVAL;
+	    goto out_err;
+	}
+	handler_val = get_swig_cb(handler, fru_node_field_cb);
+	for (i=start; (count < 0) || (i < start + count); i++) {
+	    data = NULL;
+	    sub_node = NULL;
+	    name = NULL;
+	    type = NULL;
+	    rv = ipmi_fru_node_get_field(self, i, &name, &dtype, &intval,
+					 &time, &floatval, &data, &data_len,
+					 &sub_node);
+	    if (rv == EINVAL) {
+		/* Past the end of the node. */
+		rv = 0;
+		break;
+	    }
+	    if (rv) {
+		rv = 0;
+		continue;
+	    }
+	    node_ref = swig_make_ref_destruct(sub_node, ipmi_fru_node_t);
+	    if ((dtype == IPMI_FRU_DATA_BINARY)
+		|| (dtype == IPMI_FRU_DATA_UNICODE))
+	    {
+		if (dtype == IPMI_FRU_DATA_BINARY)
+		    type = "binary";
+		else
+		    type = "unicode";
+		swig_call_cb(handler_val, "fru_node_field_cb", "%d%s%s%*y%p",
+			     i, name ? name : "", type,
+			     (size_t) data_len, data ? data : "", &node_ref);
+	    } else {
+		value = fru_field_to_str(dtype, intval, time, floatval, data,
+					 data_len, &type);
+		swig_call_cb(handler_val, "fru_node_field_cb", "%d%s%s%s%p",
+			     i, name ? name : "", type ? type : "",
+			     value ? value : "", &node_ref);
+		if (value)
+		    free(value);
+	    }
+	    swig_free_ref(node_ref);
+	    if (data)
+		ipmi_fru_data_free(data);
+	}
+    out_err:
+	IPMI_SWIG_C_CB_EXIT
+	return rv;
+    }
+
     int get_enum_val(unsigned int index,
 		     int          *pos,
 		     int          *nextpos,
@@ -9808,6 +10794,29 @@ extern int ipmi_fru_str_to_index(char *name);
 	return rv;
     }
 
+    /*
+     * Set a binary or unicode field (type parm 2) from a byte string
+     * holding the raw data, instead of the hex text set_field() takes.
+     */
+    int set_field_bytes(unsigned int index,
+			const char   *type,
+			charbuf      value)
+    {
+	enum ipmi_fru_data_type_e dtype;
+
+	if (!type)
+	    return EINVAL;
+	if (strcmp(type, "binary") == 0)
+	    dtype = IPMI_FRU_DATA_BINARY;
+	else if (strcmp(type, "unicode") == 0)
+	    dtype = IPMI_FRU_DATA_UNICODE;
+	else
+	    return EINVAL;
+
+	return ipmi_fru_node_set_field(self, index, dtype, 0, 0, 0.0,
+				       value.val, value.len);
+    }
+
     int settable(unsigned int index)
     {
 	return ipmi_fru_node_settable(self, index);
@@ -69,4 +69,16 @@ typedef struct swig_ref
     SV *val;
 } swig_ref;
 
+/* A sensor reading, as passed to callbacks with the "%*r" format.
+   states is NULL if the reading failed. */
+typedef struct swig_sensor_reading
+{
+    char         *name;
+    int          raw_set;
+    unsigned int raw;
+    int          value_set;
+    double       value;
+    char         *states;
+} swig_sensor_reading;
+
 #endif /* __SWIG_PERL_OPENIPMIH */
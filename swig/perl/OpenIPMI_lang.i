@@ -139,6 +139,36 @@
     free($1->val);
 };
 
+%typemap(in) eventarray * (eventarray argval) {
+    AV *tempav;
+    int i;
+    SV  **tv;
+    $1 = &argval;
+    if (!SvROK($input))
+	croak("Argument $argnum is not a reference.");
+    if (SvTYPE(SvRV($input)) != SVt_PVAV)
+	croak("Argument $argnum is not an array.");
+    tempav = (AV*)SvRV($input);
+    $1->len = av_len(tempav) + 1;
+    $1->val = malloc(($1->len)*sizeof(ipmi_event_t *));
+    for (i = 0; i < $1->len; i++) {
+	tv = av_fetch(tempav, i, 0);
+        if (SWIG_ConvertPtr(*tv, (void **) &($1->val[i]),
+			    SWIGTYPE_p_ipmi_event_t,0) < 0)
+            SWIG_croak("Type error. Expected _p_ipmi_event_t");
+	if (! $1->val[i])
+            SWIG_croak("Type error. NULL not allowed for _p_ipmi_event_t");
+    }
+};
+
+%typemap(out) eventarray * {
+    /* Nothing to do, input only */
+};
+
+%typemap(freearg) eventarray * {
+    free($1->val);
+};
+
 %typemap(in) strconstarray * (strconstarray argval) {
     $1 = &argval;
     if (!SvROK($input))
@@ -101,6 +101,7 @@ vswig_call_cb_rv(char rv_type, void *rv,
 		break;
 
 	    case 'b':
+	    case 'y':
 		/* An array of bytes as characters */
 		len = va_arg(ap, size_t);
 		XPUSHs(sv_2mortal(newSVpv(va_arg(ap, void *), len)));
@@ -120,6 +121,36 @@ vswig_call_cb_rv(char rv_type, void *rv,
 		}
 		break;
 
+	    case 'r':
+		/* An array of sensor readings, each as an array
+		   reference of [name, value, raw, states] */
+		{
+		    swig_sensor_reading *r;
+		    AV                  *av;
+		    len = va_arg(ap, int);
+		    r = va_arg(ap, swig_sensor_reading *);
+		    while (len > 0) {
+			av = newAV();
+			av_push(av, newSVpv(r->name ? r->name : "", 0));
+			if (r->value_set)
+			    av_push(av, newSVnv(r->value));
+			else
+			    av_push(av, newSV(0));
+			if (r->raw_set)
+			    av_push(av, newSViv(r->raw));
+			else
+			    av_push(av, newSV(0));
+			if (r->states)
+			    av_push(av, newSVpv(r->states, 0));
+			else
+			    av_push(av, newSV(0));
+			XPUSHs(sv_2mortal(newRV_noinc((SV *) av)));
+			r++;
+			len--;
+		    }
+		}
+		break;
+
 	    default:
 		break;
 	    }
@@ -59,4 +59,16 @@ typedef struct swig_ref
 	    swig_free_ref(r);						\
 	} while(0)
 
+/* A sensor reading, as passed to callbacks with the "%*r" format.
+   states is NULL if the reading failed. */
+typedef struct swig_sensor_reading
+{
+    char         *name;
+    int          raw_set;
+    unsigned int raw;
+    int          value_set;
+    double       value;
+    char         *states;
+} swig_sensor_reading;
+
 #endif /* __SWIG_PYTHON_OPENIPMIH */
@@ -171,6 +171,37 @@
     free($1->val);
 };
 
+%typemap(in) eventarray * (eventarray argval) {
+    int i;
+
+    $1 = &argval;
+    if (!PySequence_Check($input)) {
+	PyErr_SetString(PyExc_TypeError,"Expecting a sequence");
+	return NULL;
+    }
+    $1->len = PyObject_Length($input);
+    $1->val = malloc($1->len*sizeof(ipmi_event_t *));
+    for (i=0; i<$1->len; i++) {
+	PyObject *o = PySequence_GetItem($input,i);
+	if (!o) {
+	    PyErr_SetString(PyExc_ValueError, "Expecting a sequence of events");
+	    return NULL;
+	}
+	SWIG_Python_ConvertPtr(o, (void **)&($1->val[i]),
+			       SWIGTYPE_p_ipmi_event_t,
+			       SWIG_POINTER_EXCEPTION | 0);
+	Py_DECREF(o);
+	if (!$1->val[i]) {
+	    PyErr_SetString(PyExc_ValueError, "Invalid NULL element");
+	    return NULL;
+	}
+    }
+};
+
+%typemap(freearg) eventarray * {
+    free($1->val);
+};
+
 %typemap(in) strconstarray * (strconstarray argval)  {
     $1 = &argval;
     if (!PyList_Check($input)) {
@@ -411,11 +442,18 @@
 }
 
 %typemap(in) charbuf {
+#if PY_VERSION_HEX >= 0x03000000
+    if (PyBytes_Check($input)) {
+	Py_ssize_t nlen;
+	PyBytes_AsStringAndSize($input, &$1.val, &nlen);
+	$1.len = nlen;
+    } else
+#endif
     if (!OI_PyString_Check($input)) {
 	PyErr_SetString(PyExc_ValueError, "Expecting a string");
 	return NULL;
-    }
-    OI_PI_AsStringAndSize($input, &$1.val, &$1.len);
+    } else
+	OI_PI_AsStringAndSize($input, &$1.val, &$1.len);
 }
 
 %typemap(out) charbuf {
@@ -426,6 +464,7 @@
 
 #if PY_VERSION_HEX >= 0x03000000
 #define OI_PI_FromStringAndSize PyUnicode_FromStringAndSize
+#define OI_PI_BytesFromStringAndSize PyBytes_FromStringAndSize
 #define OI_PI_AsStringAndSize(o, val, len)	\
   {						\
     PyObject *b = PyUnicode_AsUTF8String(o);	\
@@ -445,6 +484,7 @@ static char *OI_PI_AS_STRING(PyObject *o)
 #define OI_PyString_Check PyUnicode_Check
 #else
 #define OI_PI_FromStringAndSize PyString_FromStringAndSize
+#define OI_PI_BytesFromStringAndSize PyString_FromStringAndSize
 #define OI_PI_AsStringAndSize(o, val, len)	\
   {						\
     Py_ssize_t nlen;				\
@@ -704,6 +744,8 @@ swig_count_format(char *format)
 	    case 'p':
 	    case 'o':
 	    case 'b':
+	    case 'y':
+	    case 'r':
 		count++;
 		break;
 
@@ -738,6 +780,40 @@ static void swig_call_cb(swig_cb_val *cb, char *method_name, char *format, ...)
      __attribute__ ((__format__ (__printf__, 3, 4)))
 #endif
 ;
+
+static PyObject *
+swig_none(void)
+{
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+/* Convert a sensor reading into a (name, value, raw, states) tuple. */
+static PyObject *
+swig_sensor_reading_to_py(swig_sensor_reading *r)
+{
+    PyObject *value = NULL, *raw = NULL, *states = NULL;
+
+    if (r->value_set)
+	value = PyFloat_FromDouble(r->value);
+    else
+	value = swig_none();
+    if (r->raw_set)
+	raw = PyInt_FromLong(r->raw);
+    else
+	raw = swig_none();
+    if (r->states)
+	states = PyString_FromString(r->states);
+    else
+	states = swig_none();
+    if (!value || !raw || !states) {
+	Py_XDECREF(value);
+	Py_XDECREF(raw);
+	Py_XDECREF(states);
+	return NULL;
+    }
+    return Py_BuildValue("(sNNN)", r->name ? r->name : "", value, raw, states);
+}
 static void swig_call_cb_rv(char rv_type, void *rv,
 			    swig_cb_val *cb, char *method_name,
 			    char *format, ...)
@@ -821,6 +897,14 @@ vswig_call_cb_rv(char rv_type, void *rv,
 		o = OI_PI_FromStringAndSize(data, len);
 		break;
 
+	    case 'y':
+		/* An array of bytes with length, as a bytes object,
+		   for binary data that is not text. */
+		len = va_arg(ap, size_t);
+		data = va_arg(ap, void *);
+		o = OI_PI_BytesFromStringAndSize(data, len);
+		break;
+
 	    case 'p':
 		/* An array of integers */
 		len = va_arg(ap, int);
@@ -856,6 +940,28 @@ vswig_call_cb_rv(char rv_type, void *rv,
 		}
 		break;
 
+	    case 'r':
+		/* An array of sensor readings, as a list of tuples */
+		{
+		    swig_sensor_reading *r;
+		    len = va_arg(ap, int);
+		    r = va_arg(ap, swig_sensor_reading *);
+		    o = PyList_New(len);
+		    if (!o) {
+			errstr = "cannot allocate list";
+			goto out_err;
+		    }
+		    for (i=0; i<len; i++, r++) {
+			p = swig_sensor_reading_to_py(r);
+			if (!p) {
+			    errstr = "cannot allocate sensor reading item";
+			    goto out_err;
+			}
+			PyList_SET_ITEM(o, i, p);
+		    }
+		}
+		break;
+
 	    default:
 		break;
 	    }
@@ -972,3 +1078,110 @@ swig_call_cb_rv(char rv_type, void *rv,
 }
 
 %}
+
+%pythoncode %{
+class _AsyncioLoopHandler:
+    """Glue between the OpenIPMI OS handler set up by init_loop() and
+    an asyncio event loop.  See init_asyncio()."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.readers = set()
+        self.writers = set()
+        self.timers = { }
+        self.in_one_op = False
+        return
+
+    def fd_enables(self, fd, read, write):
+        if (read):
+            if (fd not in self.readers):
+                self.loop.add_reader(fd, self.fd_ready, fd, 0)
+                self.readers.add(fd)
+                pass
+            pass
+        elif (fd in self.readers):
+            self.loop.remove_reader(fd)
+            self.readers.discard(fd)
+            pass
+        if (write):
+            if (fd not in self.writers):
+                self.loop.add_writer(fd, self.fd_ready, fd, 1)
+                self.writers.add(fd)
+                pass
+            pass
+        elif (fd in self.writers):
+            self.loop.remove_writer(fd)
+            self.writers.discard(fd)
+            pass
+        return
+
+    def remove_fd(self, fd):
+        self.fd_enables(fd, 0, 0)
+        return
+
+    def fd_ready(self, fd, write):
+        loop_fd_ready(fd, write)
+        self.op_done()
+        return
+
+    def start_timer(self, id, seq, timeout):
+        h = self.loop.call_later(timeout, self.timer_expired, id, seq)
+        self.timers[id] = (seq, h)
+        return
+
+    def stop_timer(self, id, seq):
+        t = self.timers.pop(id, None)
+        if (t != None):
+            t[1].cancel()
+            pass
+        return
+
+    def timer_expired(self, id, seq):
+        # The handler may restart the timer, so clear it out first.
+        t = self.timers.get(id)
+        if (t != None) and (t[0] == seq):
+            del self.timers[id]
+            pass
+        loop_timer_expired(id, seq)
+        self.op_done()
+        return
+
+    def perform_one_op(self, timeout):
+        # If the loop is already running it is already handling
+        # OpenIPMI events, and asyncio loops cannot be nested.
+        if (self.loop.is_running()):
+            return
+        h = None
+        if (timeout >= 0):
+            h = self.loop.call_later(timeout, self.loop.stop)
+            pass
+        self.in_one_op = True
+        try:
+            self.loop.run_forever()
+        finally:
+            self.in_one_op = False
+            if (h != None):
+                h.cancel()
+                pass
+            pass
+        return
+
+    def op_done(self):
+        if (self.in_one_op):
+            self.loop.stop()
+            pass
+        return
+
+    pass
+
+def init_asyncio(loop=None):
+    """Initialize OpenIPMI to run its file descriptors and timers
+    directly in an asyncio event loop.  If loop is None, the current
+    event loop is used.  No separate thread or wait_io() calls are
+    needed, just run the loop.  Returns 0 on success or an errno."""
+    if (loop == None):
+        import asyncio
+        loop = asyncio.get_event_loop()
+        pass
+    return init_loop(_AsyncioLoopHandler(loop))
+%}
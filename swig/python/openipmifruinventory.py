@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+
+# openipmifruinventory.py
+#
+# Collect the FRU inventory of OpenIPMI domains as JSON lines
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+#
+# The domains are read from the GUI's saved preferences file and all
+# opened at once.  As each domain comes up its FRU entities are queued,
+# and the FRUs are fetched with a limit on the reads outstanding
+# overall and per MC.  One record is written per FRU as it arrives.
+
+import os
+import sys
+import time
+import OpenIPMI
+from openipmigui import _domain
+from openipmigui import _saveprefs
+from openipmigui import _selexport
+from openipmigui import _fruinventory
+
+class InventoryHandler:
+    def __init__(self, log_file):
+        self.defaultDomains = [ ]
+        self.pref_taghash = { }
+        self.log_file = log_file
+        return
+
+    def log(self, level, log):
+        self.log_file.write(level + ": " + log + "\n")
+        self.log_file.flush()
+        return
+
+    pass
+
+class DomainInventory:
+    def __init__(self, name, inventory, log_file):
+        self.name = name
+        self.inventory = inventory
+        self.log_file = log_file
+        self.domain_id = None
+        self.closing = False
+        self.done = False
+        self.err = False
+        return
+
+    def conn_change_cb(self, domain, err, connum, portnum, anything_connected):
+        if (err):
+            self.log_file.write(self.name + ": connection error ("
+                                + str(connum) + "," + str(portnum) + "): "
+                                + OpenIPMI.get_error_string(err) + "\n")
+            pass
+        return
+
+    def domain_up_cb(self, domain):
+        count = self.inventory.add_domain(domain, self)
+        self.log_file.write(self.name + ": " + str(count) + " FRUs queued\n")
+        if (count == 0):
+            self.close(domain)
+            pass
+        return
+
+    def inventory_done(self, name):
+        self.domain_id.to_domain(self)
+        return
+
+    def domain_cb(self, domain):
+        self.close(domain)
+        return
+
+    def close(self, domain):
+        if (not self.closing):
+            self.closing = True
+            domain.close(self)
+            pass
+        return
+
+    def domain_close_done_cb(self):
+        self.done = True
+        return
+
+    pass
+
+def usage():
+    print("openipmifruinventory [options]")
+    print("  -p <file>           The preferences file to read domains from")
+    print("  -d <name>           Only collect this domain, may be repeated")
+    print("  -o <file>           Write the records to this file, default is")
+    print("                      standard output")
+    print("  --max <n>           FRU fetches outstanding at once, default 8")
+    print("  --mc-max <n>        FRU fetches outstanding to one MC, default 1")
+    print("  --fetch-timeout <secs>  Give a FRU fetch's slot to another")
+    print("                      after this long, default 60")
+    print("  --timeout <secs>    Give up after this long, default 600")
+    print("  --dmsg, --drawmsg   Enable message debugging")
+    return
+
+def run(args):
+    preffile = os.path.join(os.environ['HOME'], '.openipmigui.startup')
+    log_file = sys.stderr
+    names = None
+    outfile = None
+    max_in_flight = 8
+    mc_max_in_flight = 1
+    fetch_timeout = 60.0
+    timeout = 600.0
+    debug_msg = False
+    debug_rawmsg = False
+
+    # Skip program name.
+    carg = 1
+
+    try:
+        while (carg < len(args)):
+            arg = args[carg]
+            carg += 1
+            if (arg == "--dmsg"):
+                debug_msg = True
+            elif (arg == "--drawmsg"):
+                debug_rawmsg = True
+            elif (arg == '-p'):
+                preffile = args[carg]
+                carg += 1
+            elif (arg == '-d'):
+                if (names == None):
+                    names = [ ]
+                    pass
+                names.append(args[carg])
+                carg += 1
+            elif (arg == '-o'):
+                outfile = args[carg]
+                carg += 1
+            elif (arg == '--max'):
+                max_in_flight = int(args[carg])
+                carg += 1
+                if (max_in_flight < 1):
+                    raise ValueError()
+            elif (arg == '--mc-max'):
+                mc_max_in_flight = int(args[carg])
+                carg += 1
+                if (mc_max_in_flight < 1):
+                    raise ValueError()
+            elif (arg == '--fetch-timeout'):
+                fetch_timeout = float(args[carg])
+                carg += 1
+            elif (arg == '--timeout'):
+                timeout = float(args[carg])
+                carg += 1
+            else:
+                print("Unknown argument: " + arg)
+                usage()
+                return 1
+            pass
+        pass
+    except IndexError:
+        print("No value given for " + arg)
+        usage()
+        return 1
+    except ValueError:
+        print("Invalid value given for " + arg)
+        usage()
+        return 1
+
+    rv = OpenIPMI.init()
+    if (rv != 0):
+        print("Unable to initialize OpenIPMI")
+        return 1
+
+    if (debug_rawmsg):
+        OpenIPMI.enable_debug_rawmsg()
+        pass
+    if (debug_msg):
+        OpenIPMI.enable_debug_msg()
+        pass
+
+    mainhandler = InventoryHandler(log_file)
+    _domain._DomainRestore(mainhandler)
+    _saveprefs.restore(mainhandler, preffile)
+    domains = [ d for d in mainhandler.defaultDomains
+                if ((names == None) or (d[0] in names)) ]
+    if (len(domains) == 0):
+        print("No domains found in " + preffile)
+        return 1
+
+    try:
+        if (outfile == None):
+            f = sys.stdout
+        else:
+            f = open(outfile, "w")
+            pass
+    except EnvironmentError as e:
+        print(str(e))
+        return 1
+
+    OpenIPMI.set_log_handler(mainhandler)
+
+    inventory = _fruinventory.FRUInventory(_selexport.JSONLWriter(f),
+                                           max_in_flight, mc_max_in_flight,
+                                           fetch_timeout)
+
+    # Open them all at once, each domain's FRUs are queued when it is
+    # up and the limiter spreads the fetches across all of them.
+    invs = [ ]
+    for d in domains:
+        inv = DomainInventory(d[0], inventory, log_file)
+        inv.domain_id = OpenIPMI.open_domain3(d[0], [],
+                                              _domain.ConnectionArgs(d[1]),
+                                              inv, inv)
+        if (inv.domain_id == None):
+            log_file.write(d[0] + ": unable to open domain\n")
+            inv.err = True
+            continue
+        invs.append(inv)
+        pass
+
+    timed_out = False
+    end_time = time.time() + timeout
+    while ([ i for i in invs if not i.done ]):
+        if ((not timed_out) and (time.time() >= end_time)):
+            timed_out = True
+            for i in invs:
+                if (not i.closing):
+                    log_file.write(i.name + ": not finished in time\n")
+                    i.err = True
+                    if (i.domain_id.to_domain(i) != 0):
+                        i.done = True
+                        pass
+                    pass
+                pass
+            pass
+        inventory.run()
+        OpenIPMI.wait_io(1000)
+        pass
+
+    if (f != sys.stdout):
+        f.close()
+        pass
+    log_file.write("FRU inventory: " + str(inventory.stats) + "\n")
+    OpenIPMI.shutdown_everything()
+    if ((inventory.stats.failed > 0) or [ i for i in invs if i.err ]
+        or (len(invs) != len(domains))):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv))
@@ -71,6 +71,8 @@ from openipmigui import _domain
 from openipmigui import gui
 from openipmigui import _saveprefs
 from openipmigui import gui_cmdwin
+from openipmigui import _metrics
+from openipmigui import _selarchive
 
 # Used to enable internal debug output
 verbosity = 0
@@ -146,6 +148,9 @@ class TopHandler(Tix.Tk):
         global shutdown_thread
         shutdown_thread = True
         gui_cmdwin._HistorySave(self.ui.mainhandler, self.histfile)
+        if (self.ui.selarchive != None):
+            self.ui.selarchive.close()
+            pass
 
         OpenIPMI.set_log_handler(DummyLogHandler())
         OpenIPMI.shutdown_everything()
@@ -205,6 +210,9 @@ def run(args):
     do_trace = False
     read_preffile = True
     log_file = None
+    metrics_port = None
+    sel_archive = None
+    use_sel_archive = True
 
     # Skip program name.
     carg = 1
@@ -228,6 +236,14 @@ def run(args):
             log_file = sys.stdout
         elif (arg == "-n"):
             read_preffile = False
+        elif (arg == "--metrics-port"):
+            metrics_port = int(args[carg])
+            carg += 1
+        elif (arg == "--sel-archive"):
+            sel_archive = args[carg]
+            carg += 1
+        elif (arg == "--no-sel-archive"):
+            use_sel_archive = False
         elif (arg == '-p'):
             if (len(args) == 0):
                 print("No argument given for -p")
@@ -311,6 +327,18 @@ def run(args):
     ui = gui.IPMIGUI(top, mainhandler)
     mainhandler.SetUI(ui)
 
+    if (use_sel_archive):
+        if (sel_archive == None):
+            sel_archive = _selarchive.default_path(preffile)
+            pass
+        ui.selarchive = _selarchive.open_archive(sel_archive)
+        pass
+
+    if (metrics_port != None):
+        # Localhost only, use openipmipoller to serve other addresses
+        _metrics.start_server(ui.metrics, metrics_port)
+        pass
+
     OpenIPMI.add_domain_change_handler(mainhandler)
     OpenIPMI.set_log_handler(mainhandler)
 
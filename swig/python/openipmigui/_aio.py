@@ -0,0 +1,361 @@
+# _aio.py
+#
+# asyncio coroutine wrappers for the OpenIPMI callback-object API
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+# Every OpenIPMI operation works the same way: convert an id to the
+# real object with to_xxx(handler), start the operation from the
+# xxx_cb method, then wait for a completion method on the handler to
+# be called.  The classes here do that with an asyncio future, so
+# operations can be awaited, given timeouts, and fanned out with
+# asyncio.gather().
+#
+# The completion callbacks may come from the loop's own thread (when
+# using OpenIPMI.init_asyncio()) or from a separate OpenIPMI driver
+# thread, both are handled.  Note that OpenIPMI operations cannot
+# really be cancelled; on a timeout or cancellation the result is
+# just thrown away when it arrives.
+
+import asyncio
+import threading
+import OpenIPMI
+
+class OpError(Exception):
+    def __init__(self, op, err):
+        self.op = op
+        self.err = err
+    def __repr__(self):
+        return "OpError(" + repr(self.op) + ", " + repr(self.err) + ")"
+    def __str__(self):
+        return self.op + ": " + OpenIPMI.get_error_string(self.err)
+
+class ThresholdReading:
+    def __init__(self, raw_set, raw, value_set, value, states):
+        self.raw_set = raw_set
+        self.raw = raw
+        self.value_set = value_set
+        self.value = value
+        self.states = states
+        return
+
+    pass
+
+class DiscreteReading:
+    def __init__(self, states):
+        self.states = states
+        return
+
+    pass
+
+class AioOp:
+    """Base for a single OpenIPMI operation.  Subclasses start the
+    operation from their xxx_cb method and call done() or fail() from
+    the completion callback."""
+
+    def __init__(self, name, loop=None):
+        if (loop == None):
+            loop = asyncio.get_event_loop()
+            pass
+        self.name = name
+        self.loop = loop
+        self.thread = threading.current_thread()
+        self.future = loop.create_future()
+        self.err = 0
+        return
+
+    def _set(self, val, err):
+        if (self.future.done()):
+            # Timed out or cancelled, nobody cares any more.
+            return
+        if (err):
+            self.future.set_exception(OpError(self.name, err))
+        else:
+            self.future.set_result(val)
+            pass
+        return
+
+    def _complete(self, val, err):
+        if (threading.current_thread() is self.thread):
+            self._set(val, err)
+        else:
+            self.loop.call_soon_threadsafe(self._set, val, err)
+            pass
+        return
+
+    def done(self, val=None):
+        self._complete(val, 0)
+        return
+
+    def fail(self, err):
+        self._complete(None, err)
+        return
+
+    def start(self, rv):
+        """Handle the return value from to_xxx(); if that or the
+        operation start failed, fail the operation."""
+        if (rv == 0):
+            rv = self.err
+            pass
+        if (rv != 0):
+            self.fail(rv)
+            pass
+        return
+
+    async def wait(self, timeout=None):
+        if (timeout == None):
+            return await self.future
+        return await asyncio.wait_for(self.future, timeout)
+
+    pass
+
+class SensorRead(AioOp):
+    def __init__(self, sensor_id, loop=None):
+        AioOp.__init__(self, "sensor read", loop)
+        self.start(sensor_id.to_sensor(self))
+        return
+
+    def sensor_cb(self, sensor):
+        self.err = sensor.get_value(self)
+        return
+
+    def threshold_reading_cb(self, sensor, err, raw_set, raw, value_set,
+                             value, states):
+        if (err):
+            self.fail(err)
+            return
+        self.done(ThresholdReading(raw_set, raw, value_set, value, states))
+        return
+
+    def discrete_states_cb(self, sensor, err, states):
+        if (err):
+            self.fail(err)
+            return
+        self.done(DiscreteReading(states))
+        return
+
+    pass
+
+class SensorGetThresholds(AioOp):
+    def __init__(self, sensor_id, loop=None):
+        AioOp.__init__(self, "sensor get thresholds", loop)
+        self.start(sensor_id.to_sensor(self))
+        return
+
+    def sensor_cb(self, sensor):
+        self.err = sensor.get_thresholds(self)
+        return
+
+    def sensor_get_thresholds_cb(self, sensor, err, th):
+        if (err):
+            self.fail(err)
+            return
+        self.done(th)
+        return
+
+    pass
+
+class SensorSetThresholds(AioOp):
+    def __init__(self, sensor_id, thresholds, loop=None):
+        AioOp.__init__(self, "sensor set thresholds", loop)
+        self.thresholds = thresholds
+        self.start(sensor_id.to_sensor(self))
+        return
+
+    def sensor_cb(self, sensor):
+        self.err = sensor.set_thresholds(self.thresholds, self)
+        return
+
+    def sensor_set_thresholds_cb(self, sensor, err):
+        if (err):
+            self.fail(err)
+            return
+        self.done()
+        return
+
+    pass
+
+class ControlGetVal(AioOp):
+    def __init__(self, control_id, loop=None):
+        AioOp.__init__(self, "control get value", loop)
+        self.start(control_id.to_control(self))
+        return
+
+    def control_cb(self, control):
+        self.err = control.get_val(self)
+        return
+
+    def control_get_val_cb(self, control, err, vals):
+        if (err):
+            self.fail(err)
+            return
+        self.done(vals)
+        return
+
+    pass
+
+class ControlSetVal(AioOp):
+    def __init__(self, control_id, vals, loop=None):
+        AioOp.__init__(self, "control set value", loop)
+        self.vals = vals
+        self.start(control_id.to_control(self))
+        return
+
+    def control_cb(self, control):
+        self.err = control.set_val(self.vals, self)
+        return
+
+    def control_set_val_cb(self, control, err):
+        if (err):
+            self.fail(err)
+            return
+        self.done()
+        return
+
+    pass
+
+class MCSendCommand(AioOp):
+    def __init__(self, mc_id, lun, netfn, cmd, data, loop=None):
+        AioOp.__init__(self, "MC send command", loop)
+        self.lun = lun
+        self.netfn = netfn
+        self.cmd = cmd
+        self.data = data
+        self.start(mc_id.to_mc(self))
+        return
+
+    def mc_cb(self, mc):
+        self.err = mc.send_command(self.lun, self.netfn, self.cmd, self.data,
+                                   self)
+        return
+
+    def mc_cmd_cb(self, mc, netfn, cmd, rsp):
+        # The completion code is in rsp[0], that's the caller's problem.
+        self.done(rsp)
+        return
+
+    pass
+
+class MCRereadSel(AioOp):
+    def __init__(self, mc_id, loop=None):
+        AioOp.__init__(self, "MC reread SEL", loop)
+        self.start(mc_id.to_mc(self))
+        return
+
+    def mc_cb(self, mc):
+        self.err = mc.reread_sel(self)
+        return
+
+    def mc_reread_sel_cb(self, mc, err):
+        if (err):
+            self.fail(err)
+            return
+        self.done()
+        return
+
+    pass
+
+class DomainRereadSels(AioOp):
+    def __init__(self, domain_id, loop=None):
+        AioOp.__init__(self, "domain reread SELs", loop)
+        self.start(domain_id.to_domain(self))
+        return
+
+    def domain_cb(self, domain):
+        self.err = domain.reread_sels(self)
+        return
+
+    def domain_reread_sels_cb(self, domain, err):
+        if (err):
+            self.fail(err)
+            return
+        self.done()
+        return
+
+    pass
+
+class AsyncSensor:
+    def __init__(self, sensor_id, loop=None):
+        self.sensor_id = sensor_id
+        self.loop = loop
+        return
+
+    async def read(self, timeout=None):
+        return await SensorRead(self.sensor_id, self.loop).wait(timeout)
+
+    async def get_thresholds(self, timeout=None):
+        op = SensorGetThresholds(self.sensor_id, self.loop)
+        return await op.wait(timeout)
+
+    async def set_thresholds(self, thresholds, timeout=None):
+        op = SensorSetThresholds(self.sensor_id, thresholds, self.loop)
+        return await op.wait(timeout)
+
+    pass
+
+class AsyncControl:
+    def __init__(self, control_id, loop=None):
+        self.control_id = control_id
+        self.loop = loop
+        return
+
+    async def get_val(self, timeout=None):
+        return await ControlGetVal(self.control_id, self.loop).wait(timeout)
+
+    async def set_val(self, vals, timeout=None):
+        op = ControlSetVal(self.control_id, vals, self.loop)
+        return await op.wait(timeout)
+
+    pass
+
+class AsyncMC:
+    def __init__(self, mc_id, loop=None):
+        self.mc_id = mc_id
+        self.loop = loop
+        return
+
+    async def send_command(self, lun, netfn, cmd, data, timeout=None):
+        op = MCSendCommand(self.mc_id, lun, netfn, cmd, data, self.loop)
+        return await op.wait(timeout)
+
+    async def reread_sel(self, timeout=None):
+        return await MCRereadSel(self.mc_id, self.loop).wait(timeout)
+
+    pass
+
+class AsyncDomain:
+    def __init__(self, domain_id, loop=None):
+        self.domain_id = domain_id
+        self.loop = loop
+        return
+
+    async def reread_sels(self, timeout=None):
+        return await DomainRereadSels(self.domain_id, self.loop).wait(timeout)
+
+    pass
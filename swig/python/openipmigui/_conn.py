@@ -31,8 +31,7 @@
 #
 
 import OpenIPMI
-from openipmigui import gui_popup
-from openipmigui import gui_SoL
+from openipmigui import _metrics
 
 class Port:
     def __init__(self, domain, c, pnum):
@@ -40,6 +39,9 @@ class Port:
         self.pnum = pnum
         self.ui = c.ui
         self.name = c.d.name + "(" + str(c.cnum) + "." + str(pnum) + ")"
+        self.metric_labels = _metrics.labels([ ("domain", c.d.name),
+                                               ("connection", c.cnum),
+                                               ("port", pnum) ])
 
         c.ports[pnum] = self
 
@@ -61,6 +63,7 @@ class Port:
         return
 
     def remove(self):
+        self.ui.metrics.remove(self)
         self.c = None
         self.ui = None
         return
@@ -85,6 +88,8 @@ class Port:
                 pass
             pass
         self.up = up
+        self.ui.metrics.set(self, self.c.d.name, "openipmi_connection_port_up",
+                            self.metric_labels, up != 0)
         return
 
     def IsUp(self):
@@ -118,6 +123,10 @@ class Connection:
             pass
 
         self.ui.add_connection(d, self)
+        self.metric_labels = _metrics.labels([ ("domain", d.name),
+                                               ("connection", cnum) ])
+        self.ui.metrics.set(self, d.name, "openipmi_connection_active",
+                            self.metric_labels, self.active_str == "active")
         self.ui.set_item_text(self.treeroot,
                               (domain.get_connection_type(cnum)
                                + " (" + self.active_str + ")"))
@@ -135,6 +144,7 @@ class Connection:
         return
 
     def remove(self):
+        self.ui.metrics.remove(self)
         self.ui = None
         for p in self.ports.values():
             p.remove()
@@ -156,6 +166,7 @@ class Connection:
             pass
         if (err == OpenIPMI.enoent):
             self.ui.remove_port(self.ports[port])
+            self.ports[port].remove()
             del self.ports[port];
             return
         
@@ -184,6 +195,7 @@ class Connection:
         return self.conup
     
     def HandleMenu(self, event):
+        from openipmigui import gui_popup
         gui_popup.popup(self.ui, event,
                         [ [ "Activate", self.Activate ],
                           [ "Open SOL", self.OpenSOL ] ])
@@ -195,6 +207,7 @@ class Connection:
         return
 
     def OpenSOL(self, event):
+        from openipmigui import gui_SoL
         gui_SoL.SoL(self.ui, self.domain_id, self.cnum)
         return
     
@@ -218,6 +231,10 @@ class Connection:
 
             if (new_active_str != self.active_str):
                 self.active_str = new_active_str
+                self.ui.metrics.set(self, self.d.name,
+                                    "openipmi_connection_active",
+                                    self.metric_labels,
+                                    self.active_str == "active")
                 self.ui.set_item_text(self.treeroot,
                                       (domain.get_connection_type(self.cnum)
                                        + " (" + self.active_str + ")"))
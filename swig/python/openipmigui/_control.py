@@ -31,24 +31,45 @@
 #
 
 import OpenIPMI
-from openipmigui import gui_popup
-from openipmigui import gui_setdialog
-from openipmigui import gui_lightset
 
 class ControlRefreshData:
+    # Reads go through the GUI's request limiter, which calls
+    # start_request() when the MC has room for another read.
     def __init__(self, c):
         self.c = c
+        self.limiter = c.ui.limiter
         return
 
+    def start_request(self):
+        return self.c.control_id.to_control(self)
+
     def control_cb(self, control):
         if (self.c.control_type == OpenIPMI.CONTROL_IDENTIFIER):
-            control.identifier_get_val(self.c)
+            rv = control.identifier_get_val(self)
         elif (self.c.setting_light):
-            control.get_light(self.c)
+            rv = control.get_light(self)
         else:
-            control.get_val(self.c)
+            rv = control.get_val(self)
+            pass
+        if (rv):
+            self.limiter.done(self, rv)
             pass
         return
+
+    def control_get_val_cb(self, control, err, vals):
+        self.limiter.done(self, err)
+        self.c.control_get_val_cb(control, err, vals)
+        return
+
+    def control_get_id_cb(self, control, err, val):
+        self.limiter.done(self, err)
+        self.c.control_get_id_cb(control, err, val)
+        return
+
+    def control_get_light_cb(self, control, err, vals):
+        self.limiter.done(self, err)
+        self.c.control_get_light_cb(control, err, vals)
+        return
     
     pass
 
@@ -58,6 +79,7 @@ class ControlSet:
         return
 
     def HandleMenu(self, event):
+        from openipmigui import gui_popup
         if (self.c.impt_data == None):
             ml = [ [ "Add to watch values", self.c.add_impt ] ]
             pass
@@ -71,6 +93,7 @@ class ControlSet:
         return
 
     def modval(self, event):
+        from openipmigui import gui_setdialog
         vals = self.c.vals
         while (len(vals) < self.c.num_vals):
             vals.append(0)
@@ -118,6 +141,7 @@ class LightSet:
         return
 
     def HandleMenu(self, event):
+        from openipmigui import gui_popup
         if (self.c.impt_data == None):
             ml = [ [ "Add to watch values", self.c.add_impt ] ]
             pass
@@ -129,6 +153,7 @@ class LightSet:
         return
 
     def modval(self, event):
+        from openipmigui import gui_lightset
         gui_lightset.LightSet("Set Light Values for " + self.c.name,
                               self.c.num_vals, self.c.lights, self.c.vals,
                               self);
@@ -154,8 +179,14 @@ class Control:
         self.control_id = control.get_id()
         self.ui = e.ui;
         self.updater = ControlRefreshData(self)
+        mc = control.get_mc()
+        self.mc_key = mc.get_name()
+        self.conn_key = mc.get_domain().get_name()
         self.vals = [ ]
         self.ui.add_control(self.e, self)
+        self.ui.index.set(self, kind="control", domain=e.d.name,
+                          name=self.name, type=self.control_type_str,
+                          entity=e.name, mc=self.mc_key)
         self.control_type = control.get_type()
         self.destroyed = False
         if (self.control_type == OpenIPMI.CONTROL_IDENTIFIER):
@@ -257,11 +288,12 @@ class Control:
 
     def DoUpdate(self):
         if (self.is_readable):
-            self.control_id.to_control(self.updater)
+            self.ui.limiter.submit(self.mc_key, self.conn_key, self.updater)
             pass
         return
 
     def HandleMenu(self, event):
+        from openipmigui import gui_popup
         if (self.setter != None):
             self.setter.HandleMenu(event)
             pass
@@ -328,6 +360,8 @@ class Control:
     def remove(self):
         self.e.controls.pop(self.name)
         self.ui.remove_control(self)
+        self.ui.index.remove(self)
+        self.ui.limiter.cancel(self.updater)
         self.destroyed = True
         self.e = None
         self.updater = None
@@ -30,16 +30,15 @@
 #  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
 #
 
-from openipmigui import gui_popup
-from openipmigui import gui_setdialog
 import OpenIPMI
 from openipmigui import _entity
 from openipmigui import _mc
 from openipmigui import _saveprefs
-from openipmigui import _sel
-from openipmigui import _fru
 from openipmigui import _conn
 from openipmigui import _oi_logging
+from openipmigui import _metrics
+from openipmigui import _selstream
+from openipmigui import _frucache
 
 class InvalidDomainError(Exception):
     def __init__(self, value):
@@ -100,6 +99,7 @@ class DomainRefreshData:
 
 class DomainFRUDevidGet:
     def __init__(self, d):
+        from openipmigui import gui_setdialog
         self.d = d;
         gui_setdialog.SetDialog("FRU Information Device ID for" + str(d),
                                 [ True, str(0x20), str(0), str(0), str(0),
@@ -131,18 +131,15 @@ class DomainFRUDevidGet:
         return
 
     def domain_cb(self, domain):
-        self.fru = domain.fru_alloc(int(self.is_logical), self.ipmb,
-                                    self.devid, self.lun, self.private_bus,
-                                    self.channel, self)
-        if (self.fru == None):
-            self.err = OpenIPMI.einval
-            pass
-        else:
-            self.err = 0
-            pass
+        self.fru = None
+        self.err = self.d.fru_cache.fetch(domain, int(self.is_logical),
+                                          self.ipmb, self.devid, self.lun,
+                                          self.private_bus, self.channel,
+                                          self)
         return
 
     def fru_fetched(self, domain, fru, err):
+        from openipmigui import _fru
         s = str(self.d) + "(" + str(self.is_logical) + ", "
         s += str(self.ipmb) + ", "
         s += str(self.devid) + ", "
@@ -153,7 +150,8 @@ class DomainFRUDevidGet:
             self.d.ui.new_log("Error fetching FRU iformation for " + s +
                               ": " + OpenIPMI.get_error_string(err))
             return
-        _fru.FruInfoDisplay(fru, s)
+        self.fru = fru
+        _fru.FruInfoDisplay(fru, s, self.d.fru_cache)
         return
 
     pass
@@ -173,10 +171,12 @@ class DomainSelSet(DomainRefreshData):
         return
 
     def HandleMenu(self, event):
+        from openipmigui import gui_popup
         gui_popup.popup(self.d.ui, event, [ [ "Modify Value", self.modval ] ])
         return
 
     def modval(self, event):
+        from openipmigui import gui_setdialog
         self.init = True
         self.d.domain_id.to_domain(self)
         gui_setdialog.SetDialog("Set SEL Rescan Time for " + str(self.d),
@@ -221,10 +221,12 @@ class DomainIPMBSet(DomainRefreshData):
         return
 
     def HandleMenu(self, event):
+        from openipmigui import gui_popup
         gui_popup.popup(self.d.ui, event, [ [ "Modify Value", self.modval ] ])
         return
 
     def modval(self, event):
+        from openipmigui import gui_setdialog
         self.init = True
         self.d.domain_id.to_domain(self)
         gui_setdialog.SetDialog("Set IPMB Rescan Time for " + str(self.d),
@@ -318,10 +320,13 @@ class Domain:
         self.mcs = { }
         self.connections = { }
         self.domain_id = domain.get_id()
+        self.sel_subs = _selstream.SELSubscriptions()
+        self.fru_cache = _frucache.FRUCache()
         
         mainhandler.domains[name] = self
         
         self.ui.add_domain(self)
+        self.ui.index.set(self, kind="domain", domain=name, name=name)
 
         self.refreshers = [ ]
         self.add_refr_item("SEL Count", DomainRefreshData(self, "sel_count"))
@@ -335,6 +340,9 @@ class Domain:
         self.first_conn = False
         self.any_con_up = False
         self.ui.incr_item_critical(self.treeroot)
+        self.metric_labels = _metrics.labels([ ("domain", self.name) ])
+        self.ui.metrics.set(self, self.name, "openipmi_domain_up",
+                            self.metric_labels, False)
 
         domain.add_connect_change_handler(self)
         return
@@ -362,12 +370,18 @@ class Domain:
         return
 
     def HandleMenu(self, event):
-        gui_popup.popup(self.ui, event,
-                        [ [ "Close",        self.CloseMenuHandler ],
-                          [ "Reread SELs",  self.RereadSelsHandler ],
-                          [ "Display SELs", self.DisplaySelsHandler ],
-                          [ "Rescan IPMB",  self.RescanIPMBHandler ],
-                          [ "Fetch FRU Info", self.FetchFruInfoHandler ] ])
+        from openipmigui import gui_popup
+        l = [ [ "Close",        self.CloseMenuHandler ],
+              [ "Reread SELs",  self.RereadSelsHandler ],
+              [ "Display SELs", self.DisplaySelsHandler ],
+              [ "Export SELs",  self.ExportSelsHandler ] ]
+        if (self.ui.selarchive != None):
+            l.append([ "Display Archived SELs",
+                       self.DisplayArchivedSelsHandler ])
+            pass
+        l.append([ "Rescan IPMB",  self.RescanIPMBHandler ])
+        l.append([ "Fetch FRU Info", self.FetchFruInfoHandler ])
+        gui_popup.popup(self.ui, event, l)
         return
 
     def FetchFruInfoHandler(self, event):
@@ -384,7 +398,20 @@ class Domain:
         return
 
     def DisplaySelsHandler(self, event):
-        _sel.DomainSELDisplay(self.domain_id)
+        from openipmigui import _sel
+        _sel.DomainSELDisplay(self.domain_id, self.sel_subs)
+        return
+
+    def ExportSelsHandler(self, event):
+        from openipmigui import _selexport
+        _selexport.ExportDialog(self)
+        return
+
+    def DisplayArchivedSelsHandler(self, event):
+        from openipmigui import _sel
+        _sel.ArchiveSELDisplay(self.ui.selarchive,
+                               "Archived SEL for " + self.name,
+                               domain=self.name)
         return
 
     def RescanIPMBHandler(self, event):
@@ -432,6 +459,8 @@ class Domain:
                 pass
             pass
         self.any_con_up = any_con_up
+        self.ui.metrics.set(self, self.name, "openipmi_domain_up",
+                            self.metric_labels, any_con_up)
         return
 
     def domain_iter_connection_cb(self, domain, conn):
@@ -441,6 +470,7 @@ class Domain:
     def connected(self, domain):
         domain.add_entity_update_handler(self)
         domain.add_mc_update_handler(self)
+        domain.add_event_handler(self.sel_subs)
         return
 
     def find_or_create_entity(self, entity):
@@ -507,6 +537,9 @@ class Domain:
             pass
         del self.mainhandler.domains[self.name]
         self.ui.remove_domain(self)
+        self.ui.metrics.remove_domain(self.name)
+        self.ui.index.remove_domain(self.name)
+        self.fru_cache.clear()
         for c in self.connections.values():
             c.remove()
             pass
@@ -549,27 +582,32 @@ class DomainInfoSetup:
             pass
         return
 
+def ConnectionArgs(attrhashes):
+    """Convert the saved connection attributes of a domain into the
+    connection arguments for opening it."""
+    connects = [ ]
+    for attrhash in attrhashes:
+        if ("contype" not in attrhash):
+            continue
+        args = OpenIPMI.alloc_empty_args(str(attrhash["contype"]))
+        if (args == None):
+            continue
+        for attr in attrhash.items():
+            vname = str(attr[0])
+            if (vname == "contype"):
+                continue
+            value = str(attr[1])
+            args.set_val(0, vname, value)
+            pass
+        connects.append(args)
+        pass
+    return connects
+
 def RestoreDomains(mainhandler):
     for i in mainhandler.defaultDomains:
         name = i[0]
-        attrhashes = i[1]
+        connects = ConnectionArgs(i[1])
         other = i[2]
-        connects = [ ]
-        for attrhash in attrhashes:
-            if ("contype" not in attrhash):
-                continue
-            args = OpenIPMI.alloc_empty_args(str(attrhash["contype"]))
-            if (args == None):
-                continue
-            for attr in attrhash.items():
-                vname = str(attr[0])
-                if (vname == "contype"):
-                    continue
-                value = str(attr[1])
-                args.set_val(0, vname, value)
-                pass
-            connects.append(args)
-            pass
         domain_id = OpenIPMI.open_domain3(name, [], connects, None, None)
         if (domain_id != None):
             DomainInfoSetup(other, domain_id)
@@ -34,9 +34,7 @@ import OpenIPMI
 from openipmigui import _oi_logging
 from openipmigui import _sensor
 from openipmigui import _control
-from openipmigui import _fru
-from openipmigui import gui_popup
-from openipmigui import gui_setdialog
+from openipmigui import _metrics
 
 class EntityOp:
     def __init__(self, e, func):
@@ -64,10 +62,30 @@ class EntityFruViewer:
         return
 
     def entity_cb(self, entity):
-        fru = entity.get_fru()
-        if (fru == None):
+        self.fru = entity.get_fru()
+        if (self.fru == None):
             return
-        _fru.FruInfoDisplay(fru, str(self.e))
+        self.is_logical = entity.get_is_logical_fru()
+        self.addr = entity.get_access_address()
+        self.devid = entity.get_fru_device_id()
+        self.lun = entity.get_lun()
+        self.private_bus = entity.get_private_bus_id()
+        self.channel = entity.get_channel()
+        self.e.d.domain_id.to_domain(self)
+        return
+
+    def domain_cb(self, domain):
+        # Show the entity's own copy, the library keeps it current.
+        # It replaces any cached copy of the same device, so an older
+        # one can not be handed out after this one is edited.
+        from openipmigui import _fru
+        cache = self.e.d.fru_cache
+        if (self.is_logical):
+            cache.seed(cache.key(domain, self.addr, self.devid, self.lun,
+                                 self.private_bus, self.channel),
+                       self.fru)
+            pass
+        _fru.FruInfoDisplay(self.fru, str(self.e), cache)
         return
 
     pass
@@ -110,6 +128,7 @@ class ActivationTimeSetter:
         return
 
     def entity_hot_swap_get_time_cb(self, entity, err, time):
+        from openipmigui import gui_setdialog
         if (err):
             _oi_logging.error("Error getting activation time: " + str(err))
             return
@@ -131,6 +150,7 @@ class Entity:
         self.sensors = { }
         self.controls = { }
         self.children = { }
+        self.item_text = { }
         entity.add_presence_handler(self)
         entity.add_hot_swap_handler(self)
         entity.add_sensor_update_handler(self)
@@ -146,6 +166,8 @@ class Entity:
         self.eeop = "fparent"
         entity.iterate_parents(self)
         self.ui.add_entity(self.d, self, parent=self.parent)
+        self.ui.index.set(self, kind="entity", domain=d.name, name=self.name,
+                          entity=self.name, entity_id=self.entity_id_str)
         if (self.parent != None):
             self.parent.children[self.name] = self.name
             self.parent_name = self.parent.name
@@ -178,6 +200,7 @@ class Entity:
         return self.name
 
     def HandleMenu(self, event):
+        from openipmigui import gui_popup
         if (self.impt_data == None):
             menul = [ [ "Add to watch values", self.add_impt ] ]
             pass
@@ -279,15 +302,13 @@ class Entity:
             pass
 
         if (reparent):
-            old_treeroot = self.treeroot
-            self.eop = "deleted"
-            entity.iterate_sensors(self)
-            entity.iterate_controls(self)
-
+            # Only the entity's own subtree moves, the sensors,
+            # controls and child entities under it go along unchanged.
             if (self.parent_name):
                 oparent = self.d.find_entity_byname(self.parent_name)
                 if (oparent):
-                    del oparent.children[self.name]
+                    oparent.children.pop(self.name, None)
+                    pass
                 pass
             self.ui.reparent_entity(self.d, self, self.parent)
             if (self.parent != None):
@@ -297,25 +318,6 @@ class Entity:
             else:
                 self.parent_name = None
                 pass
-            self.create_my_items()
-
-            # Reparent children
-            self.eeop = "repch"
-            entity.iterate_children(self);
-            
-            self.eop = "added"
-            entity.iterate_sensors(self)
-            entity.iterate_controls(self)
-
-            if (entity.is_present()):
-                self.ui.set_item_active(self.treeroot);
-                pass
-            else:
-                self.ui.set_item_inactive(self.treeroot);
-                pass
-
-            self.eop = None
-            self.ui.remove_entity(old_treeroot)
             pass
         
         self.parent = None # Kill circular reference
@@ -329,7 +331,7 @@ class Entity:
             eid = self.entity_id_str
             pass
         if (eid != None):
-            self.ui.set_item_text(self.treeroot, eid)
+            self.set_text(self.treeroot, eid)
             pass
 
         self.entity_type = entity.get_type()
@@ -362,28 +364,39 @@ class Entity:
                 pass
             pass
 
+        self.ui.index.set(self, type=self.entity_type, mc=self.mc_name)
+
         self.supports_auto_activate = entity.supports_auto_activate_time()
         self.supports_auto_deactivate = entity.supports_auto_deactivate_time()
 
         # Fill in the various value in the GUI
-        self.ui.set_item_text(self.typeitem, self.entity_type)
-        self.ui.set_item_text(self.idstringitem, self.id_str)
-        self.ui.set_item_text(self.psatitem,
-                           str(entity.get_presence_sensor_always_there() != 0))
+        self.set_text(self.typeitem, self.entity_type)
+        self.set_text(self.idstringitem, self.id_str)
+        self.set_text(self.psatitem,
+                      str(entity.get_presence_sensor_always_there() != 0))
         if (self.slot_number != None):
-            self.ui.set_item_text(self.slotnumitem, str(self.slot_number))
+            self.set_text(self.slotnumitem, str(self.slot_number))
             pass
-        self.ui.set_item_text(self.mcitem, self.mc_name)
-        self.ui.set_item_text(self.hotswapitem,
-                              self.hot_swap + ' ' + self.hot_swap_state)
+        self.set_text(self.mcitem, self.mc_name)
+        self.set_text(self.hotswapitem,
+                      self.hot_swap + ' ' + self.hot_swap_state)
+        return
+
+    def set_text(self, item, text):
+        # Changed is called for every entity update, only touch the
+        # rows whose value is really different.
+        if (item in self.item_text) and (self.item_text[item] == text):
+            return
+        self.item_text[item] = text
+        self.ui.set_item_text(item, text)
         return
 
     def entity_hot_swap_update_cb(self, entity, old_state, new_state, event):
         if (self.destroyed):
             return
         self.hot_swap_state = new_state
-        self.ui.set_item_text(self.hotswapitem,
-                              self.hot_swap + ' ' + self.hot_swap_state)
+        self.set_text(self.hotswapitem,
+                      self.hot_swap + ' ' + self.hot_swap_state)
         return OpenIPMI.EVENT_NOT_HANDLED
     
     def entity_hot_swap_cb(self, entity, err, state):
@@ -393,8 +406,8 @@ class Entity:
             _oi_logging.error("Error getting entity hot-swap state: " + str(err))
             return
         self.hot_swap_state = state
-        self.ui.set_item_text(self.hotswapitem,
-                              self.hot_swap + ' ' + self.hot_swap_state)
+        self.set_text(self.hotswapitem,
+                      self.hot_swap + ' ' + self.hot_swap_state)
         return
     
     def mc_cb(self, mc):
@@ -406,26 +419,13 @@ class Entity:
             self.parent_id = e2.get_id()
             self.parent = self.d.find_or_create_entity(e2)
             pass
-        elif (self.eeop == "repch"):
-            ch_e = self.d.find_entity_byname(e2.get_name())
-            if (ch_e):
-                ch_e.parent_id = None
-                ch_e.Changed(e2)
-                pass
-            pass
         return
 
-    def entity_iter_sensors_cb(self, entity, sensor):
-        self.entity_sensor_update_cb(self.eop, entity, sensor)
-        return
-    
-    def entity_iter_controls_cb(self, entity, control):
-        self.entity_control_update_cb(self.eop, entity, control)
-        return
-    
     def remove(self):
         self.d.entities.pop(self.name)
         self.ui.remove_entity(self)
+        self.ui.metrics.remove(self)
+        self.ui.index.remove(self)
         self.destroyed = True
         self.d = None
         self.ui = None
@@ -469,6 +469,10 @@ class Entity:
         else:
             self.ui.set_item_inactive(self.treeroot)
             pass
+        self.ui.metrics.set(self, self.d.name, "openipmi_entity_present",
+                            _metrics.labels([ ("domain", self.d.name),
+                                              ("entity", self.name) ]),
+                            present != 0)
         return
 
     def entity_fru_update_werr_cb(self, op, err, entity, fru):
@@ -35,6 +35,18 @@ from openipmigui import _oi_logging
 from openipmigui import gui_treelist
 from openipmigui import gui_popup
 from openipmigui import gui_setdialog
+from openipmigui import _fruinventory
+
+def format_bytes(data):
+    """Hex text for raw FRU data, eight bytes to a line."""
+    data = bytearray(data)
+    return "\n".join([ " ".join([ "0x%2.2x" % v for v in data[i:i+8] ])
+                       for i in range(0, len(data), 8) ])
+
+def parse_bytes(text):
+    """Raw data from hex text like format_bytes() makes, raises
+    ValueError if it is not valid."""
+    return bytes(bytearray([ int(v, 16) for v in text.split() ]))
 
 class ReinitOnAny:
     def __init__(self, glist):
@@ -45,7 +57,7 @@ class ReinitOnAny:
         oldval = int(s_oldval)
         newval = int(s_newval)
         if (oldval != newval):
-            self.glist.refresh()
+            self.glist.patch_fields(data)
             return True
         return False
 
@@ -60,7 +72,7 @@ class ReinitOnZero:
         oldval = int(s_oldval)
         newval = int(s_newval)
         if (oldval != newval) and ((oldval == 0) or (newval == 0)):
-            self.glist.refresh()
+            self.glist.patch_fields(data)
             return True
         return False
 
@@ -82,6 +94,9 @@ class FRUData:
             pass
         self.reiniter = reiniter
         self.settable = settable
+        # Subnode contents are only fetched when the entry is opened.
+        self.subnode = None
+        self.loaded = True
         if (ptype == "binary") or (ptype == "unicode"):
             self.longtext = True
             pass
@@ -145,11 +160,21 @@ class FRUData:
         return
     
     def ok(self, vals):
-        rv = self.node.set_field(self.aidx, self.ptype, str(vals[0]))
+        if (self.ptype == "binary") or (self.ptype == "unicode"):
+            try:
+                data = parse_bytes(str(vals[0]))
+            except ValueError:
+                self.glist.SetError("Invalid data value: " + str(vals[0]))
+                return
+            rv = self.node.set_field_bytes(self.aidx, self.ptype, data)
+        else:
+            rv = self.node.set_field(self.aidx, self.ptype, str(vals[0]))
+            pass
         if (rv != 0):
             self.glist.SetError("Invalid data value: "
                                 + OpenIPMI.get_error_string(rv))
             return
+        self.glist.field_changed(self)
         try:
             if (self.reiniter != None):
                 if self.reiniter.reinit(self, self.currval, vals[0]):
@@ -159,18 +184,14 @@ class FRUData:
         except:
             pass
         
-        name_s = [ "" ]
-        type_s = [ "" ]
-        value_s = [ "" ]
-        node_s = [ None ]
-        rv = self.node.get_field(self.aidx, name_s, type_s, value_s, node_s)
-        if (rv != 0):
-            self.glist.SetError("Could not re-get field: "
-                                + OpenIPMI.get_error_string(rv))
+        fields = _fruinventory.FRUFieldList()
+        self.node.get_fields(self.aidx, 1, fields)
+        if (len(fields.fields) == 0):
+            self.glist.SetError("Could not re-get field")
             return
 
-        self.glist.cleanup_field(type_s[0], value_s)
-        self.currval = value_s[0]
+        (i, name, type, value, node) = fields.fields[0]
+        self.currval = self.glist.field_text(type, value)
         self.glist.SetColumn(self.item, self.currval, 1)
         return
     
@@ -199,6 +220,7 @@ class FRUData:
             self.glist.SetError("Could not toggle value: "
                                 + OpenIPMI.get_error_string(rv))
             return
+        self.glist.field_changed(self)
         self.currval = newval
         self.glist.SetColumn(self.item, newval, 1)
         return
@@ -257,7 +279,9 @@ class ArrayFRUData(FRUData):
         return
     
     def add_element(self, event):
+        self.glist.LoadNode(self)
         self.node.set_field(self.aidx, "integer", str(self.length))
+        self.glist.field_changed(self)
         self.redisplay_item(self.length)
         self.length += 1
         return
@@ -268,6 +292,7 @@ class ArrayFRUData(FRUData):
             self.glist.SetError("Could not delete item: "
                                 + OpenIPMI.get_error_string(rv))
             return
+        self.glist.field_changed(self)
         self.glist.Remove(child.item)
         del self.children[child.aidx]
         self.reidx_children()
@@ -280,6 +305,7 @@ class ArrayFRUData(FRUData):
             self.glist.SetError("Could not insert item: "
                                 + OpenIPMI.get_error_string(rv))
             return
+        self.glist.field_changed(self)
         self.redisplay_item(child.aidx, child.item)
         self.reidx_children()
         self.length += 1
@@ -288,8 +314,14 @@ class ArrayFRUData(FRUData):
     pass
 
 class FruInfoDisplay(gui_treelist.TreeList):
-    def __init__(self, fru, name):
+    def __init__(self, fru, name, cache=None):
         self.fru = fru
+        # The FRU may be shared through the cache, it is edited in
+        # place, so the cached copy is dropped if it is changed.
+        self.cache = cache
+        # The fields edited since the FRU was read.  The edits are
+        # only kept in memory until save writes them all at once.
+        self.dirty = { }
         name_s = [ "" ]
         node_s = [ None ]
         rv = fru.get_root_node(name_s, node_s)
@@ -302,16 +334,23 @@ class FruInfoDisplay(gui_treelist.TreeList):
         gui_treelist.TreeList.__init__(self, "FRU info for " + name,
                                        ".",
                                        [("Name", 300), ("Value", 300)])
+        self.stree.configure(opencmd=self.TreeOpen, closecmd=self.TreeClose)
 
         self.add_fru_data(self.treeroot, node_s[0], 0, None,
                           self.fru_type == "standard FRU")
         self.AfterDone()
-        self.ExpandItem("")
         return
 
     def do_on_close(self):
+        if (self.dirty and (self.cache != None)):
+            self.cache.invalidate(self.fru)
+            pass
         self.fru = None
         return
+
+    def field_changed(self, data):
+        self.dirty[data] = True
+        return
         
     def cancel(self):
         self.Close()
@@ -326,33 +365,99 @@ class FruInfoDisplay(gui_treelist.TreeList):
         return
     
     def save(self):
+        if (not self.dirty):
+            # Nothing was edited, no need to touch the device.
+            self.Close()
+            return
         self.fru.write(self)
+        if (self.cache != None):
+            self.cache.invalidate(self.fru)
+            pass
+        self.dirty = { }
         self.Close()
         return
 
-    def cleanup_field(self, type, value_s):
-        if (type == "binary"):
-            splitup = value_s[0].split()
-            p = 0
-            value_s[0] = ""
-            if (len(splitup) > 0):
-                value_s[0] += splitup[0]
-                del splitup[0]
-                pass
-            for v in splitup:
-                p += 1
-                if (p >= 8):
-                    value_s[0] += "\n"
-                    p = 0
-                    pass
-                else:
-                    value_s[0] += " "
+    def field_text(self, type, value):
+        # Binary and unicode data comes from the node as raw bytes,
+        # it is only turned into text here for display.
+        if (type == "boolean"):
+            return str(bool(int(value)))
+        elif (type == "binary") or (type == "unicode"):
+            return format_bytes(value)
+        return value
+
+    def patch_fields(self, data):
+        # Changing an offset can add or remove the fields of an area,
+        # only update the node the changed field is in.
+        item = self.tree.info_parent(data.item)
+        if (not item):
+            item = self.treeroot
+            pass
+        self.patch_node(item, data.node, data.parent,
+                        ((item == self.treeroot)
+                         and (self.fru_type == "standard FRU")))
+        return
+
+    def remove_row(self, item):
+        for child in self.tree.info_children(item):
+            self.remove_row(child)
+            pass
+        data = self.treehash[item]
+        if (data != None):
+            data.do_on_close()
+            pass
+        self.Remove(item)
+        return
+
+    def patch_node(self, item, node, parent, normal_top):
+        """Bring the rows under item up to date with node, rows are
+        only added, removed or changed where the fields differ."""
+        rows = { }
+        for child in self.tree.info_children(item):
+            rows[self.treehash[child].aidx] = child
+            pass
+        fields = _fruinventory.FRUFieldList()
+        node.get_fields(0, -1, fields)
+        present = { }
+        for f in fields.fields:
+            present[f[0]] = f
+            pass
+
+        for (i, child) in list(rows.items()):
+            data = self.treehash[child]
+            if ((i in present) and (present[i][2] == data.ptype)):
+                continue
+            if ((i in present) and (present[i][2] == "subnode")
+                and (data.subnode != None)):
+                # The type shown for an array is its element type
+                continue
+            self.remove_row(child)
+            del rows[i]
+            pass
+
+        for (i, name, type, value, sub_node) in fields.fields:
+            if (i in rows):
+                data = self.treehash[rows[i]]
+                if (type == "subnode"):
+                    if (isinstance(data, ArrayFRUData)):
+                        data.length = int(value)
+                        pass
+                    continue
+                text = self.field_text(type, value)
+                if (text != data.currval):
+                    data.currval = text
+                    self.SetColumn(data.item, text, 1)
                     pass
-                value_s[0] += v
+                continue
+            before = None
+            later = [ j for j in rows.keys() if j > i ]
+            if (len(later) > 0):
+                before = rows[min(later)]
                 pass
+            self.add_fru_data(item, node, i, parent, normal_top, i, before)
             pass
         return
-    
+
     def refresh(self):
         name_s = [ "" ]
         node_s = [ None ]
@@ -362,69 +467,126 @@ class FruInfoDisplay(gui_treelist.TreeList):
             return
 
         self.fru_type = name_s[0]
+        opened = [ ]
+        self.find_opened(self.treeroot, [ ], opened)
         self.RemoveAll()
         self.add_fru_data(self.treeroot, node_s[0], 0, None,
                           self.fru_type == "standard FRU")
         self.AfterDone()
-        self.ExpandItem("")
+        for names in opened:
+            self.reopen(names)
+            pass
+        return
+
+    def find_opened(self, item, names, opened):
+        # Remember the open entries by name, the keys change on a refresh.
+        for child in self.tree.info_children(item):
+            if (self.stree.getmode(child) == "close"):
+                cnames = names + [ self.GetColumn(child, 0) ]
+                opened.append(cnames)
+                self.find_opened(child, cnames, opened)
+                pass
+            pass
+        return
+
+    def reopen(self, names):
+        item = self.treeroot
+        for name in names:
+            found = None
+            for child in self.tree.info_children(item):
+                if (self.GetColumn(child, 0) == name):
+                    found = child
+                    break
+                pass
+            if (found == None):
+                return
+            item = found
+            pass
+        if (self.stree.getmode(item) == "open"):
+            self.stree.open(item)
+            pass
+        return
+
+    def LoadNode(self, data):
+        if (data.loaded):
+            return
+        data.loaded = True
+        if (isinstance(data, ArrayFRUData)):
+            parent = data
+        else:
+            parent = None
+            pass
+        self.add_fru_data(data.item, data.subnode, 0, parent, False)
+        return
+
+    def TreeOpen(self, path):
+        # Replaces the default Tix open command, fetch the subnode
+        # the first time it is opened, then show the children.
+        data = self.treehash[path]
+        if (data != None):
+            self.LoadNode(data)
+            pass
+        for child in self.tree.info_children(path):
+            self.tree.show_entry(child)
+            pass
+        return
+
+    def TreeClose(self, path):
+        for child in self.tree.info_children(path):
+            self.tree.hide_entry(child)
+            pass
         return
     
     def add_fru_data(self, item, node, startidx, parent, normal_top,
                      endidx=-1, before=None):
-        i = startidx
-        while True:
-            name_s = [ "" ]
-            type_s = [ "" ]
-            value_s = [ "" ]
-            node_s = [ None ]
-            rv = node.get_field(i, name_s, type_s, value_s, node_s)
-            if (rv == OpenIPMI.einval):
-                return
-            if (type_s[0] == "boolean"):
-                value_s[0] = str(bool(int(value_s[0])))
-            # Ignore other errors, just keep going
-            if (rv == 0):
-                if (name_s[0] == None):
-                    name_s[0] = str(i)
+        if (endidx >= 0):
+            count = endidx - startidx + 1
+        else:
+            count = -1
+            pass
+        # Fetch the whole range in one call, fields that could not be
+        # fetched are skipped.
+        fields = _fruinventory.FRUFieldList()
+        node.get_fields(startidx, count, fields)
+        for (i, name, type, value, sub_node) in fields.fields:
+            if (name == ""):
+                name = str(i)
+                pass
+            if (type == "subnode"):
+                if (node.settable(i) == 0) and (value != "-1"):
+                    # A settable array
+                    data = ArrayFRUData(self, node, i, sub_node,
+                                        name, sub_node.get_subtype(),
+                                        int(value), parent, True)
                     pass
-                if (type_s[0] == "subnode"):
-                    np = None
-                    if (node.settable(i) == 0) and (value_s[0] != "-1"):
-                        # A settable array
-                        data = ArrayFRUData(self, node, i, node_s[0],
-                                            name_s[0], node_s[0].get_subtype(),
-                                            int(value_s[0]), parent, True)
-                        np = data
-                        pass
-                    else:
-                        data = FRUData(self, node, i, name_s[0], type_s[0],
-                                       None, parent, node.settable(i) == 0,
-                                       False)
-                        pass
-                    sub = self.add_data(item, name_s[0], [], data,
-                                        before=before)
-                    self.add_fru_data(sub, node_s[0], 0, np, False)
                 else:
-                    reiniter = None
-                    if (normal_top):
-                        if (name_s[0] == "multi_record_offset"):
-                            reiniter = ReinitOnAny(self)
-                            pass
-                        elif name_s[0].endswith("_offset"):
-                            reiniter = ReinitOnZero(self)
-                            pass
+                    data = FRUData(self, node, i, name, type,
+                                   None, parent, node.settable(i) == 0,
+                                   False)
+                    data.subnode = sub_node
+                    pass
+                sub = self.add_data(item, name, [], data, before=before)
+                if (sub_node != None):
+                    data.loaded = False
+                    self.stree.setmode(sub, "open")
+                    pass
+            else:
+                reiniter = None
+                if (normal_top):
+                    if (name == "multi_record_offset"):
+                        reiniter = ReinitOnAny(self)
+                        pass
+                    elif name.endswith("_offset"):
+                        reiniter = ReinitOnZero(self)
                         pass
-                    self.cleanup_field(type_s[0], value_s)
-                    data = FRUData(self, node, i, name_s[0], type_s[0],
-                                   value_s[0], parent, node.settable(i) == 0,
-                                   reiniter)
-                    self.add_data(item, name_s[0], [value_s[0]], data=data,
-                                  before=before)
                     pass
+                text = self.field_text(type, value)
+                data = FRUData(self, node, i, name, type,
+                               text, parent, node.settable(i) == 0,
+                               reiniter)
+                self.add_data(item, name, [text], data=data,
+                              before=before)
                 pass
-            if (endidx >= 0) and (i == endidx):
-                break
-            i = i + 1
             pass
         return
     
@@ -0,0 +1,305 @@
+# _frucache.py
+#
+# openipmi GUI FRU data cache
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+import OpenIPMI
+
+# Storage commands used to check a cached FRU against the device.
+IPMI_STORAGE_NETFN = 0x0a
+IPMI_GET_FRU_INVENTORY_AREA_INFO_CMD = 0x10
+IPMI_READ_FRU_DATA_CMD = 0x11
+
+FRU_COMMON_HEADER_LEN = 8
+FRU_MULTI_RECORD_HEADER_LEN = 5
+
+# Give up checking (and fetch the FRU) past this many multirecords.
+MAX_CHECKED_MULTI_RECORDS = 32
+
+class MCFinder:
+    def __init__(self, channel, address):
+        self.channel = channel
+        self.address = address
+        self.mc = None
+        return
+
+    def domain_iter_mc_cb(self, domain, mc):
+        mc_id = mc.get_id()
+        if ((mc_id.get_channel() == self.channel)
+            and (mc_id.get_address() == self.address)):
+            self.mc = mc
+            pass
+        return
+
+    pass
+
+class CacheEntry:
+    def __init__(self, fru, validator):
+        self.fru = fru
+        self.validator = validator
+        return
+
+    pass
+
+class FRUCache:
+    """The FRUs fetched from the devices of a domain.  An entry is
+    keyed by the GUID of the MC holding the FRU (or its IPMB address
+    if it has no GUID), the device id, LUN, private bus and channel.
+    Before an entry is used a few bytes are read from the device and
+    compared with the values read when the entry was stored: the FRU
+    area size, the common header, the length and checksum bytes of
+    the chassis, board and product areas, and the multirecord
+    headers (which hold the record checksums).  So a change to the
+    contents of an area is seen even if its layout is the same, at
+    the cost of a handful of small reads instead of the many of a
+    full fetch.  The internal use area has no checksum, changes to
+    it alone are not seen.  Only logical FRUs are cached, there is
+    no cheap check for FRUs on a private bus."""
+
+    def __init__(self):
+        self.entries = { }
+        return
+
+    def key(self, domain, ipmb, devid, lun, private_bus, channel):
+        finder = MCFinder(channel, ipmb)
+        domain.iterate_mcs(finder)
+        guid = None
+        if (finder.mc != None):
+            guid = finder.mc.get_guid()
+            pass
+        if (guid == None):
+            guid = ipmb
+            pass
+        return (guid, devid, lun, private_bus, channel)
+
+    def fetch(self, domain, is_logical, ipmb, devid, lun, private_bus,
+              channel, handler):
+        """Get a FRU, calling handler.fru_fetched(domain, fru, err)
+        when done, like domain.fru_alloc() does.  Must be called from
+        a domain callback.  Returns an error value if nothing could
+        be started."""
+        if (not is_logical):
+            fru = domain.fru_alloc(0, ipmb, devid, lun, private_bus,
+                                   channel, handler)
+            if (fru == None):
+                return OpenIPMI.einval
+            return 0
+        key = self.key(domain, ipmb, devid, lun, private_bus, channel)
+        return FRUCheck(self, key, domain, ipmb, devid, lun, private_bus,
+                        channel, handler).start(domain)
+
+    def store(self, key, fru, validator):
+        self.entries[key] = CacheEntry(fru, validator)
+        return
+
+    def seed(self, key, fru):
+        """Make fru, a copy fetched elsewhere, the entry for key.  It
+        was not checked against the device here, so it is never
+        handed out by fetch(), but it replaces an older copy of the
+        same device and is dropped by invalidate() like any other."""
+        self.store(key, fru, None)
+        return
+
+    def lookup(self, key, validator):
+        if (key not in self.entries):
+            return None
+        entry = self.entries[key]
+        if ((entry.validator == None) or (entry.validator != validator)):
+            del self.entries[key]
+            return None
+        return entry.fru
+
+    def invalidate(self, fru):
+        """Drop the entry holding fru, called when the FRU is written
+        or was changed in memory without being written."""
+        for (key, entry) in list(self.entries.items()):
+            if (entry.fru is fru):
+                del self.entries[key]
+                pass
+            pass
+        return
+
+    def clear(self):
+        self.entries = { }
+        return
+
+    pass
+
+class FRUCheck:
+    """Read the bytes a cache entry is checked with (see FRUCache),
+    then use the cached FRU if they still match or fetch a new one.
+    Any error reading them just means the FRU is fetched."""
+    def __init__(self, cache, key, domain, ipmb, devid, lun, private_bus,
+                 channel, handler):
+        self.cache = cache
+        self.key = key
+        self.addr = "ipmb " + str(channel) + " " + str(ipmb)
+        self.ipmb = ipmb
+        self.devid = devid
+        self.lun = lun
+        self.private_bus = private_bus
+        self.channel = channel
+        self.handler = handler
+        self.fru = None
+        self.by_words = 0
+        self.parts = [ ]
+        self.areas = [ ]
+        self.area_offset = 0
+        self.mr_offset = 0
+        self.mr_count = 0
+        self.validator = None
+        return
+
+    def start(self, domain):
+        return domain.send_command_addr(self.addr, self.lun,
+                                        IPMI_STORAGE_NETFN,
+                                        IPMI_GET_FRU_INVENTORY_AREA_INFO_CMD,
+                                        [ self.devid ], self)
+
+    def read(self, domain, offset, count, then):
+        # Devices accessed by words need an even offset and count
+        self.skip = offset & self.by_words
+        self.want = count
+        self.then = then
+        offset -= self.skip
+        count += self.skip
+        wcount = (count + self.by_words) >> self.by_words
+        offset >>= self.by_words
+        rv = domain.send_command_addr(self.addr, self.lun,
+                                      IPMI_STORAGE_NETFN,
+                                      IPMI_READ_FRU_DATA_CMD,
+                                      [ self.devid, offset & 0xff,
+                                        offset >> 8, wcount ], self)
+        if (rv):
+            self.fetch(domain)
+            pass
+        return
+
+    def domain_addr_cmd_cb(self, domain, addr, lun, netfn, cmd, data):
+        if ((len(data) < 1) or (data[0] != 0)):
+            self.fetch(domain)
+            return
+        if (cmd == IPMI_GET_FRU_INVENTORY_AREA_INFO_CMD):
+            if (len(data) < 4):
+                self.fetch(domain)
+                return
+            self.by_words = data[3] & 1
+            self.parts.append(data[1] | (data[2] << 8))
+            self.read(domain, 0, FRU_COMMON_HEADER_LEN, self.got_header)
+            return
+
+        got = data[2+self.skip:2+self.skip+self.want]
+        if (len(got) != self.want):
+            self.fetch(domain)
+            return
+        self.then(domain, got)
+        return
+
+    def got_header(self, domain, header):
+        if ((sum(header) & 0xff) != 0):
+            self.fetch(domain)
+            return
+        self.parts.append(tuple(header))
+        # Chassis, board and product areas, they have a length byte
+        # after the version and end in a checksum.
+        self.areas = [ header[i] * 8 for i in (2, 3, 4) if (header[i]) ]
+        self.mr_offset = header[5] * 8
+        self.next_area(domain)
+        return
+
+    def next_area(self, domain):
+        if (len(self.areas) > 0):
+            self.area_offset = self.areas.pop(0)
+            self.read(domain, self.area_offset + 1, 1, self.got_area_length)
+        elif (self.mr_offset):
+            self.read(domain, self.mr_offset, FRU_MULTI_RECORD_HEADER_LEN,
+                      self.got_mr_header)
+        else:
+            self.checked(domain)
+            pass
+        return
+
+    def got_area_length(self, domain, data):
+        if (data[0] == 0):
+            self.fetch(domain)
+            return
+        self.parts.append(data[0])
+        self.read(domain, self.area_offset + (data[0] * 8) - 1, 1,
+                  self.got_area_checksum)
+        return
+
+    def got_area_checksum(self, domain, data):
+        self.parts.append(data[0])
+        self.next_area(domain)
+        return
+
+    def got_mr_header(self, domain, header):
+        if ((sum(header) & 0xff) != 0):
+            self.fetch(domain)
+            return
+        self.parts.append(tuple(header))
+        self.mr_count += 1
+        if (header[1] & 0x80):
+            # End of list
+            self.mr_offset = 0
+        elif (self.mr_count >= MAX_CHECKED_MULTI_RECORDS):
+            self.fetch(domain)
+            return
+        else:
+            self.mr_offset += FRU_MULTI_RECORD_HEADER_LEN + header[2]
+            pass
+        self.next_area(domain)
+        return
+
+    def checked(self, domain):
+        self.validator = tuple(self.parts)
+        fru = self.cache.lookup(self.key, self.validator)
+        if (fru != None):
+            self.handler.fru_fetched(domain, fru, 0)
+            return
+        self.fetch(domain)
+        return
+
+    def fetch(self, domain):
+        self.fru = domain.fru_alloc(1, self.ipmb, self.devid, self.lun,
+                                    self.private_bus, self.channel, self)
+        if (self.fru == None):
+            self.handler.fru_fetched(domain, None, OpenIPMI.einval)
+            pass
+        return
+
+    def fru_fetched(self, domain, fru, err):
+        if ((not err) and (self.validator != None)):
+            self.cache.store(self.key, fru, self.validator)
+            pass
+        self.handler.fru_fetched(domain, fru, err)
+        return
+
+    pass
@@ -0,0 +1,309 @@
+# _fruinventory.py
+#
+# openipmi FRU inventory collection
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+import time
+import OpenIPMI
+from openipmigui import _limiter
+
+# Prefixes of the standard FRU fields, and the part of the record the
+# field goes in.
+areas = (("chassis_info_", "chassis"),
+         ("board_info_", "board"),
+         ("product_info_", "product"))
+
+class FRUFieldList:
+    """Collects the fields of a FRU node from get_fields()."""
+    def __init__(self):
+        self.fields = [ ]
+        return
+
+    def fru_node_field_cb(self, index, name, type, value, node):
+        self.fields.append( (index, name, type, value, node) )
+        return
+
+    pass
+
+def field_value(type, value, sub_node):
+    """Convert a FRU node field to a plain value.  Binary and unicode
+    data (raw bytes from the node) become lists of byte values,
+    subnodes become lists (arrays) or dictionaries."""
+    if (type == "integer") or (type == "time"):
+        return int(value)
+    elif (type == "boolean"):
+        return bool(int(value))
+    elif (type == "float"):
+        return float(value)
+    elif (type == "binary") or (type == "unicode"):
+        return list(bytearray(value))
+    elif (type == "subnode"):
+        if (sub_node == None):
+            return None
+        if (value != "-1"):
+            return [ v for (name, v) in node_values(sub_node) ]
+        return dict(node_values(sub_node))
+    return value
+
+def node_values(node):
+    """The (name, value) pairs of a FRU node, fields that can not be
+    fetched (like ones in a missing area) are left out."""
+    fields = FRUFieldList()
+    node.get_fields(0, -1, fields)
+    return [ (name, field_value(type, value, sub_node))
+             for (i, name, type, value, sub_node) in fields.fields ]
+
+def fru_record(fru):
+    """Normalize a fetched FRU into a dictionary with the chassis,
+    board and product area fields, the multirecords, and everything
+    else in "fields"."""
+    rec = { "chassis" : { }, "board" : { }, "product" : { },
+            "multirecords" : [ ], "fields" : { } }
+    name_s = [ "" ]
+    node_s = [ None ]
+    rv = fru.get_root_node(name_s, node_s)
+    if (rv):
+        rec["error"] = OpenIPMI.get_error_string(rv)
+        return rec
+    rec["fru_type"] = name_s[0]
+    for (name, value) in node_values(node_s[0]):
+        if (name == "multirecords"):
+            rec["multirecords"] = value
+            continue
+        dest = rec["fields"]
+        for (prefix, area) in areas:
+            if (name.startswith(prefix)):
+                dest = rec[area]
+                name = name[len(prefix):]
+                break
+            pass
+        dest[name] = value
+        pass
+    return rec
+
+class InventoryStats:
+    def __init__(self):
+        self.start = time.time()
+        self.end = None
+        self.domains = 0
+        self.frus = 0
+        self.fetched = 0
+        self.failed = 0
+        self.total_fetch_time = 0.0
+        self.max_fetch_time = 0.0
+        return
+
+    def elapsed(self):
+        if (self.end == None):
+            return time.time() - self.start
+        return self.end - self.start
+
+    def fetch_done(self, fetch_time, err):
+        if (err):
+            self.failed += 1
+        else:
+            self.fetched += 1
+            self.total_fetch_time += fetch_time
+            if (fetch_time > self.max_fetch_time):
+                self.max_fetch_time = fetch_time
+                pass
+            pass
+        return
+
+    def __str__(self):
+        elapsed = self.elapsed()
+        if (elapsed > 0):
+            rate = self.fetched / elapsed
+        else:
+            rate = 0.0
+            pass
+        if (self.fetched > 0):
+            avg = self.total_fetch_time / self.fetched
+        else:
+            avg = 0.0
+            pass
+        return ("domains=%d frus=%d fetched=%d failed=%d in %.1fs"
+                " (%.2f FRUs/s) fetch avg=%.3fs max=%.3fs"
+                % (self.domains, self.frus, self.fetched, self.failed,
+                   elapsed, rate, avg, self.max_fetch_time))
+
+    pass
+
+class FRUFetch:
+    """A FRU read for the request limiter."""
+    def __init__(self, dinv, entity):
+        self.dinv = dinv
+        self.entity_name = entity.get_name()
+        self.is_logical = entity.get_is_logical_fru()
+        self.address = entity.get_access_address()
+        self.device_id = entity.get_fru_device_id()
+        self.lun = entity.get_lun()
+        self.private_bus = entity.get_private_bus_id()
+        self.channel = entity.get_channel()
+        self.mc = "%d.%x" % (self.channel, self.address)
+        self.start_time = None
+        self.fru = None
+        self.finished = False
+        return
+
+    def device(self):
+        return { "logical" : bool(self.is_logical),
+                 "address" : self.address,
+                 "device_id" : self.device_id,
+                 "lun" : self.lun,
+                 "private_bus" : self.private_bus,
+                 "channel" : self.channel }
+
+    def start_request(self):
+        self.start_time = time.time()
+        self.err = OpenIPMI.einval
+        rv = self.dinv.domain_id.to_domain(self)
+        if (rv == 0):
+            rv = self.err
+            pass
+        if (rv):
+            self.finish(None, rv)
+            pass
+        return rv
+
+    def domain_cb(self, domain):
+        self.fru = domain.fru_alloc(self.is_logical, self.address,
+                                    self.device_id, self.lun,
+                                    self.private_bus, self.channel, self)
+        if (self.fru == None):
+            self.err = OpenIPMI.einval
+        else:
+            self.err = 0
+            pass
+        return
+
+    def fru_fetched(self, domain, fru, err):
+        self.dinv.inventory.limiter.done(self, err)
+        self.finish(fru, err)
+        return
+
+    def finish(self, fru, err):
+        if (self.finished):
+            return
+        self.finished = True
+        self.fru = None
+        self.dinv.fetch_done(self, fru, err)
+        return
+
+    pass
+
+class DomainInventory:
+    def __init__(self, inventory, domain, handler):
+        self.inventory = inventory
+        self.domain_id = domain.get_id()
+        self.name = domain.get_name()
+        self.handler = handler
+        self.fetches = [ ]
+        self.outstanding = 0
+        return
+
+    def domain_iter_entity_cb(self, domain, entity):
+        if (entity.is_fru()):
+            self.fetches.append(FRUFetch(self, entity))
+            pass
+        return
+
+    def fetch_done(self, fetch, fru, err):
+        rec = { "domain" : self.name,
+                "entity" : fetch.entity_name,
+                "device" : fetch.device() }
+        if (err):
+            rec["error"] = OpenIPMI.get_error_string(err)
+        else:
+            rec.update(fru_record(fru))
+            pass
+        self.inventory.record(rec, time.time() - fetch.start_time, err)
+        self.outstanding -= 1
+        if ((self.outstanding == 0) and (self.handler != None)):
+            self.handler.inventory_done(self.name)
+            pass
+        return
+
+    pass
+
+class FRUInventory:
+    """Fetch the FRUs of every FRU entity in the domains given to it,
+    with at most max_in_flight fetches outstanding overall and
+    mc_max_in_flight to any one MC.  A record is written to w as each
+    FRU comes in.  run() must be called periodically, like the
+    request limiter it uses."""
+    def __init__(self, w, max_in_flight=8, mc_max_in_flight=1,
+                 timeout=60.0):
+        self.w = w
+        self.limiter = _limiter.RequestLimiter(mc_max_in_flight,
+                                               max_in_flight,
+                                               rate=1000.0,
+                                               burst=max_in_flight,
+                                               timeout=timeout)
+        self.stats = InventoryStats()
+        self.outstanding = 0
+        return
+
+    def add_domain(self, domain, handler=None):
+        """Queue the FRUs of the domain, must be called in a domain
+        callback.  handler.inventory_done(name) is called when the
+        last one is written.  Returns the number of FRUs queued."""
+        dinv = DomainInventory(self, domain, handler)
+        domain.iterate_entities(dinv)
+        self.stats.domains += 1
+        self.stats.frus += len(dinv.fetches)
+        dinv.outstanding = len(dinv.fetches)
+        self.outstanding += len(dinv.fetches)
+        for fetch in dinv.fetches:
+            # All the fetches share one connection key, that limit is
+            # the overall one.
+            self.limiter.submit(dinv.name + "/" + fetch.mc, "inventory",
+                                fetch)
+            pass
+        return len(dinv.fetches)
+
+    def record(self, rec, fetch_time, err):
+        self.outstanding -= 1
+        self.stats.fetch_done(fetch_time, err)
+        self.w.write(rec)
+        self.w.flush()
+        if (self.outstanding == 0):
+            self.stats.end = time.time()
+            pass
+        return
+
+    def busy(self):
+        return self.outstanding > 0
+
+    def run(self):
+        self.limiter.run()
+        return
+
+    pass
@@ -0,0 +1,225 @@
+# _history.py
+#
+# Compact reading history with rollups for the OpenIPMI GUI
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+import time
+from array import array
+
+# Default sizes: about 10 minutes of raw readings at the fastest poll
+# rate, a day of 1 minute rollups and 30 days of 1 hour rollups.
+default_raw_size = 300
+default_rollups = ( (60, 1440), (3600, 720) )
+
+class Ring:
+    """Up to size rows kept in array('d') columns.  The columns grow
+    as rows come in, so a sensor that has few readings costs little.
+    Once full, new rows overwrite the oldest ones.  Column 0 is
+    always the time, rows must be added in time order."""
+    def __init__(self, size, ncols):
+        self.size = size
+        self.cols = [ ]
+        for i in range(0, ncols):
+            self.cols.append(array('d'))
+            pass
+        self.start = 0
+        self.count = 0
+        return
+
+    def __len__(self):
+        return self.count
+
+    def append(self, row):
+        if (self.count < self.size):
+            # Not full yet, start is still 0 so the row goes on the end
+            for i in range(0, len(self.cols)):
+                self.cols[i].append(row[i])
+                pass
+            self.count += 1
+            return
+        idx = self.start
+        self.start = (self.start + 1) % self.size
+        for i in range(0, len(self.cols)):
+            self.cols[i][idx] = row[i]
+            pass
+        return
+
+    def row(self, i):
+        idx = (self.start + i) % self.size
+        return tuple([ c[idx] for c in self.cols ])
+
+    def time(self, i):
+        return self.cols[0][(self.start + i) % self.size]
+
+    def find(self, t):
+        # Index of the first row at or after time t
+        lo = 0
+        hi = self.count
+        while (lo < hi):
+            mid = (lo + hi) // 2
+            if (self.time(mid) < t):
+                lo = mid + 1
+            else:
+                hi = mid
+                pass
+            pass
+        return lo
+
+    def rows(self, start=None, end=None):
+        if (start == None):
+            i = 0
+        else:
+            i = self.find(start)
+            pass
+        while (i < self.count):
+            r = self.row(i)
+            if (end != None) and (r[0] > end):
+                break
+            yield r
+            i += 1
+            pass
+        return
+
+    pass
+
+class Rollup:
+    """Min/max/average of the readings in fixed size time buckets.
+    Rows are (bucket start, min, max, sum, count); the bucket being
+    filled is kept apart until a reading for a later bucket comes
+    in."""
+    def __init__(self, period, size):
+        self.period = period
+        self.ring = Ring(size, 5)
+        self.cur = None
+        return
+
+    def add(self, t, vmin, vmax, vsum, count):
+        """Fold a reading, or an already rolled up row, into the
+        rollup.  Returns the row that got completed, if any."""
+        bucket = t - (t % self.period)
+        done = None
+        if (self.cur != None) and (self.cur[0] != bucket):
+            done = tuple(self.cur)
+            self.ring.append(done)
+            self.cur = None
+            pass
+        if (self.cur == None):
+            self.cur = [ bucket, vmin, vmax, vsum, count ]
+        else:
+            if (vmin < self.cur[1]):
+                self.cur[1] = vmin
+                pass
+            if (vmax > self.cur[2]):
+                self.cur[2] = vmax
+                pass
+            self.cur[3] += vsum
+            self.cur[4] += count
+            pass
+        return done
+
+    def rows(self, start=None, end=None):
+        if (start != None):
+            # Include the bucket that start falls in
+            start -= start % self.period
+            pass
+        for r in self.ring.rows(start, end):
+            yield r
+            pass
+        if (self.cur != None):
+            if (((start == None) or (self.cur[0] >= start))
+                and ((end == None) or (self.cur[0] <= end))):
+                yield tuple(self.cur)
+                pass
+            pass
+        return
+
+    pass
+
+class History:
+    """Reading history for one sensor: the raw readings plus rollups
+    at coarser resolutions, each feeding the next one."""
+    def __init__(self, raw_size=None, rollups=None):
+        if (raw_size == None):
+            raw_size = default_raw_size
+            pass
+        if (rollups == None):
+            rollups = default_rollups
+            pass
+        self.raw = Ring(raw_size, 2)
+        self.rollups = [ ]
+        for (period, size) in rollups:
+            self.rollups.append(Rollup(period, size))
+            pass
+        return
+
+    def add(self, value, now=None):
+        if (now == None):
+            now = time.time()
+            pass
+        self.raw.append((now, value))
+        row = (now, value, value, value, 1)
+        for r in self.rollups:
+            row = r.add(*row)
+            if (row == None):
+                break
+            pass
+        return
+
+    def resolutions(self):
+        return [ 0 ] + [ r.period for r in self.rollups ]
+
+    def last(self):
+        if (len(self.raw) == 0):
+            return None
+        return self.raw.row(len(self.raw) - 1)
+
+    def query(self, start=None, end=None, resolution=0):
+        """Return the history between start and end (times in
+        seconds, None for no limit).  With resolution 0 the raw
+        readings come back as (time, value) tuples.  Otherwise the
+        coarsest rollup no coarser than resolution seconds is used,
+        and rows are (bucket start, min, max, average) tuples."""
+        if (end != None) and (start != None) and (end < start):
+            return [ ]
+        use = None
+        for r in self.rollups:
+            if (r.period <= resolution):
+                use = r
+                pass
+            pass
+        if (use == None):
+            return list(self.raw.rows(start, end))
+        rv = [ ]
+        for (t, vmin, vmax, vsum, count) in use.rows(start, end):
+            rv.append((t, vmin, vmax, vsum / count))
+            pass
+        return rv
+
+    pass
@@ -0,0 +1,247 @@
+# _index.py
+#
+# Secondary index over the domain objects for searching
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+import re
+import fnmatch
+
+# The fields every indexed object may have.  Sensors and controls use
+# the name of their entity and MC, MCs carry the ids from Get Device
+# ID so they can be joined against with "mc.<field>".
+fields = ("kind", "domain", "name", "type", "entity", "entity_id", "mc",
+          "severity", "units", "product_id", "manufacturer_id")
+
+numeric_fields = ("product_id", "manufacturer_id")
+
+kinds = ("domain", "entity", "mc", "sensor", "control")
+
+severity_names = ("ok", "warning", "severe", "critical")
+
+def is_pattern(v):
+    return isinstance(v, str) and (("*" in v) or ("?" in v) or ("[" in v))
+
+def convert_value(field, v):
+    if (field in numeric_fields) and (not isinstance(v, int)):
+        return int(v, 0)
+    return v
+
+def parse_query(text):
+    """Convert a filter string into a criteria dictionary.  The string
+    is a list of field=value terms, a value may be a comma separated
+    list of alternatives and may use shell wildcards.  A term without
+    an "=" matches names containing it.  Terms on MC fields are
+    written as mc.field=value and match objects on those MCs.  Raises
+    ValueError on a bad term."""
+    criteria = { }
+    for term in text.split():
+        if ("=" in term):
+            (field, value) = term.split("=", 1)
+            field = field.strip().lower()
+        else:
+            field = "name"
+            value = "*" + term + "*"
+            pass
+        if (field.startswith("mc.")):
+            check = field[3:]
+        else:
+            check = field
+            pass
+        if (check not in fields):
+            raise ValueError("Unknown filter field: " + field)
+        if (value == ""):
+            raise ValueError("No value given for " + field)
+        values = [ ]
+        for v in value.split(","):
+            if (is_pattern(v)):
+                values.append(v)
+            else:
+                try:
+                    values.append(convert_value(check, v))
+                except ValueError:
+                    raise ValueError("Invalid value for " + field + ": " + v)
+                pass
+            pass
+        if (field in criteria):
+            # Repeated terms must all match, which for a single valued
+            # field means the alternatives common to both.
+            criteria[field] = [ v for v in criteria[field] if v in values ]
+        else:
+            criteria[field] = values
+            pass
+        pass
+    return criteria
+
+class ObjectIndex:
+    """Maps the field values of the domain objects to the objects, so
+    a query only touches the objects it returns.  The objects keep
+    their own entries up to date through set() and remove()."""
+    def __init__(self):
+        self.objs = { }
+        self.by_field = { }
+        for f in fields:
+            self.by_field[f] = { }
+            pass
+        return
+
+    def set(self, obj, **vals):
+        """Add an object or change some of its fields."""
+        if (obj in self.objs):
+            cur = self.objs[obj]
+        else:
+            cur = { }
+            self.objs[obj] = cur
+            pass
+        for (f, v) in vals.items():
+            if (f not in self.by_field):
+                raise ValueError("Unknown index field: " + f)
+            if (f in cur):
+                if (cur[f] == v):
+                    continue
+                self.unlink(f, cur[f], obj)
+                pass
+            if (v == None):
+                cur.pop(f, None)
+                continue
+            cur[f] = v
+            bucket = self.by_field[f].get(v)
+            if (bucket == None):
+                bucket = set()
+                self.by_field[f][v] = bucket
+                pass
+            bucket.add(obj)
+            pass
+        return
+
+    def unlink(self, f, v, obj):
+        bucket = self.by_field[f].get(v)
+        if (bucket != None):
+            bucket.discard(obj)
+            if (len(bucket) == 0):
+                del self.by_field[f][v]
+                pass
+            pass
+        return
+
+    def remove(self, obj):
+        cur = self.objs.pop(obj, None)
+        if (cur == None):
+            return
+        for (f, v) in cur.items():
+            self.unlink(f, v, obj)
+            pass
+        return
+
+    def remove_domain(self, domain):
+        for obj in list(self.by_field["domain"].get(domain, ())):
+            self.remove(obj)
+            pass
+        return
+
+    def get(self, obj, field):
+        cur = self.objs.get(obj)
+        if (cur == None):
+            return None
+        return cur.get(field)
+
+    def __len__(self):
+        return len(self.objs)
+
+    def match(self, field, values):
+        """Return the set of objects whose field matches any of the
+        values."""
+        index = self.by_field[field]
+        result = set()
+        for v in values:
+            if (is_pattern(v)):
+                r = re.compile(fnmatch.translate(v), re.IGNORECASE)
+                for (key, objs) in index.items():
+                    if (r.match(str(key))):
+                        result.update(objs)
+                        pass
+                    pass
+                pass
+            elif (v in index):
+                result.update(index[v])
+                pass
+            pass
+        return result
+
+    def query(self, criteria):
+        """Return the set of objects matching all the criteria, a
+        dictionary from field name to a list of acceptable values as
+        returned by parse_query()."""
+        criteria = dict(criteria)
+        mc_criteria = { }
+        for f in list(criteria.keys()):
+            if (f.startswith("mc.")):
+                mc_criteria[f[3:]] = criteria.pop(f)
+                pass
+            pass
+        if (len(mc_criteria) > 0):
+            mc_criteria["kind"] = [ "mc" ]
+            mcs = [ self.objs[m]["name"] for m in self.query(mc_criteria) ]
+            if ("mc" in criteria):
+                criteria["mc"] = [ m for m in criteria["mc"] if m in mcs ]
+            else:
+                criteria["mc"] = mcs
+                pass
+            pass
+        if (len(criteria) == 0):
+            return set(self.objs.keys())
+
+        # Exact values first and smallest first, so the intersection
+        # shrinks as fast as possible.
+        def cost(f):
+            if ([ v for v in criteria[f] if is_pattern(v) ]):
+                return len(self.objs) + 1
+            index = self.by_field[f]
+            return sum([ len(index.get(v, ())) for v in criteria[f] ])
+        result = None
+        for f in sorted(criteria.keys(), key=cost):
+            if (result == None):
+                result = self.match(f, criteria[f])
+            elif ((len(criteria[f]) == 1)
+                  and (not is_pattern(criteria[f][0]))):
+                bucket = self.by_field[f].get(criteria[f][0], ())
+                result = set([ o for o in result if o in bucket ])
+            else:
+                result = result & self.match(f, criteria[f])
+                pass
+            if (len(result) == 0):
+                break
+            pass
+        return result
+
+    def find(self, text):
+        """Run a filter string, see parse_query()."""
+        return self.query(parse_query(text))
+
+    pass
@@ -0,0 +1,354 @@
+# _limiter.py
+#
+# Per-MC and per-connection limits on outstanding reads
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+import time
+from collections import deque
+from openipmigui import _oi_logging
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last = time.time()
+        return
+
+    def refill(self, now):
+        if (now > self.last):
+            self.tokens += (now - self.last) * self.rate
+            if (self.tokens > self.burst):
+                self.tokens = float(self.burst)
+                pass
+            pass
+        self.last = now
+        return
+
+    def take(self, now):
+        self.refill(now)
+        if (self.tokens < 1.0):
+            return False
+        self.tokens -= 1.0
+        return True
+
+    pass
+
+class LimiterStats:
+    def __init__(self):
+        self.queued = 0
+        self.max_queued = 0
+        self.in_flight = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        return
+
+    def avg_wait(self):
+        if (self.started == 0):
+            return 0.0
+        return self.total_wait / self.started
+
+    def __str__(self):
+        return ("queued=%d (max %d) in_flight=%d started=%d completed=%d"
+                " failed=%d timeouts=%d wait avg=%.3fs max=%.3fs"
+                % (self.queued, self.max_queued, self.in_flight,
+                   self.started, self.completed, self.failed,
+                   self.timeouts, self.avg_wait(), self.max_wait))
+
+    pass
+
+class PendingRequest:
+    def __init__(self, req, mc, conn, now):
+        self.req = req
+        self.mc = mc
+        self.conn = conn
+        self.queued_time = now
+        self.start_time = None
+        self.cancelled = False
+        self.finished = False
+        return
+
+    pass
+
+class RequestLimiter:
+    """Hold back reads so each MC and each connection only has a few
+    outstanding at a time, and each connection only starts so many a
+    second.
+
+    A request is any object with a start_request() method that issues
+    the read and returns 0, or an error if it could not start.  The
+    object must call done() with itself and the callback's error when
+    the read's callback arrives.  Waiting MCs are served round-robin,
+    so one slow MC can not hold up the others.  run() must be called
+    periodically so requests held by the rate limit get started.
+
+    This runs on every read, so nothing here walks all the requests.
+    Each (MC, connection) pair with queued requests is either on its
+    connection's ready list or parked on its MC until one of the MC's
+    reads finishes.  Started requests are kept in the order they
+    started so timeouts come off the front, cancelled and finished
+    ones are just marked and dropped when they get to the front."""
+    def __init__(self, mc_limit=2, conn_limit=8, rate=50.0, burst=20,
+                 timeout=30.0):
+        self.mc_limit = mc_limit
+        self.conn_limit = conn_limit
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.reqs = { }
+        # Queued requests by (mc, conn)
+        self.queues = { }
+        # Per connection, the (mc, conn) keys that may start something
+        self.ready = { }
+        # Per MC, the keys waiting for the MC to get under its limit
+        self.mc_waiting = { }
+        # Keys that are in ready or mc_waiting
+        self.scheduled = set()
+        self.started = deque()
+        self.nqueued = 0
+        self.mc_stats = { }
+        self.conn_stats = { }
+        self.buckets = { }
+        self.in_run = False
+        return
+
+    def get_mc_stats(self, mc):
+        if (mc not in self.mc_stats):
+            self.mc_stats[mc] = LimiterStats()
+            pass
+        return self.mc_stats[mc]
+
+    def get_conn_stats(self, conn):
+        if (conn not in self.conn_stats):
+            self.conn_stats[conn] = LimiterStats()
+            self.buckets[conn] = TokenBucket(self.rate, self.burst)
+            pass
+        return self.conn_stats[conn]
+
+    def pending(self):
+        return self.nqueued > 0
+
+    def make_ready(self, key):
+        conn = key[1]
+        if (conn not in self.ready):
+            self.ready[conn] = deque()
+            pass
+        self.ready[conn].append(key)
+        return
+
+    def submit(self, mc, conn, req):
+        """Queue a request, returns False if it is already queued or
+        outstanding."""
+        if (req in self.reqs):
+            return False
+        now = time.time()
+        p = PendingRequest(req, mc, conn, now)
+        self.reqs[req] = p
+        key = (mc, conn)
+        if (key not in self.queues):
+            self.queues[key] = deque()
+            pass
+        self.queues[key].append(p)
+        if (key not in self.scheduled):
+            self.scheduled.add(key)
+            self.make_ready(key)
+            pass
+        self.nqueued += 1
+        for st in (self.get_mc_stats(mc), self.get_conn_stats(conn)):
+            st.queued += 1
+            if (st.queued > st.max_queued):
+                st.max_queued = st.queued
+                pass
+            pass
+        self.run(now)
+        return True
+
+    def finish(self, p, st_field):
+        p.finished = True
+        mst = self.get_mc_stats(p.mc)
+        cst = self.get_conn_stats(p.conn)
+        for st in (mst, cst):
+            st.in_flight -= 1
+            setattr(st, st_field, getattr(st, st_field) + 1)
+            pass
+        if (p.mc in self.mc_waiting):
+            # The MC has a free slot again
+            for key in self.mc_waiting.pop(p.mc):
+                self.make_ready(key)
+                pass
+            pass
+        return
+
+    def done(self, req, err=0):
+        """Called when the read for req has completed, err is the
+        error the read's callback got."""
+        if (req not in self.reqs):
+            # Timed out already, or never submitted
+            return
+        p = self.reqs[req]
+        if (p.start_time == None):
+            return
+        del self.reqs[req]
+        if (err):
+            self.finish(p, "failed")
+        else:
+            self.finish(p, "completed")
+            pass
+        self.run()
+        return
+
+    def cancel(self, req):
+        """Drop a request that has not started yet."""
+        if (req not in self.reqs):
+            return
+        p = self.reqs[req]
+        if (p.start_time != None):
+            return
+        del self.reqs[req]
+        # Left in its queue, run() drops it when it gets to the front
+        p.cancelled = True
+        self.nqueued -= 1
+        self.get_mc_stats(p.mc).queued -= 1
+        self.get_conn_stats(p.conn).queued -= 1
+        return
+
+    def expire(self, now):
+        # Release slots for reads that never came back
+        while (len(self.started) > 0):
+            p = self.started[0]
+            if (p.finished):
+                self.started.popleft()
+                continue
+            if ((now - p.start_time) < self.timeout):
+                break
+            self.started.popleft()
+            del self.reqs[p.req]
+            self.finish(p, "timeouts")
+            pass
+        return
+
+    def start(self, p, now):
+        mst = self.get_mc_stats(p.mc)
+        cst = self.get_conn_stats(p.conn)
+        wait = now - p.queued_time
+        for st in (mst, cst):
+            st.queued -= 1
+            st.in_flight += 1
+            st.started += 1
+            st.total_wait += wait
+            if (wait > st.max_wait):
+                st.max_wait = wait
+                pass
+            pass
+        self.nqueued -= 1
+        p.start_time = now
+        self.started.append(p)
+        try:
+            rv = p.req.start_request()
+        except Exception as e:
+            _oi_logging.error("Error starting request for " + p.mc
+                              + ": " + str(e))
+            rv = -1
+            pass
+        if (rv):
+            # No callback will come, so no done() either
+            if ((p.req in self.reqs) and (self.reqs[p.req] == p)):
+                del self.reqs[p.req]
+                self.finish(p, "failed")
+                pass
+            pass
+        return
+
+    def run_conn(self, conn, now):
+        rq = self.ready[conn]
+        cst = self.get_conn_stats(conn)
+        bucket = self.buckets[conn]
+        while (len(rq) > 0):
+            if (cst.in_flight >= self.conn_limit):
+                break
+            key = rq[0]
+            q = self.queues[key]
+            while ((len(q) > 0) and q[0].cancelled):
+                q.popleft()
+                pass
+            if (len(q) == 0):
+                rq.popleft()
+                del self.queues[key]
+                self.scheduled.discard(key)
+                continue
+            p = q[0]
+            if (self.get_mc_stats(p.mc).in_flight >= self.mc_limit):
+                rq.popleft()
+                if (p.mc not in self.mc_waiting):
+                    self.mc_waiting[p.mc] = [ ]
+                    pass
+                self.mc_waiting[p.mc].append(key)
+                continue
+            if (not bucket.take(now)):
+                break
+            rq.popleft()
+            q.popleft()
+            if (len(q) > 0):
+                rq.append(key)
+            else:
+                del self.queues[key]
+                self.scheduled.discard(key)
+                pass
+            self.start(p, now)
+            pass
+        return
+
+    def run(self, now=None):
+        """Start whatever the limits allow."""
+        if (self.in_run):
+            # A request completed from inside start_request()
+            return
+        self.in_run = True
+        try:
+            if (now == None):
+                now = time.time()
+                pass
+            self.expire(now)
+            for conn in list(self.ready.keys()):
+                self.run_conn(conn, now)
+                if (len(self.ready[conn]) == 0):
+                    del self.ready[conn]
+                    pass
+                pass
+        finally:
+            self.in_run = False
+            pass
+        return
+
+    pass
@@ -30,12 +30,9 @@
 #  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
 #
 import OpenIPMI
-from openipmigui import gui_popup
-from openipmigui import gui_setdialog
 from openipmigui import _oi_logging
-from openipmigui import _sel
-from openipmigui import _mc_chan
-from openipmigui import _mc_pefparm
+from openipmigui import _sched
+from openipmigui import _selarchive
 
 class MCOpHandler:
     def __init__(self, m, func, handler=None, boolval=None):
@@ -121,11 +118,13 @@ class MCSelSet:
         return
 
     def HandleMenu(self, event):
+        from openipmigui import gui_popup
         gui_popup.popup(self.m.ui, event,
                         [ ("Modify Value", self.modval) ])
         return
 
     def modval(self, event):
+        from openipmigui import gui_setdialog
         self.init = True
         self.m.mc_id.to_mc(self)
 
@@ -158,6 +157,20 @@ class MCSelSet:
 
     pass
 
+class MCArchiveDisplay:
+    def __init__(self, m):
+        self.m = m
+        return
+
+    def mc_cb(self, mc):
+        from openipmigui import _sel
+        _sel.ArchiveSELDisplay(self.m.ui.selarchive,
+                               "Archived SEL for " + self.m.name,
+                               key=_selarchive.mc_key(self.m.d.name, mc))
+        return
+
+    pass
+
 class PEFLockClearer:
     def __init__(self, mc):
         self.pef = mc.get_pef(self)
@@ -178,6 +191,9 @@ class MC:
         d.mcs[self.name] = self
         self.ui = d.ui;
         self.ui.add_mc(self.d, self)
+        self.ui.index.set(self, kind="mc", domain=d.name, name=self.name,
+                          mc=self.name, product_id=mc.product_id(),
+                          manufacturer_id=mc.manufacturer_id())
         mc.add_active_handler(self)
         self.has_sel = (mc.sel_device_support() != 0)
         self.event_gen = (mc.ipmb_event_generator_support() != 0)
@@ -245,6 +261,27 @@ class MC:
         # Check for PEF capability, send a Get PEF Capabilities cmd
         self.has_pef = False
         mc.send_command(0, 4, 0x10, [ ], self)
+
+        self.archiver = None
+        if (self.ui.selarchive != None):
+            self.archiver = _selarchive.MCArchiver(self.ui.selarchive, self)
+            self.ui.sched.add(self.treeroot + ".A", self.archiver,
+                              _sched.PRIO_WATCHED, _selarchive.sync_period,
+                              _selarchive.sync_period)
+            mc.add_fully_up_handler(self)
+            pass
+        return
+
+    def mc_fully_up_cb(self, mc):
+        if (self.archiver != None):
+            self.archiver.mc_cb(mc)
+            pass
+        return
+
+    def mc_reread_sel_cb(self, mc, err):
+        if (err == 0) and (self.archiver != None):
+            self.archiver.mc_cb(mc)
+            pass
         return
 
     def mc_cmd_cb(self, mc, netfn, cmd, rsp):
@@ -269,6 +306,11 @@ class MC:
     def remove(self):
         self.d.mcs.pop(self.name)
         self.ui.remove_mc(self)
+        self.ui.index.remove(self)
+        if (self.archiver != None):
+            self.ui.sched.remove(self.treeroot + ".A")
+            self.archiver = None
+            pass
         self.d = None
         self.ui = None
         self.el_refr = None
@@ -313,6 +355,8 @@ class MC:
                               + str(mc.minor_version()))
         self.ui.set_item_text(self.manufacturer_id, str(mc.manufacturer_id()))
         self.ui.set_item_text(self.product_id, str(mc.product_id()))
+        self.ui.index.set(self, product_id=mc.product_id(),
+                          manufacturer_id=mc.manufacturer_id())
         self.ui.set_item_text(self.aux_fw_revision, mc.aux_fw_revision())
                                                
         self.ui.set_item_text(self.mguid, mc.get_guid())
@@ -325,10 +369,15 @@ class MC:
         return
 
     def HandleMenu(self, event):
+        from openipmigui import gui_popup
         l = [ ]
         if self.has_sel:
             l.append( ("Reread SELs", self.RereadSelsHandler) )
             l.append( ("Display SELs", self.DisplaySelsHandler) )
+            if (self.archiver != None):
+                l.append( ("Display Archived SELs",
+                           self.DisplayArchivedSelsHandler) )
+                pass
             l.append( ("Enable Event Log", self.EnableEventLogHandler) )
             l.append( ("Disable Event Log", self.DisableEventLogHandler) )
             pass
@@ -350,12 +399,17 @@ class MC:
         return
 
     def RereadSelsHandler(self, event):
-        dop = MCOpHandler(self, "reread_sel")
+        dop = MCOpHandler(self, "reread_sel", self)
         dop.DoOp()
         return
 
     def DisplaySelsHandler(self, event):
-        _sel.MCSELDisplay(self.mc_id)
+        from openipmigui import _sel
+        _sel.MCSELDisplay(self.mc_id, self.d.sel_subs)
+        return
+
+    def DisplayArchivedSelsHandler(self, event):
+        self.mc_id.to_mc(MCArchiveDisplay(self))
         return
 
     def EnableEventLogHandler(self, event):
@@ -409,6 +463,7 @@ class MC:
         return
 
     def mc_cb(self, mc):
+        from openipmigui import _mc_chan
         if (self.cb_state == "enable_events"):
             mc.set_events_enable(1, self)
         elif (self.cb_state == "disable_events"):
@@ -450,6 +505,7 @@ class MC:
         return
 
     def pef_got_config_cb(self, pef, err, pefconfig):
+        from openipmigui import _mc_pefparm
         if (err):
             if (err == OpenIPMI.eagain):
                 self.ui.ReportError("PEF already locked by another user, "
@@ -0,0 +1,255 @@
+# _metrics.py
+#
+# Prometheus metrics for the cached OpenIPMI object state
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+# The model objects push their state into a Snapshot as it arrives
+# (sensor readings, threshold changes, port up/down, etc.), each
+# series stored as its pre-formatted exposition line.  A scrape only
+# joins those lines, it never walks the object tree or talks to a
+# BMC.  The HTTP server runs in its own thread, so the snapshot is
+# protected by a lock.
+
+import threading
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+from openipmigui import _oi_logging
+
+# Name, help text for every family, in the order they are output.
+families = [
+    ("openipmi_domain_up",
+     "1 if any connection to the domain is up"),
+    ("openipmi_connection_active",
+     "1 if the connection is the active one"),
+    ("openipmi_connection_port_up",
+     "1 if the connection port is up"),
+    ("openipmi_entity_present",
+     "1 if the entity is present"),
+    ("openipmi_sensor_value",
+     "Last converted reading of a threshold sensor"),
+    ("openipmi_sensor_raw_value",
+     "Last raw reading of a threshold sensor"),
+    ("openipmi_sensor_threshold",
+     "Threshold setting of a threshold sensor"),
+    ("openipmi_sensor_threshold_severity",
+     "0 normal, 1 non-critical, 2 critical, 3 non-recoverable"),
+    ("openipmi_sensor_discrete_states",
+     "Bitmask of the states set in a discrete sensor"),
+    ("openipmi_sensor_reading_valid",
+     "1 if the last sensor read succeeded"),
+    ("openipmi_sensor_last_update_seconds",
+     "Time of the last sensor reading, seconds since the epoch"),
+    ]
+
+family_names = [ f[0] for f in families ]
+
+def escape(v):
+    return (str(v).replace("\\", "\\\\").replace("\n", "\\n")
+            .replace("\"", "\\\""))
+
+def labels(pairs):
+    """Format a list of (name, value) pairs as the inside of a label
+    set, so callers can keep it and add to it."""
+    return ",".join([ n + "=\"" + escape(v) + "\"" for (n, v) in pairs ])
+
+def format_value(value):
+    if (value is True):
+        return "1"
+    if (value is False):
+        return "0"
+    value = float(value)
+    if (value != value):
+        return "NaN"
+    if (value == float("inf")):
+        return "+Inf"
+    if (value == float("-inf")):
+        return "-Inf"
+    return repr(value)
+
+class Snapshot:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = { }
+        for name in family_names:
+            self.series[name] = { }
+            pass
+        # owner -> (domain name, set of (family, labels))
+        self.owners = { }
+        self.body = None
+        return
+
+    def set(self, owner, domain, name, lbls, value):
+        line = name + "{" + lbls + "} " + format_value(value) + "\n"
+        key = (name, lbls)
+        self.lock.acquire()
+        try:
+            if (self.series[name].get(key) != line):
+                self.series[name][key] = line
+                self.body = None
+                pass
+            if (owner not in self.owners):
+                self.owners[owner] = (domain, set())
+                pass
+            self.owners[owner][1].add(key)
+        finally:
+            self.lock.release()
+            pass
+        return
+
+    def unset(self, owner, name, lbls):
+        key = (name, lbls)
+        self.lock.acquire()
+        try:
+            if (key in self.series[name]):
+                del self.series[name][key]
+                self.body = None
+                pass
+            if (owner in self.owners):
+                self.owners[owner][1].discard(key)
+                pass
+        finally:
+            self.lock.release()
+            pass
+        return
+
+    def _remove_owner(self, owner):
+        for (name, lbls) in self.owners[owner][1]:
+            self.series[name].pop((name, lbls), None)
+            pass
+        del self.owners[owner]
+        self.body = None
+        return
+
+    def remove(self, owner):
+        self.lock.acquire()
+        try:
+            if (owner in self.owners):
+                self._remove_owner(owner)
+                pass
+        finally:
+            self.lock.release()
+            pass
+        return
+
+    def remove_domain(self, domain):
+        """Drop everything reported for a domain.  Objects under a
+        closed domain are not all removed one at a time."""
+        self.lock.acquire()
+        try:
+            for owner in [ o for (o, v) in self.owners.items()
+                           if (v[0] == domain) ]:
+                self._remove_owner(owner)
+                pass
+        finally:
+            self.lock.release()
+            pass
+        return
+
+    def render(self):
+        self.lock.acquire()
+        try:
+            if (self.body == None):
+                out = [ ]
+                for (name, help) in families:
+                    lines = self.series[name]
+                    if (len(lines) == 0):
+                        continue
+                    out.append("# HELP " + name + " " + help + "\n")
+                    out.append("# TYPE " + name + " gauge\n")
+                    out.extend(lines.values())
+                    pass
+                self.body = "".join(out).encode("utf-8")
+                pass
+            return self.body
+        finally:
+            self.lock.release()
+            pass
+        return
+
+    pass
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if (path not in ("/", "/metrics")):
+            self.send_error(404)
+            return
+        body = self.server.snapshot.render()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return
+
+    def log_message(self, format, *args):
+        return
+
+    pass
+
+class MetricsHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    pass
+
+class MetricsServer:
+    """Serve a Snapshot in the Prometheus text format.  This binds to
+    localhost unless told otherwise."""
+    def __init__(self, snapshot, port, addr="127.0.0.1"):
+        self.httpd = MetricsHTTPServer((addr, port), MetricsRequestHandler)
+        self.httpd.snapshot = snapshot
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+        return
+
+    def start(self):
+        self.thread.start()
+        return
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        return
+
+    pass
+
+def start_server(snapshot, port, addr="127.0.0.1"):
+    try:
+        server = MetricsServer(snapshot, port, addr)
+    except Exception as e:
+        _oi_logging.error("Unable to start metrics server on "
+                          + addr + ":" + str(port) + ": " + str(e))
+        return None
+    server.start()
+    return server
@@ -30,6 +30,8 @@
 #  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
 #
 
+import time
+
 def HexArrayToStr(a):
     s = "["
     for v in a:
@@ -37,3 +39,56 @@ def HexArrayToStr(a):
         pass
     s += " ]"
     return s;
+
+def parse_time(text):
+    """Seconds since the epoch, or a local "YYYY-MM-DD[ HH:MM[:SS]]"."""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(text, fmt))
+        except ValueError:
+            pass
+        pass
+    raise ValueError("Invalid time: " + text)
+
+# Severity (an index into _index.severity_names) of a threshold from
+# the second letter of its name: non-critical, critical and
+# non-recoverable.
+threshold_event_severity = { 'n' : 1, 'c' : 2, 'r' : 3 }
+
+# Pulls the sensor and value out of an event, pass to ev.call_handler()
+class EventInfo:
+    def __init__(self):
+        self.sensor = None
+        self.val = None
+        self.severity = None
+        return
+
+    def threshold_event_cb(self, sensor, event_spec, raw_set, raw,
+                           value_set, value, event):
+        self.sensor = sensor.get_name()
+        self.val = event_spec;
+        if (event_spec[3] == 'a'):
+            self.severity = threshold_event_severity[event_spec[1]]
+        else:
+            self.severity = 0
+            pass
+        if (value_set):
+            self.val += str(value)
+            pass
+        if (raw_set):
+            self.val += '(' + str(raw) + ')'
+            pass
+        return
+
+    def discrete_event_cb(self, sensor, event_spec, severity, old_severity,
+                          event):
+        self.sensor = sensor.get_name()
+        self.val = (event_spec + ' ' + str(severity) +
+                    '(' + str(old_severity) + ')')
+        return
+
+    pass
@@ -0,0 +1,371 @@
+# _sched.py
+#
+# Deadline-driven refresh scheduler for the OpenIPMI GUI
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+import heapq
+import math
+import time
+from openipmigui import _oi_logging
+
+# Priority classes for scheduled objects.  When more than one object
+# is due, lower classes are dispatched first.  Watched objects are the
+# ones in the "important objects" list, visible objects are ones
+# currently shown in the tree, hidden objects are collapsed away.
+PRIO_WATCHED = 0
+PRIO_VISIBLE = 1
+PRIO_HIDDEN = 2
+NUM_PRIOS = 3
+
+class SchedEntry:
+    def __init__(self, key, obj, prio, period):
+        self.key = key
+        self.obj = obj
+        self.prio = prio
+        self.period = period
+        self.due = None
+        self.seq = 0
+        self.removed = False
+        return
+
+    pass
+
+class Scheduler:
+    """Dispatch DoUpdate() on registered objects when they come due.
+
+    Each object is registered under a key with a priority class and
+    an optional period of its own.  Objects sit in a heap per class
+    ordered by their next due time, so a dispatch pass only touches
+    the objects that are actually due.  A class whose period is None
+    is parked; its objects stay registered but are not polled until
+    they move to another class."""
+    def __init__(self, period, hidden_period=None, max_calls=100):
+        self.class_period = [ period, period, hidden_period ]
+        self.max_calls = max_calls
+        self.heaps = [ ]
+        for i in range(0, NUM_PRIOS):
+            self.heaps.append([ ])
+            pass
+        self.entries = { }
+        self.seq = 0
+        self.stale = 0
+        return
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get_period(self, e):
+        cperiod = self.class_period[e.prio]
+        if (cperiod == None):
+            return None
+        if (e.period == None):
+            return cperiod
+        if (e.prio == PRIO_HIDDEN):
+            # An object's own period never makes it poll faster
+            # than its class allows while hidden.
+            return max(e.period, cperiod)
+        return e.period
+
+    def push(self, e, due):
+        if (e.due != None):
+            # Whatever is in the heap for this entry is now stale
+            self.stale += 1
+            pass
+        self.seq += 1
+        e.seq = self.seq
+        if (self.class_period[e.prio] == None):
+            e.due = None
+            return
+        e.due = due
+        heapq.heappush(self.heaps[e.prio], (due, e.seq, e))
+        return
+
+    def add(self, key, obj, prio=PRIO_VISIBLE, period=None, delay=0.0):
+        if (key in self.entries):
+            self.remove(key)
+            pass
+        e = SchedEntry(key, obj, prio, period)
+        self.entries[key] = e
+        self.push(e, time.time() + delay)
+        return e
+
+    def remove(self, key):
+        if (key not in self.entries):
+            return
+        e = self.entries[key]
+        del self.entries[key]
+        e.removed = True
+        if (e.due != None):
+            self.stale += 1
+            pass
+        return
+
+    def get_prio(self, key):
+        if (key not in self.entries):
+            return None
+        return self.entries[key].prio
+
+    def set_prio(self, key, prio):
+        """Move an object to another priority class.  An object moving
+        to a more urgent class is polled right away, otherwise it
+        keeps its current due time."""
+        if (key not in self.entries):
+            return
+        e = self.entries[key]
+        if (e.prio == prio):
+            return
+        old_due = e.due
+        more_urgent = prio < e.prio
+        e.prio = prio
+        now = time.time()
+        if (more_urgent) or (old_due == None):
+            self.push(e, now)
+        else:
+            self.push(e, old_due)
+            pass
+        return
+
+    def set_period(self, key, period):
+        """Change an object's own period.  The next due time moves
+        so it is no later than one new period from now."""
+        if (key not in self.entries):
+            return
+        e = self.entries[key]
+        e.period = period
+        if (e.due == None):
+            return
+        p = self.get_period(e)
+        due = time.time() + p
+        if (due < e.due):
+            self.push(e, due)
+            pass
+        return
+
+    def reschedule(self, key, delay):
+        if (key not in self.entries):
+            return
+        self.push(self.entries[key], time.time() + delay)
+        return
+
+    def head(self, heap):
+        # Return the first live heap item, dropping stale ones.
+        while (len(heap) > 0):
+            (due, seq, e) = heap[0]
+            if (e.removed) or (e.seq != seq):
+                heapq.heappop(heap)
+                self.stale -= 1
+                continue
+            return heap[0]
+        return None
+
+    def compact(self):
+        # Rebuild the heaps if most of what they hold is stale, so
+        # lots of priority changes do not let them grow without bound.
+        for i in range(0, NUM_PRIOS):
+            self.heaps[i] = [ h for h in self.heaps[i]
+                              if (not h[2].removed) and (h[2].seq == h[1]) ]
+            heapq.heapify(self.heaps[i])
+            pass
+        self.stale = 0
+        return
+
+    def next_due(self, now=None):
+        """Return the number of seconds until something is due, 0 if
+        something is already due, or None if nothing is scheduled."""
+        if (now == None):
+            now = time.time()
+            pass
+        first = None
+        for heap in self.heaps:
+            h = self.head(heap)
+            if (h != None) and ((first == None) or (h[0] < first)):
+                first = h[0]
+                pass
+            pass
+        if (first == None):
+            return None
+        if (first <= now):
+            return 0.0
+        return first - now
+
+    def run(self, now=None, max_calls=None):
+        """Call DoUpdate() on everything that is due, most urgent class
+        first, up to max_calls objects.  Returns the number of objects
+        updated."""
+        if (now == None):
+            now = time.time()
+            pass
+        if (max_calls == None):
+            max_calls = self.max_calls
+            pass
+        calls = 0
+        for heap in self.heaps:
+            while (calls < max_calls):
+                h = self.head(heap)
+                if (h == None) or (h[0] > now):
+                    break
+                heapq.heappop(heap)
+                (due, seq, e) = h
+                e.due = None
+                # Requeue before the update, the update may remove or
+                # reschedule the object itself.
+                due += self.get_period(e)
+                if (due < now):
+                    due = now + self.get_period(e)
+                    pass
+                self.push(e, due)
+                calls += 1
+                try:
+                    e.obj.DoUpdate()
+                except Exception as ex:
+                    _oi_logging.error("Error updating " + str(e.key)
+                                      + ": " + str(ex))
+                    pass
+                pass
+            pass
+        if (self.stale > 2 * len(self.entries) + 100):
+            self.compact()
+            pass
+        return calls
+
+    pass
+
+class AdaptivePoll:
+    """Work out a poll period for an analog reading.
+
+    The period comes from how fast the reading has been moving (the
+    spread of the last few readings per sample interval) and how far
+    it is from the nearest threshold, so a reading that would need
+    several polls to reach a threshold at its recent rate is polled
+    less often.  If the sensor delivers threshold events, crossings
+    get reported anyway and the period is stretched further.  The
+    result always stays between min_period and max_period."""
+    def __init__(self, min_period, max_period, nsamples=8, safety=4.0,
+                 event_factor=4.0):
+        self.min_period = min_period
+        self.max_period = max_period
+        self.nsamples = nsamples
+        self.safety = safety
+        self.event_factor = event_factor
+        self.samples = [ ]
+        self.thresholds = [ ]
+        self.events = False
+        self.period = min_period
+        return
+
+    def set_bounds(self, min_period, max_period):
+        self.min_period = min_period
+        self.max_period = max_period
+        self.period = self.clamp(self.period)
+        return
+
+    def set_thresholds(self, thresholds):
+        self.thresholds = list(thresholds)
+        return
+
+    def set_events(self, events):
+        self.events = events
+        return
+
+    def clamp(self, period):
+        if (period < self.min_period):
+            return self.min_period
+        if (period > self.max_period):
+            return self.max_period
+        return period
+
+    def add_reading(self, value, in_alarm=False, now=None):
+        """Record a reading and return the new poll period."""
+        if (now == None):
+            now = time.time()
+            pass
+        self.samples.append((now, value))
+        if (len(self.samples) > self.nsamples):
+            del self.samples[0]
+            pass
+        if (in_alarm):
+            # Already past a threshold, watch it closely
+            self.period = self.min_period
+            return self.period
+        if (len(self.samples) < 3):
+            return self.period
+
+        n = len(self.samples)
+        mean = 0.0
+        for (t, v) in self.samples:
+            mean += v
+            pass
+        mean /= n
+        var = 0.0
+        for (t, v) in self.samples:
+            var += (v - mean) * (v - mean)
+            pass
+        var /= (n - 1)
+        interval = (self.samples[-1][0] - self.samples[0][0]) / (n - 1)
+        if (interval <= 0.0):
+            return self.period
+        rate = math.sqrt(var) / interval
+
+        if (len(self.thresholds) > 0):
+            margin = None
+            for th in self.thresholds:
+                d = abs(value - th)
+                if (margin == None) or (d < margin):
+                    margin = d
+                    pass
+                pass
+        else:
+            # No thresholds, take a tenth of the reading as the change
+            # worth noticing.
+            margin = abs(mean) / 10.0
+            if (margin == 0.0):
+                margin = 1.0
+                pass
+            pass
+
+        if (rate == 0.0):
+            period = self.max_period
+        else:
+            period = margin / rate / self.safety
+            pass
+        if (self.events):
+            period *= self.event_factor
+            pass
+        # Speed up right away, slow down gradually
+        if (period > self.period * 2):
+            period = self.period * 2
+            pass
+        self.period = self.clamp(period)
+        return self.period
+
+    pass
@@ -32,15 +32,42 @@
 
 import OpenIPMI
 import sys
+import bisect
+try:
+    import Tix
+except:
+    import tkinter
+    from tkinter import tix as Tix
 from openipmigui import gui_list
 from openipmigui import gui_popup
 from openipmigui import _misc
+from openipmigui import _selstream
+
+# Only this many events are decoded and put into the list at a time.
+page_size = 100
 
 class EventData:
-    def __init__(self, slist, ev, has_second_data):
+    def __init__(self, slist, ev):
         self.slist = slist
         self.ev = ev
+        self.record_id = ev.get_record_id()
+        self.timestamp = ev.get_timestamp()
+        self.key = None
         self.second_key = None
+        self.decoded = False
+        return
+
+    def decode(self):
+        # Done the first time the event is on the page shown
+        if (self.decoded):
+            return
+        evinfo = _misc.EventInfo()
+        self.ev.call_handler(evinfo)
+        self.sensor = evinfo.sensor
+        self.val = evinfo.val
+        self.type = str(self.ev.get_type())
+        self.data = _misc.HexArrayToStr(self.ev.get_data())
+        self.decoded = True
         return
 
     def HandleMenu(self, event, idx, point):
@@ -50,117 +77,347 @@ class EventData:
         return
 
     def delete(self, idx):
-        self.slist.DelItem(self.key)
-        if (self.second_key != None):
-            self.slist.DelItem(self.second_key)
-            pass
-        self.ev.delete()
+        self.slist.DeleteEvent(self)
         return
     
     pass
 
-class EventInfo:
-    def __init__(self):
-        self.sensor = None
-        self.val = None
-        return
+class SELDisplay(gui_list.List):
+    def __init__(self, o, type, events=None):
+        self.o = o
+        self.type = type
+        self.setup("SEL for " + o.get_name())
 
-    def threshold_event_cb(self, sensor, event_spec, raw_set, raw,
-                           value_set, value, event):
-        self.sensor = sensor.get_name()
-        self.val = event_spec;
-        if (value_set):
-            self.val += str(value)
+        # Only the event handles and the keys used for seeking are
+        # collected here, decoding and the list rows are per page.
+        if (events == None):
+            events = _selstream.mc_events(o)
             pass
-        if (raw_set):
-            self.val += '(' + str(raw) + ')'
+        for ev in events:
+            self.LoadEvent(ev)
             pass
-        return
+        self.ShowPage(0)
 
-    def discrete_event_cb(self, sensor, event_spec, severity, old_severity,
-                          event):
-        self.sensor = sensor.get_name()
-        self.val = (event_spec + ' ' + str(severity) +
-                    '(' + str(old_severity) + ')')
+        self.AfterDone()
         return
 
-    pass
-
-class SELDisplay(gui_list.List):
-    def __init__(self, o, type):
-        self.o = o
-        self.type = type
-        self.numevents = 0
-        gui_list.List.__init__(self, "SEL for " + o.get_name(),
+    def setup(self, title):
+        gui_list.List.__init__(self, title,
                                [ ("RecNum", 64), ("Type", 40),
                                  ("Time/Sensor", 300), ("Data", 400) ])
 
+        navbar = Tix.Frame(self)
+        Tix.Button(navbar, text="<<",
+                   command=lambda: self.ShowPage(0)).pack(side=Tix.LEFT)
+        Tix.Button(navbar, text="<",
+                   command=lambda: self.ShowPage(self.start - page_size)
+                   ).pack(side=Tix.LEFT)
+        Tix.Button(navbar, text=">",
+                   command=lambda: self.ShowPage(self.start + page_size)
+                   ).pack(side=Tix.LEFT)
+        Tix.Button(navbar, text=">>",
+                   command=lambda: self.ShowPage(len(self.events))
+                   ).pack(side=Tix.LEFT)
+        self.poslabel = Tix.Label(navbar, text="")
+        self.poslabel.pack(side=Tix.LEFT)
+        self.timeentry = Tix.Entry(navbar, width=20)
+        self.timeentry.pack(side=Tix.RIGHT)
+        self.timeentry.bind("<Return>", self.SeekTime)
+        Tix.Label(navbar, text="Time:").pack(side=Tix.RIGHT)
+        self.recentry = Tix.Entry(navbar, width=8)
+        self.recentry.pack(side=Tix.RIGHT)
+        self.recentry.bind("<Return>", self.SeekRecord)
+        Tix.Label(navbar, text="Record:").pack(side=Tix.RIGHT)
+        navbar.pack(side=Tix.TOP, fill=Tix.X, before=self.slist)
+
         self.events = [ ]
-        
-        ev = o.first_event()
-        while (ev != None):
-            self.AddEvent(ev)
-            ev = o.next_event(ev)
+        self.by_record = { }
+        self.by_time = None
+        self.start = 0
+        return
+
+    def LoadEvent(self, ev):
+        return self.LoadData(EventData(self, ev))
+
+    def LoadData(self, data):
+        self.events.append(data)
+        if (data.record_id not in self.by_record):
+            self.by_record[data.record_id] = data
             pass
+        self.by_time = None
+        return data
 
-        self.AfterDone()
+    def AddEvent(self, ev):
+        # Follow new events if the last page is being shown
+        at_end = (self.start + page_size >= len(self.events))
+        self.LoadEvent(ev)
+        if (at_end):
+            self.ShowPage(len(self.events))
+        else:
+            self.ShowPosition()
+            pass
         return
 
-    def AddEvent(self, ev):
-        evinfo = EventInfo()
-        ev.call_handler(evinfo)
+    def ShowPosition(self):
+        count = len(self.events)
+        if (count == 0):
+            self.poslabel.configure(text="No events")
+        else:
+            last = min(self.start + page_size, count)
+            self.poslabel.configure(text=("Events " + str(self.start + 1)
+                                          + "-" + str(last) + " of "
+                                          + str(count)))
+            pass
+        return
 
-        data = EventData(self, ev, evinfo.sensor != None)
-        self.events.append(data)
-        data.key = self.Append(str(ev.get_record_id()),
-                               [ str(ev.get_type()), str(ev.get_timestamp()),
-                                 _misc.HexArrayToStr(ev.get_data()) ],
+    def ShowPage(self, start, select=None):
+        if (start > len(self.events) - page_size):
+            start = len(self.events) - page_size
+            pass
+        if (start < 0):
+            start = 0
+            pass
+        self.start = start
+        for data in self.events[start:start+page_size]:
+            data.key = None
+            data.second_key = None
+            pass
+        self.DeleteAllItems()
+        for data in self.events[start:start+page_size]:
+            self.ShowEvent(data)
+            pass
+        if (select != None) and (select.key != None):
+            self.slist.hlist.see(select.key)
+            self.slist.hlist.selection_clear()
+            self.slist.hlist.selection_set(select.key)
+            pass
+        self.ShowPosition()
+        return
+
+    def ShowEvent(self, data):
+        data.decode()
+        data.key = self.Append(str(data.record_id),
+                               [ data.type, str(data.timestamp), data.data ],
                                data)
-        if (evinfo.sensor):
+        if (data.sensor):
             # Can only delete the using the first item.
-            data.second_key = self.Append("", [ "", evinfo.sensor, evinfo.val ],
+            data.second_key = self.Append("", [ "", data.sensor, data.val ],
                                           data)
             pass
         return
-        
+
+    def ShowEventAt(self, pos):
+        self.ShowPage(pos - (pos % page_size), self.events[pos])
+        return
+
+    def SeekRecord(self, event=None):
+        try:
+            recid = int(self.recentry.get(), 0)
+        except ValueError:
+            self.SetError("Invalid record id: " + self.recentry.get())
+            return
+        data = self.by_record.get(recid)
+        if (data == None):
+            self.SetError("Record " + str(recid) + " not found")
+            return
+        self.SetError("")
+        self.ShowEventAt(self.events.index(data))
+        return
+
+    def SeekTime(self, event=None):
+        try:
+            when = _misc.parse_time(self.timeentry.get().strip())
+        except ValueError as e:
+            self.SetError(str(e))
+            return
+        if (len(self.events) == 0):
+            return
+        if (self.by_time == None):
+            # Event logs are mostly in time order, but not always, so
+            # keep a sorted copy for seeking.
+            self.by_time = sorted([ (self.events[i].timestamp, i)
+                                    for i in range(0, len(self.events)) ])
+            self.times = [ t[0] for t in self.by_time ]
+            pass
+        i = bisect.bisect_left(self.times, when)
+        if (i >= len(self.by_time)):
+            i = len(self.by_time) - 1
+            pass
+        self.SetError("")
+        self.ShowEventAt(self.by_time[i][1])
+        return
+
+    def DeleteRecord(self, data):
+        data.ev.delete()
+        return
+
+    def DeleteRecords(self, datas):
+        # One bulk delete per MC, the library pipelines them or
+        # clears the SEL if they are all of its events.
+        groups = [ ]
+        for data in datas:
+            mc_id = data.ev.get_mc_id()
+            for g in groups:
+                if (g.mc_id.cmp(mc_id) == 0):
+                    break
+                pass
+            else:
+                g = BulkDelete(self, mc_id)
+                groups.append(g)
+                pass
+            g.datas.append(data)
+            pass
+        for g in groups:
+            g.start()
+            pass
+        return
+
+    def DeleteFailed(self, datas, err):
+        # The events are still in the SEL, so put them back.
+        if (self.events == None):
+            return
+        for data in datas:
+            self.LoadData(data)
+            pass
+        self.SetError("Could not delete %d event(s): %s"
+                      % (len(datas), OpenIPMI.get_error_string(err)))
+        self.ShowPage(self.start)
+        return
+
+    def DeleteEvent(self, data):
+        self.DeleteRecord(data)
+        self.events.remove(data)
+        if (self.by_record.get(data.record_id) == data):
+            del self.by_record[data.record_id]
+            for d in self.events:
+                if (d.record_id == data.record_id):
+                    self.by_record[d.record_id] = d
+                    break
+                pass
+            pass
+        self.by_time = None
+        self.ShowPage(self.start)
+        return
+
     def ok(self):
         self.Close()
         return
 
     def clear(self):
-        for data in self.events:
-            data.ev.delete()
-            pass
+        datas = self.events
         self.events = [ ]
-        self.DeleteAllItems()
+        self.by_record = { }
+        self.by_time = None
+        self.ShowPage(0)
+        self.DeleteRecords(datas)
         return
 
     def do_on_close(self):
         self.events = None
+        self.by_record = None
+        self.by_time = None
+        return
+
+    pass
+
+class BulkDelete:
+    """Delete a set of events from one MC's SEL."""
+    def __init__(self, slist, mc_id):
+        self.slist = slist
+        self.mc_id = mc_id
+        self.datas = [ ]
+        self.rv = 0
+        return
+
+    def start(self):
+        rv = self.mc_id.to_mc(self)
+        if (rv == 0):
+            rv = self.rv
+            pass
+        if (rv):
+            self.slist.DeleteFailed(self.datas, rv)
+            pass
+        return
+
+    def mc_cb(self, mc):
+        self.rv = mc.del_events([ d.ev for d in self.datas ], self)
+        return
+
+    def mc_del_events_cb(self, mc, err, record_ids, errs):
+        failed = [ ]
+        for (data, e) in zip(self.datas, errs):
+            if (e):
+                failed.append(data)
+                pass
+            pass
+        if (failed):
+            self.slist.DeleteFailed(failed, err)
+            pass
+        return
+
+    pass
+
+class ArchivedEventData(EventData):
+    def __init__(self, slist, rec):
+        self.slist = slist
+        self.rec = rec
+        self.record_id = rec.record_id
+        self.timestamp = rec.timestamp
+        self.key = None
+        self.second_key = None
+        self.sensor = rec.sensor
+        self.val = rec.val
+        self.type = str(rec.type)
+        self.data = _misc.HexArrayToStr(rec.raw)
+        self.decoded = True
+        return
+
+    pass
+
+class ArchiveSELDisplay(SELDisplay):
+    """Show records from the SEL archive, these are read from the
+    database and not from the MCs."""
+    def __init__(self, archive, title, key=None, domain=None):
+        self.archive = archive
+        self.setup(title)
+        for rec in archive.query(key=key, domain=domain):
+            self.LoadData(ArchivedEventData(self, rec))
+            pass
+        self.ShowPage(0)
+        self.AfterDone()
+        return
+
+    def DeleteRecord(self, data):
+        # Only removes it from the archive, not from the MC
+        rec = data.rec
+        self.archive.delete(rec.mc_key, rec.record_id, rec.timestamp)
+        return
+
+    def DeleteRecords(self, datas):
+        for data in datas:
+            self.DeleteRecord(data)
+            pass
         return
 
     pass
 
 class DomainSELDisplay(SELDisplay):
-    def __init__(self, domain_id):
+    """The SELs of all the MCs in a domain, merged in time order."""
+    def __init__(self, domain_id, subs):
         self.domain_id = domain_id
-        self.init = True
+        self.subs = subs
         domain_id.to_domain(self)
         return
 
     def do_on_close(self):
-        self.init = False
-        self.domain_id.to_domain(self)
+        self.subs.unsubscribe(self)
         SELDisplay.do_on_close(self)
         return
 
     def domain_cb(self, domain):
-        if (self.init):
-            SELDisplay.__init__(self, domain, "domain")
-            domain.add_event_handler(self)
-        else:
-            domain.remove_event_handler(self)
-            pass
+        SELDisplay.__init__(self, domain, "domain",
+                            _selstream.merged_events(domain))
+        self.subs.subscribe(self)
         return
 
     def event_cb(self, domain, ev):
@@ -170,33 +427,24 @@ class DomainSELDisplay(SELDisplay):
     pass
 
 class MCSELDisplay(SELDisplay):
-    def __init__(self, mc_id):
-        self.init = True
+    def __init__(self, mc_id, subs):
         self.mc_id = mc_id
+        self.subs = subs
         mc_id.to_mc(self)
         return
 
     def do_on_close(self):
-        self.init = False
-        self.mc_id.to_mc(self)
+        self.subs.unsubscribe(self)
         SELDisplay.do_on_close(self)
         return
     
     def mc_cb(self, mc):
-        domain = mc.get_domain()
-        if self.init:
-            SELDisplay.__init__(self, mc, "MC")
-            domain.add_event_handler(self)
-        else:
-            domain.remove_event_handler(self)
-            pass
+        SELDisplay.__init__(self, mc, "MC")
+        self.subs.subscribe(self, self.mc_id)
         return
 
     def event_cb(self, domain, ev):
-        mc_id = ev.get_mc_id()
-        if (mc_id.cmp(self.mc_id) == 0):
-            self.AddEvent(ev)
-            pass
+        self.AddEvent(ev)
         return
 
     pass
@@ -0,0 +1,275 @@
+# _selarchive.py
+#
+# A local SQLite archive of the system event logs
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+import os
+import time
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+from openipmigui import _oi_logging
+from openipmigui import _misc
+
+# How often the MCs' event lists are checked for new records.  This
+# only walks the copy of the SEL the library keeps, it does not talk
+# to the MC.
+sync_period = 60.0
+
+# Record ids are reused after the SEL is cleared, so the timestamp is
+# part of the key.
+schema = [
+    """CREATE TABLE IF NOT EXISTS sel (
+           mc_key TEXT NOT NULL,
+           record_id INTEGER NOT NULL,
+           timestamp REAL NOT NULL,
+           type INTEGER,
+           sensor TEXT,
+           value TEXT,
+           data BLOB,
+           domain TEXT,
+           mc TEXT,
+           archived REAL,
+           PRIMARY KEY (mc_key, record_id, timestamp))""",
+    "CREATE INDEX IF NOT EXISTS sel_timestamp ON sel (timestamp)",
+    "CREATE INDEX IF NOT EXISTS sel_sensor ON sel (sensor)",
+    "CREATE INDEX IF NOT EXISTS sel_type ON sel (type)",
+    "CREATE INDEX IF NOT EXISTS sel_domain ON sel (domain, timestamp)",
+    """CREATE TABLE IF NOT EXISTS sel_seen (
+           mc_key TEXT NOT NULL,
+           record_id INTEGER NOT NULL,
+           timestamp REAL NOT NULL,
+           PRIMARY KEY (mc_key, record_id, timestamp))""",
+    ]
+
+columns = ("mc_key", "record_id", "timestamp", "type", "sensor", "value",
+           "data", "domain", "mc", "archived")
+
+def default_path(preffile):
+    """The archive lives next to the preferences file."""
+    return os.path.join(os.path.dirname(os.path.abspath(preffile)),
+                        ".openipmigui.sel.sqlite")
+
+def mc_key(domain_name, mc):
+    """MCs are archived by GUID so the records follow the hardware, an
+    MC without a GUID falls back to its name in the domain."""
+    guid = mc.get_guid()
+    if (guid):
+        return guid
+    return domain_name + "/" + mc.get_name()
+
+class Record:
+    """A row from the archive, with the fields the SEL viewer uses."""
+    def __init__(self, row):
+        (self.mc_key, self.record_id, self.timestamp, self.type,
+         self.sensor, self.val, data, self.domain, self.mc,
+         self.archived) = row
+        self.raw = bytearray(data)
+        return
+
+    pass
+
+class SELArchive:
+    def __init__(self, path):
+        if (sqlite3 == None):
+            raise ValueError("sqlite3 is not available")
+        self.path = path
+        self.db = sqlite3.connect(path)
+        for s in schema:
+            self.db.execute(s)
+            pass
+        self.db.commit()
+        # (record id, timestamp) of the records in each MC's SEL that
+        # have been archived, loaded on first use.  SEL timestamps are
+        # not monotonic (the BMC clock can be set back or start over
+        # after a reset), so nothing ordered by time will do here.
+        self.seen = { }
+        return
+
+    def close(self):
+        if (self.db != None):
+            self.db.close()
+            self.db = None
+            pass
+        return
+
+    def get_seen(self, key):
+        seen = self.seen.get(key)
+        if (seen == None):
+            seen = set()
+            for (recid, ts) in self.db.execute(
+                "SELECT record_id, timestamp FROM sel_seen WHERE mc_key = ?",
+                (key,)):
+                seen.add((recid, ts))
+                pass
+            self.seen[key] = seen
+            pass
+        return seen
+
+    def add_events(self, key, domain_name, mc_name, events):
+        now = time.time()
+        rows = [ ]
+        ids = [ ]
+        for ev in events:
+            info = _misc.EventInfo()
+            ev.call_handler(info)
+            recid = ev.get_record_id()
+            ts = ev.get_timestamp()
+            rows.append((key, recid, ts, ev.get_type(), info.sensor,
+                         info.val, sqlite3.Binary(bytearray(ev.get_data())),
+                         domain_name, mc_name, now))
+            ids.append((key, recid, ts))
+            pass
+        if (len(rows) == 0):
+            return 0
+        self.db.executemany("INSERT OR IGNORE INTO sel VALUES "
+                            + "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.db.executemany("INSERT OR IGNORE INTO sel_seen VALUES (?, ?, ?)",
+                            ids)
+        self.db.commit()
+        seen = self.get_seen(key)
+        for (k, recid, ts) in ids:
+            seen.add((recid, ts))
+            pass
+        return len(rows)
+
+    def sync_mc(self, domain_name, mc):
+        """Archive the events in the MC's SEL that have not been
+        archived for it before.  Returns the number of new events.
+
+        Records that are no longer in the SEL are dropped from the
+        seen set so it stays the size of the SEL.  A record deleted
+        from the archive stays seen while it is in the SEL, so it is
+        not archived again."""
+        key = mc_key(domain_name, mc)
+        seen = self.get_seen(key)
+        current = set()
+        new = [ ]
+        ev = mc.first_event()
+        while (ev != None):
+            rid = (ev.get_record_id(), ev.get_timestamp())
+            current.add(rid)
+            if (rid not in seen):
+                new.append(ev)
+                pass
+            ev = mc.next_event(ev)
+            pass
+        count = self.add_events(key, domain_name, mc.get_name(), new)
+        # An empty list is most likely a SEL the library has not
+        # fetched yet, keep what is known until it shows up.
+        if (len(current) > 0):
+            gone = seen - current
+            if (len(gone) > 0):
+                self.db.executemany("DELETE FROM sel_seen WHERE mc_key = ?"
+                                    + " AND record_id = ? AND timestamp = ?",
+                                    [ (key, recid, ts)
+                                      for (recid, ts) in gone ])
+                self.db.commit()
+                seen.difference_update(gone)
+                pass
+            pass
+        return count
+
+    def query(self, key=None, domain=None, sensor=None, type=None,
+              start=None, end=None, limit=None):
+        """Return the archived records matching all the given values
+        as Record objects in time order.  start and end are seconds
+        since the epoch, end is exclusive."""
+        where = [ ]
+        args = [ ]
+        for (col, val) in (("mc_key", key), ("domain", domain),
+                           ("sensor", sensor), ("type", type)):
+            if (val != None):
+                where.append(col + " = ?")
+                args.append(val)
+                pass
+            pass
+        if (start != None):
+            where.append("timestamp >= ?")
+            args.append(start)
+            pass
+        if (end != None):
+            where.append("timestamp < ?")
+            args.append(end)
+            pass
+        q = "SELECT " + ", ".join(columns) + " FROM sel"
+        if (len(where) > 0):
+            q += " WHERE " + " AND ".join(where)
+            pass
+        q += " ORDER BY timestamp, record_id"
+        if (limit != None):
+            q += " LIMIT ?"
+            args.append(int(limit))
+            pass
+        return [ Record(row) for row in self.db.execute(q, args) ]
+
+    def delete(self, key, record_id, timestamp):
+        self.db.execute("DELETE FROM sel WHERE mc_key = ? AND record_id = ?"
+                        + " AND timestamp = ?", (key, record_id, timestamp))
+        self.db.commit()
+        return
+
+    pass
+
+def open_archive(path):
+    """Open the archive, logging and returning None if that fails so
+    the caller can go on without one."""
+    try:
+        return SELArchive(path)
+    except Exception as e:
+        _oi_logging.error("Unable to open SEL archive " + path + ": "
+                          + str(e))
+        pass
+    return None
+
+class MCArchiver:
+    """Polled from the scheduler to archive an MC's new events."""
+    def __init__(self, archive, m):
+        self.archive = archive
+        self.m = m
+        return
+
+    def DoUpdate(self):
+        if (self.m.mc_id != None):
+            self.m.mc_id.to_mc(self)
+            pass
+        return
+
+    def mc_cb(self, mc):
+        try:
+            self.archive.sync_mc(self.m.d.name, mc)
+        except sqlite3.Error as e:
+            _oi_logging.error("Error archiving SEL for " + self.m.name + ": "
+                              + str(e))
+            pass
+        return
+
+    pass
@@ -0,0 +1,204 @@
+# _selexport.py
+#
+# openipmi GUI SEL export to JSON lines or CSV
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+import csv
+import json
+import time
+from openipmigui import _misc
+from openipmigui import _index
+from openipmigui import _selstream
+
+formats = ("jsonl", "csv")
+
+# The columns of an exported event, in CSV order.
+fields = ("domain", "mc", "record_id", "timestamp", "time", "type",
+          "sensor", "value", "severity", "data")
+
+def format_for_file(filename):
+    """Pick the format from the file name, JSON lines by default."""
+    if (filename.lower().endswith(".csv")):
+        return "csv"
+    return "jsonl"
+
+def event_row(domain_name, ev):
+    """Decode an event into a dictionary of the export fields."""
+    evinfo = _misc.EventInfo()
+    ev.call_handler(evinfo)
+    key = _selstream.mc_id_key(ev.get_mc_id())
+    timestamp = ev.get_timestamp()
+    if (evinfo.severity == None):
+        severity = None
+    else:
+        severity = _index.severity_names[evinfo.severity]
+        pass
+    return { "domain" : domain_name,
+             "mc" : "%s(%x.%x)" % (domain_name, key[0], key[1]),
+             "record_id" : ev.get_record_id(),
+             "timestamp" : timestamp,
+             "time" : time.strftime("%Y-%m-%dT%H:%M:%S",
+                                    time.localtime(timestamp)),
+             "type" : ev.get_type(),
+             "sensor" : evinfo.sensor,
+             "value" : evinfo.val,
+             "severity" : severity,
+             "data" : " ".join([ "%2.2x" % v for v in ev.get_data() ]) }
+
+def event_rows(domain, flt=None):
+    """Generate the rows for the events in a domain's SELs, in time
+    order.  Like _selstream.merged_events(), this must be used up in
+    the domain's callback."""
+    name = domain.get_name()
+    for ev in _selstream.merged_events(domain, flt):
+        yield event_row(name, ev)
+        pass
+    return
+
+class JSONLWriter:
+    """One JSON object per line."""
+    def __init__(self, f):
+        self.f = f
+        return
+
+    def write(self, row):
+        self.f.write(json.dumps(row, sort_keys=True) + "\n")
+        return
+
+    def flush(self):
+        self.f.flush()
+        return
+
+    pass
+
+class CSVWriter:
+    """A header line then one line per event."""
+    def __init__(self, f):
+        self.f = f
+        self.w = csv.writer(f, lineterminator="\n")
+        self.w.writerow(fields)
+        return
+
+    def write(self, row):
+        vals = [ ]
+        for f in fields:
+            v = row[f]
+            if (v == None):
+                v = ""
+                pass
+            vals.append(v)
+            pass
+        self.w.writerow(vals)
+        return
+
+    def flush(self):
+        self.f.flush()
+        return
+
+    pass
+
+def writer(f, format):
+    if (format == "jsonl"):
+        return JSONLWriter(f)
+    elif (format == "csv"):
+        return CSVWriter(f)
+    raise ValueError("Unknown export format: " + format)
+
+def export_domain(domain, w, flt=None):
+    """Write the domain's SEL events to writer w as they are decoded,
+    returns the number written."""
+    count = 0
+    for row in event_rows(domain, flt):
+        w.write(row)
+        count += 1
+        pass
+    w.flush()
+    return count
+
+class DomainExporter:
+    """Export a domain's SELs to a file from the GUI."""
+    def __init__(self, d, filename, format):
+        self.d = d
+        self.filename = filename
+        self.format = format
+        self.err = None
+        self.count = 0
+        return
+
+    def run(self):
+        rv = self.d.domain_id.to_domain(self)
+        if (rv != 0):
+            self.err = "Domain is not available"
+            pass
+        return self.err
+
+    def domain_cb(self, domain):
+        try:
+            f = open(self.filename, "w")
+        except EnvironmentError as e:
+            self.err = "Unable to open " + self.filename + ": " + str(e)
+            return
+        try:
+            self.count = export_domain(domain, writer(f, self.format))
+        finally:
+            f.close()
+            pass
+        return
+
+    pass
+
+class ExportDialog:
+    """Ask for the file to export a domain's SELs to."""
+    def __init__(self, d):
+        from openipmigui import gui_setdialog
+        self.d = d
+        gui_setdialog.SetDialog("Export SELs for " + str(d),
+                                [ str(d) + "-sel.jsonl", "" ], 2, self,
+                                [ "File", "Format (jsonl or csv)" ])
+        return
+
+    def ok(self, vals):
+        filename = str(vals[0])
+        format = str(vals[1]).strip().lower()
+        if (filename == ""):
+            return "No file given"
+        if (format == ""):
+            format = format_for_file(filename)
+        elif (format not in formats):
+            return "Format must be one of: " + ", ".join(formats)
+        exp = DomainExporter(self.d, filename, format)
+        err = exp.run()
+        if (err != None):
+            return err
+        self.d.ui.new_log("Exported " + str(exp.count) + " SEL events from "
+                          + str(self.d) + " to " + filename)
+        return
+
+    pass
@@ -0,0 +1,266 @@
+# _selstream.py
+#
+# openipmi GUI time ordered SEL streams
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+import heapq
+import fnmatch
+from openipmigui import _misc
+from openipmigui import _index
+
+def mc_id_key(mc_id):
+    """A hashable key for the MC an id refers to in its domain."""
+    return (mc_id.get_channel(), mc_id.get_address())
+
+class SELFilter:
+    """Selects SEL events.  Every criteria is optional: mcs is a list
+    of MC ids (or mc_keys a list of their mc_id_key()s), sensors a list of shell patterns on the sensor name,
+    types a list of event types, start and end are times in seconds
+    and severity is the least severity name from _index that
+    matches.  The MC, type and time checks are done on the raw event,
+    the event is only decoded for the sensor and severity checks."""
+    def __init__(self, mcs=None, sensors=None, types=None, start=None,
+                 end=None, severity=None, mc_keys=None):
+        if ((mcs == None) and (mc_keys == None)):
+            self.mc_keys = None
+        else:
+            self.mc_keys = set()
+            if (mcs != None):
+                self.mc_keys.update([ mc_id_key(m) for m in mcs ])
+                pass
+            if (mc_keys != None):
+                self.mc_keys.update(mc_keys)
+                pass
+            pass
+        self.sensors = sensors
+        if (types == None):
+            self.types = None
+        else:
+            self.types = set(types)
+            pass
+        self.start = start
+        self.end = end
+        if (severity == None):
+            self.severity = None
+        else:
+            self.severity = _index.severity_names.index(severity)
+            pass
+        return
+
+    def match_mc_key(self, key):
+        return (self.mc_keys == None) or (key in self.mc_keys)
+
+    def match_raw(self, ev):
+        if ((self.types != None) and (ev.get_type() not in self.types)):
+            return False
+        if ((self.start != None) or (self.end != None)):
+            t = ev.get_timestamp()
+            if ((self.start != None) and (t < self.start)):
+                return False
+            if ((self.end != None) and (t > self.end)):
+                return False
+            pass
+        return True
+
+    def match_decoded(self, ev):
+        if ((self.sensors == None) and (self.severity == None)):
+            return True
+        evinfo = _misc.EventInfo()
+        ev.call_handler(evinfo)
+        if (self.sensors != None):
+            if (evinfo.sensor == None):
+                return False
+            for p in self.sensors:
+                if (fnmatch.fnmatchcase(evinfo.sensor, p)):
+                    break
+                pass
+            else:
+                return False
+            pass
+        if (self.severity != None):
+            if ((evinfo.severity == None)
+                or (evinfo.severity < self.severity)):
+                return False
+            pass
+        return True
+
+    def match(self, ev):
+        return self.match_raw(ev) and self.match_decoded(ev)
+
+    pass
+
+class MCCollector:
+    def __init__(self, flt):
+        self.flt = flt
+        self.mcs = [ ]
+        return
+
+    def domain_iter_mc_cb(self, domain, mc):
+        if ((self.flt == None)
+            or self.flt.match_mc_key(mc_id_key(mc.get_id()))):
+            self.mcs.append(mc)
+            pass
+        return
+
+    pass
+
+def mc_events(mc, flt=None):
+    """The events in an MC's SEL that match flt, in SEL order."""
+    ev = mc.first_event()
+    while (ev != None):
+        if ((flt == None) or flt.match(ev)):
+            yield ev
+            pass
+        ev = mc.next_event(ev)
+        pass
+    return
+
+def merge(streams):
+    """Merge event iterators that are each in time order into one in
+    time order.  Events with the same time keep the order of the
+    streams they came from."""
+    heap = [ ]
+    for (i, s) in enumerate(streams):
+        it = iter(s)
+        for ev in it:
+            heap.append((ev.get_timestamp(), i, ev, it))
+            break
+        pass
+    heapq.heapify(heap)
+    while (heap):
+        (t, i, ev, it) = heap[0]
+        yield ev
+        for ev in it:
+            heapq.heapreplace(heap, (ev.get_timestamp(), i, ev, it))
+            break
+        else:
+            heapq.heappop(heap)
+            pass
+        pass
+    return
+
+def in_time_order(mc):
+    """True if the timestamps in the MC's SEL never go backwards."""
+    last = None
+    ev = mc.first_event()
+    while (ev != None):
+        ts = ev.get_timestamp()
+        if ((last != None) and (ts < last)):
+            return False
+        last = ts
+        ev = mc.next_event(ev)
+        pass
+    return True
+
+def events_by_recid(mc, keys):
+    for (ts, recid) in keys:
+        ev = mc.event_by_recid(recid)
+        if (ev != None):
+            yield ev
+            pass
+        pass
+    return
+
+def mc_time_ordered(mc, flt=None):
+    """The events in an MC's SEL that match flt, in time order.  The
+    SEL is normally in time order already and is streamed as it is.
+    If the MC's clock went back, only the (timestamp, record id) of
+    each matching event is kept and sorted, and the events are
+    fetched again by record id as they are used."""
+    if (in_time_order(mc)):
+        return mc_events(mc, flt)
+    keys = [ (ev.get_timestamp(), ev.get_record_id())
+             for ev in mc_events(mc, flt) ]
+    keys.sort()
+    return events_by_recid(mc, keys)
+
+def merged_events(domain, flt=None):
+    """The events from the SELs of all the MCs in the domain that
+    match flt, ordered by time.  Each MC's events come from
+    mc_time_ordered(), so the events are not copied unless an MC's
+    clock went back.  Only the MCs flt selects are read.  The MCs are
+    only valid in the domain's callback, so this must be used up
+    there."""
+    mcs = MCCollector(flt)
+    domain.iterate_mcs(mcs)
+    return merge([ mc_time_ordered(mc, flt) for mc in mcs.mcs ])
+
+class SELSubscriptions:
+    """Passes new events from a domain to the subscribers for the MC
+    the event came from, so each event is only offered to the
+    subscribers that want it.  One of these is the domain's event
+    handler, subscribers get the event_cb(domain, ev) call."""
+    def __init__(self):
+        self.by_mc = { }
+        self.domain_wide = [ ]
+        return
+
+    def subscribe(self, handler, mc_id=None, flt=None):
+        """Get events for the given MC, or all MCs if mc_id is None,
+        that match flt."""
+        if (mc_id == None):
+            self.domain_wide.append((handler, flt))
+        else:
+            key = mc_id_key(mc_id)
+            if (key not in self.by_mc):
+                self.by_mc[key] = [ ]
+                pass
+            self.by_mc[key].append((handler, flt))
+            pass
+        return
+
+    def unsubscribe(self, handler):
+        self.domain_wide = [ s for s in self.domain_wide if s[0] != handler ]
+        for key in list(self.by_mc.keys()):
+            subs = [ s for s in self.by_mc[key] if s[0] != handler ]
+            if (subs):
+                self.by_mc[key] = subs
+            else:
+                del self.by_mc[key]
+                pass
+            pass
+        return
+
+    def event_cb(self, domain, ev):
+        key = mc_id_key(ev.get_mc_id())
+        for (handler, flt) in self.by_mc.get(key, ()):
+            if ((flt == None) or flt.match(ev)):
+                handler.event_cb(domain, ev)
+                pass
+            pass
+        for (handler, flt) in self.domain_wide:
+            if ((flt == None)
+                or (flt.match_mc_key(key) and flt.match(ev))):
+                handler.event_cb(domain, ev)
+                pass
+            pass
+        return
+
+    pass
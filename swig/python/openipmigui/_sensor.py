@@ -29,19 +29,79 @@
 #  License along with this program; if not, write to the Free
 #  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
 #
+import time
 import OpenIPMI
-from openipmigui import gui_popup
-from openipmigui import gui_setdialog
 from openipmigui import _oi_logging
+from openipmigui import _sched
+from openipmigui import _history
+from openipmigui import _metrics
+from openipmigui import _index
 
 class SensorRefreshData:
+    # Reads go through the GUI's request limiter, which calls
+    # start_request() when the MC has room for another read.
     def __init__(self, s):
         self.s = s
+        self.limiter = s.ui.limiter
         return
 
+    def start_request(self):
+        return self.s.sensor_id.to_sensor(self)
+
     def sensor_cb(self, sensor):
+        rv = 1
         if (sensor.is_readable()):
-            sensor.get_value(self.s)
+            rv = sensor.get_value_mask(self)
+            pass
+        if (rv):
+            self.limiter.done(self, rv)
+            pass
+        return
+
+    def threshold_reading_mask_cb(self, sensor, err, raw_set, raw, value_set,
+                                  value, flags, states):
+        self.limiter.done(self, err)
+        self.s.threshold_reading_mask_cb(sensor, err, raw_set, raw,
+                                         value_set, value, flags, states)
+        return
+
+    def discrete_states_mask_cb(self, sensor, err, flags, states):
+        self.limiter.done(self, err)
+        self.s.discrete_states_mask_cb(sensor, err, flags, states)
+        return
+
+    pass
+
+
+class SensorPollInfo:
+    # The thresholds and event enables the adaptive poll period uses.
+    # These are read through the request limiter the first time the
+    # sensor is read, not when it is created, so bringing up a domain
+    # does not send them all at once.
+    def __init__(self, s, func):
+        self.s = s
+        self.func = func
+        self.limiter = s.ui.limiter
+        return
+
+    def start_request(self):
+        return self.s.sensor_id.to_sensor(self)
+
+    def sensor_cb(self, sensor):
+        rv = getattr(sensor, self.func)(self)
+        if (rv):
+            self.limiter.done(self, rv)
+            pass
+        return
+
+    def sensor_get_thresholds_cb(self, sensor, err, th):
+        self.limiter.done(self, err)
+        self.s.sensor_get_thresholds_cb(sensor, err, th)
+        return
+
+    def sensor_get_event_enable_cb(self, sensor, err, states):
+        self.limiter.done(self, err)
+        self.s.sensor_get_event_enable_cb(sensor, err, states)
         return
 
     pass
@@ -76,6 +136,58 @@ def threshold_str_to_full(s):
     i = threshold_strings.index(s)
     return threshold_full_strings[i]
 
+# Decoding of the integer states from sensor.get_value_mask().  Bit n
+# of a threshold mask is threshold n in the IPMI order (lower
+# non-critical is bit 0), bit n of a discrete mask is offset n.  The
+# threshold strings and severities are tabled, there are only 64
+# masks.
+threshold_mask_strings = [ 'ln', 'lc', 'lr', 'un', 'uc', 'ur' ]
+states_flag_strings = [ 'events', 'scanning', 'busy' ]
+
+def mask_to_list(mask, names):
+    rv = [ ]
+    i = 0
+    while (mask != 0):
+        if (mask & 1):
+            rv.append(names[i])
+            pass
+        mask >>= 1
+        i += 1
+        pass
+    return rv
+
+def threshold_mask_to_list(mask):
+    return mask_to_list(mask, threshold_mask_strings)
+
+def discrete_mask_to_list(mask):
+    return mask_to_list(mask, [ str(i) for i in range(0, 15) ])
+
+def states_flags_to_list(flags):
+    return mask_to_list(flags, states_flag_strings)
+
+threshold_mask_str = [ ' '.join(threshold_mask_to_list(m))
+                       for m in range(0, 64) ]
+states_flags_str = [ ' '.join(states_flags_to_list(f))
+                     for f in range(0, 8) ]
+
+def states_mask_str(flags, states):
+    """The string get_value() would have given for a threshold
+    sensor."""
+    f = states_flags_str[flags & 7]
+    st = threshold_mask_str[states & 63]
+    if (f == ""):
+        return st
+    if (st == ""):
+        return f
+    return f + " " + st
+
+# Severity of the most severe threshold out of range: 0 none,
+# 1 non-critical, 2 critical, 3 non-recoverable.
+threshold_severity = [ 0, 1, 2, 2, 3, 3, 3, 3 ]
+threshold_mask_severity = [ max(threshold_severity[m & 7],
+                                threshold_severity[m >> 3])
+                            for m in range(0, 64) ]
+
 threshold_event_strings = [ 'urha', 'urhd', 'urla', 'urld',
                             'ucha', 'uchd', 'ucla', 'ucld',
                             'unha', 'unhd', 'unla', 'unld',
@@ -140,6 +252,7 @@ class SensorHysteresisSet:
         return
 
     def sensor_get_hysteresis_cb(self, sensor, err, positive, negative):
+        from openipmigui import gui_setdialog
         if (err != 0):
             _oi_logging.error("Error getting sensor hysteresis: " + str(err))
             self.Destroy()
@@ -201,6 +314,7 @@ class SensorThresholdsSet:
         return
 
     def sensor_get_thresholds_cb(self, sensor, err, th):
+        from openipmigui import gui_setdialog
         if (err != 0):
             _oi_logging.error("Error getting sensor thresholds: " + str(err))
             return
@@ -279,10 +393,12 @@ class SensorEventEnablesSet:
         return
 
     def sensor_get_event_enable_cb(self, sensor, err, st):
+        from openipmigui import gui_setdialog
         if (err != 0):
             _oi_logging.error("Error getting sensor event enables: "
                               + str(err))
             return
+        self.s.probe_caps(sensor)
         defaults = [ False, False ]
         labels = [ "Enable Events", "Scanning" ]
         en = { }
@@ -328,6 +444,19 @@ class SensorEventEnablesSet:
     pass
 
 
+class SensorExpander:
+    # Builds the detail rows of a sensor the first time it is expanded
+    def __init__(self, s):
+        self.s = s
+        return
+
+    def sensor_cb(self, sensor):
+        self.s.add_details(sensor)
+        return
+
+    pass
+
+
 class Sensor:
     def __init__(self, e, sensor):
         if (e.ui.in_destroy):
@@ -340,35 +469,44 @@ class Sensor:
         ui = self.ui
         self.destroyed = False
         self.updater = SensorRefreshData(self)
+        m = sensor.get_mc()
+        self.mc_key = m.get_name()
+        self.conn_key = m.get_domain().get_name()
         ui.add_sensor(self.e, self)
+        self.metrics = ui.metrics
+        self.domain_name = e.d.name
+        sname = self.name
+        if (sname.startswith(e.name + ".")):
+            sname = sname[len(e.name) + 1:]
+            pass
+        self.metric_labels = _metrics.labels([ ("domain", self.domain_name),
+                                               ("entity", e.name),
+                                               ("sensor", sname) ])
         self.in_warning = False
         self.in_severe = False
         self.in_critical = False
-        self.ui.append_item(self, "Sensor Type",
-                            sensor.get_sensor_type_string())
-        self.ui.append_item(self, "Event Reading Type",
-                            sensor.get_event_reading_type_string())
-        m = sensor.get_mc()
-        self.ui.append_item(self, "Msg Routing Info",
-                            "MC: " + m.get_name()
-                            + "  LUN:" + str(sensor.get_lun())
-                            + "  Num:" + str(sensor.get_num()))
-                            
+        self.poll = None
+        self.poll_info = [ ]
+        self.poll_info_queued = False
+        self.history = None
+
+        # Only the summary row is created here.  The detail rows and
+        # the capability probing behind them are done the first time
+        # the sensor is expanded, see add_details().
+        self.details_added = False
+        self.caps_probed = False
+        self.event_enables = None
+        self.thresholds = None
+        self.hysteresis = None
+
         self.event_support = sensor.get_event_support()
         es = self.event_support
-        self.ui.append_item(self, "Event Support",
-                            OpenIPMI.get_event_support_string(es))
-        if ((es == OpenIPMI.EVENT_SUPPORT_PER_STATE)
-            or (es == OpenIPMI.EVENT_SUPPORT_ENTIRE_SENSOR)):
-            self.event_enables = self.ui.append_item(self, "Event Enables",
-                                      None,
-                                      data = SensorInfoGetter(self,
-                                                       "get_event_enables"))
-            pass
+        get_enables = ((es == OpenIPMI.EVENT_SUPPORT_PER_STATE)
+                       or (es == OpenIPMI.EVENT_SUPPORT_ENTIRE_SENSOR))
 
         sensor.add_event_handler(self)
         if (sensor.is_readable()):
-            sensor.get_value(self)
+            self.DoUpdate()
             pass
         else:
             self.ui.set_item_text(self.treeroot, "(not readable)")
@@ -396,7 +534,58 @@ class Sensor:
                 self.threshold_sensor_units += '%'
                 pass
 
-            self.events_supported = [ ]
+            self.threshold_support = sensor.get_threshold_access()
+            ts = self.threshold_support
+            if (sensor.is_readable()):
+                self.history = _history.History()
+                self.poll = _sched.AdaptivePoll(ui.poll_min_time / 1000.0,
+                                                ui.poll_max_time / 1000.0)
+                if (get_enables):
+                    # Assume events are on until the enables say not
+                    self.poll.set_events(True)
+                    pass
+                if ((ts == OpenIPMI.THRESHOLD_ACCESS_SUPPORT_READABLE)
+                    or (ts == OpenIPMI.THRESHOLD_ACCESS_SUPPORT_SETTABLE)):
+                    self.poll_info.append(SensorPollInfo(self,
+                                                         "get_thresholds"))
+                    pass
+                if (get_enables):
+                    self.poll_info.append(SensorPollInfo(self,
+                                                         "get_event_enables"))
+                    pass
+                pass
+
+            self.hysteresis_support = sensor.get_hysteresis_support()
+            pass
+        else:
+            self.hysteresis_support = OpenIPMI.HYSTERESIS_SUPPORT_NONE
+            self.threshold_support = OpenIPMI.THRESHOLD_ACCESS_SUPPORT_NONE
+            self.threshold_sensor_units = None
+            pass
+        if (self.in_critical):
+            severity = "critical"
+        elif (self.in_severe):
+            severity = "severe"
+        elif (self.in_warning):
+            severity = "warning"
+        else:
+            severity = "ok"
+            pass
+        ui.index.set(self, kind="sensor", domain=self.domain_name,
+                     name=self.name, type=sensor.get_sensor_type_string(),
+                     entity=e.name, mc=self.mc_key, severity=severity,
+                     units=self.threshold_sensor_units)
+        return
+
+    def probe_caps(self, sensor):
+        # Find the supported events and states, this takes a lot of
+        # calls so it is only done when something needs them.
+        if (self.caps_probed):
+            return
+        self.caps_probed = True
+        es = self.event_support
+        self.events_supported = [ ]
+        if (self.is_threshold):
             if (es != OpenIPMI.EVENT_SUPPORT_NONE):
                 for i in threshold_event_strings:
                     ival = [ 0 ]
@@ -405,9 +594,69 @@ class Sensor:
                         self.events_supported.append(i)
                         pass
                     pass
+                pass
+            return
+
+        self.events_supported_name = { }
+        self.states_supported = [ ]
+        self.states_supported_name = { }
+        if (es != OpenIPMI.EVENT_SUPPORT_NONE):
+            for i in range(0, 15):
+                ival = [ 0 ]
+                rv = sensor.discrete_event_readable(i, ival)
+                if (rv == 0) and (ival[0] != 0):
+                    self.states_supported.append(str(i))
+                name = sensor.reading_name_string(i)
+                self.states_supported_name[str(i)] = name
+                for j in ['a', 'd']:
+                    ival = [ 0 ]
+                    sval = str(i) + j
+                    rv = sensor.discrete_event_supported(sval, ival)
+                    if (rv == 0) and (ival[0] != 0):
+                        self.events_supported.append(sval)
+                        self.events_supported_name[sval] = name
+                        pass
+                    pass
+                pass
+            pass
+        return
+
+    def HandleExpand(self, event):
+        if (not self.details_added):
+            self.details_added = True
+            self.sensor_id.to_sensor(SensorExpander(self))
+            pass
+        return
+
+    def add_details(self, sensor):
+        if (self.destroyed):
+            return
+        self.probe_caps(sensor)
+        self.ui.append_item(self, "Sensor Type",
+                            sensor.get_sensor_type_string())
+        self.ui.append_item(self, "Event Reading Type",
+                            sensor.get_event_reading_type_string())
+        m = sensor.get_mc()
+        self.ui.append_item(self, "Msg Routing Info",
+                            "MC: " + m.get_name()
+                            + "  LUN:" + str(sensor.get_lun())
+                            + "  Num:" + str(sensor.get_num()))
+                            
+        es = self.event_support
+        self.ui.append_item(self, "Event Support",
+                            OpenIPMI.get_event_support_string(es))
+        if ((es == OpenIPMI.EVENT_SUPPORT_PER_STATE)
+            or (es == OpenIPMI.EVENT_SUPPORT_ENTIRE_SENSOR)):
+            self.event_enables = self.ui.append_item(self, "Event Enables",
+                                      None,
+                                      data = SensorInfoGetter(self,
+                                                       "get_event_enables"))
+            pass
+
+        if (self.is_threshold):
+            if (es != OpenIPMI.EVENT_SUPPORT_NONE):
                 self.ui.append_item(self, "Threshold Events Supported",
                                     ' '.join(self.events_supported))
-
                 pass
             sval = ""
             fval = [ 0.0 ]
@@ -436,7 +685,6 @@ class Sensor:
                 self.ui.append_item(self, "Ranges", sval);
                 pass
 
-            self.threshold_support = sensor.get_threshold_access()
             ts = self.threshold_support
             self.ui.append_item(self, "Threshold Support",
                               OpenIPMI.get_threshold_access_support_string(ts))
@@ -486,7 +734,6 @@ class Sensor:
 
             self.settable_thresholds = sval
 
-            self.hysteresis_support = sensor.get_hysteresis_support()
             hs = self.hysteresis_support
             self.ui.append_item(self, "Hysteresis Support",
                                 OpenIPMI.get_hysteresis_support_string(hs))
@@ -498,43 +745,16 @@ class Sensor:
                                                              "get_hysteresis"))
                 pass
             pass
-        else:
-            self.hysteresis_support = OpenIPMI.HYSTERESIS_SUPPORT_NONE
-            self.threshold_support = OpenIPMI.THRESHOLD_ACCESS_SUPPORT_NONE
-
-            self.events_supported = [ ]
-            self.events_supported_name = { }
-            self.states_supported = [ ]
-            self.states_supported_name = { }
-            if (es != OpenIPMI.EVENT_SUPPORT_NONE):
-                for i in range(0, 15):
-                    ival = [ 0 ]
-                    rv = sensor.discrete_event_readable(i, ival)
-                    if (rv == 0) and (ival[0] != 0):
-                        self.states_supported.append(str(i))
-                    name = sensor.reading_name_string(i)
-                    self.states_supported_name[str(i)] = name
-                    for j in ['a', 'd']:
-                        ival = [ 0 ]
-                        sval = str(i) + j
-                        rv = sensor.discrete_event_supported(sval, ival)
-                        if (rv == 0) and (ival[0] != 0):
-                            self.events_supported.append(sval)
-                            self.events_supported_name[sval] = name
-                            pass
-                        pass
-                    pass
-                            
-                self.ui.append_item(self, "Events Supported",
-                                    ' '.join(self.events_supported))
-                self.ui.append_item(self, "States Reported",
-                                    ' '.join(self.states_supported))
-                names = self.ui.append_item(self, "State Names", "")
-                for i in self.states_supported:
-                    self.ui.append_item(None, str(i),
-                                        self.states_supported_name[str(i)],
-                                        parent=names)
-                    pass
+        elif (es != OpenIPMI.EVENT_SUPPORT_NONE):
+            self.ui.append_item(self, "Events Supported",
+                                ' '.join(self.events_supported))
+            self.ui.append_item(self, "States Reported",
+                                ' '.join(self.states_supported))
+            names = self.ui.append_item(self, "State Names", "")
+            for i in self.states_supported:
+                self.ui.append_item(None, str(i),
+                                    self.states_supported_name[str(i)],
+                                    parent=names)
                 pass
             pass
         return
@@ -543,10 +763,11 @@ class Sensor:
         return self.name
 
     def DoUpdate(self):
-        self.sensor_id.to_sensor(self.updater)
+        self.ui.limiter.submit(self.mc_key, self.conn_key, self.updater)
         return
 
     def HandleMenu(self, event):
+        from openipmigui import gui_popup
         if (self.impt_data == None):
             l = [ [ "Add to watch values", self.add_impt ] ]
             pass
@@ -598,6 +819,12 @@ class Sensor:
     def remove(self):
         self.e.sensors.pop(self.name)
         self.ui.remove_sensor(self)
+        self.ui.limiter.cancel(self.updater)
+        for i in self.poll_info:
+            self.ui.limiter.cancel(i)
+            pass
+        self.metrics.remove(self)
+        self.ui.index.remove(self)
         self.destroyed = True
         self.e = None
         self.updater = None
@@ -607,58 +834,60 @@ class Sensor:
     def handle_threshold_states(self, states):
         if (self.destroyed):
             return
-        th = states.split()
-        while len(th) > 0:
-            v = th[0]
-            del th[0]
-
-            if (v == "un") or (v == "ln"):
-                if (not self.in_warning):
-                    self.in_warning = True
-                    self.ui.incr_item_warning(self.treeroot)
-                    pass
-                pass
+        severity = threshold_mask_severity[states & 63]
+        warning = (severity == 1)
+        severe = (severity == 2)
+        critical = (severity == 3)
+        if (warning != self.in_warning):
+            self.in_warning = warning
+            if (warning):
+                self.ui.incr_item_warning(self.treeroot)
             else:
-                if (self.in_warning):
-                    self.in_warning = False
-                    self.ui.decr_item_warning(self.treeroot)
-                    pass
-                pass
-
-            if (v == "uc") or (v == "lc"):
-                if (not self.in_severe):
-                    self.in_severe = True
-                    self.ui.incr_item_severe(self.treeroot)
-                    pass
+                self.ui.decr_item_warning(self.treeroot)
                 pass
+            pass
+        if (severe != self.in_severe):
+            self.in_severe = severe
+            if (severe):
+                self.ui.incr_item_severe(self.treeroot)
             else:
-                if (self.in_severe):
-                    self.in_severe = False
-                    self.ui.decr_item_severe(self.treeroot)
-                    pass
-                pass
-
-            if (v == "ur") or (v == "lr"):
-                if (not self.in_critical):
-                    self.in_critical = True
-                    self.ui.incr_item_critical(self.treeroot)
-                    pass
+                self.ui.decr_item_severe(self.treeroot)
                 pass
+            pass
+        if (critical != self.in_critical):
+            self.in_critical = critical
+            if (critical):
+                self.ui.incr_item_critical(self.treeroot)
             else:
-                if (self.in_critical):
-                    self.in_critical = False
-                    self.ui.decr_item_critical(self.treeroot)
-                    pass
+                self.ui.decr_item_critical(self.treeroot)
                 pass
             pass
+        self.ui.index.set(self, severity=_index.severity_names[severity])
+        return severity
+
+    def set_metric(self, name, value, lbls=None):
+        if (lbls == None):
+            lbls = self.metric_labels
+            pass
+        self.metrics.set(self, self.domain_name, name, lbls, value)
+        return
+
+    def reading_failed(self):
+        self.ui.set_item_text(self.treeroot, None)
+        self.set_metric("openipmi_sensor_reading_valid", False)
+        self.metrics.unset(self, "openipmi_sensor_value", self.metric_labels)
+        self.metrics.unset(self, "openipmi_sensor_raw_value",
+                           self.metric_labels)
+        self.metrics.unset(self, "openipmi_sensor_discrete_states",
+                           self.metric_labels)
         return
 
-    def threshold_reading_cb(self, sensor, err, raw_set, raw, value_set,
-                             value, states):
+    def threshold_reading_mask_cb(self, sensor, err, raw_set, raw, value_set,
+                                  value, flags, states):
         if (self.destroyed):
             return
         if (err):
-            self.ui.set_item_text(self.treeroot, None)
+            self.reading_failed()
             return
         v = ""
         if (value_set):
@@ -667,32 +896,86 @@ class Sensor:
         if (raw_set):
             v += " (" + str(raw) + ")"
             pass
-        v += ": " + states
+        v += ": " + states_mask_str(flags, states)
         self.ui.set_item_text(self.treeroot, v)
-        self.handle_threshold_states(states)
+        severity = self.handle_threshold_states(states)
+        self.set_metric("openipmi_sensor_reading_valid", True)
+        self.set_metric("openipmi_sensor_last_update_seconds", time.time())
+        if (value_set):
+            self.set_metric("openipmi_sensor_value", value,
+                            self.metric_labels + ",units=\""
+                            + _metrics.escape(self.threshold_sensor_units)
+                            + "\"")
+            pass
+        if (raw_set):
+            self.set_metric("openipmi_sensor_raw_value", raw)
+            pass
+        self.set_metric("openipmi_sensor_threshold_severity", severity)
+        if (value_set) and (self.history != None):
+            self.history.add(value)
+            pass
+        if (value_set) and (self.poll != None):
+            period = self.poll.add_reading(value, severity > 0)
+            self.ui.set_poll_period(self.treeroot, period)
+            if (not self.poll_info_queued):
+                self.poll_info_queued = True
+                for i in self.poll_info:
+                    self.ui.limiter.submit(self.mc_key, self.conn_key, i)
+                    pass
+                pass
+            pass
         return
         
-    def discrete_states_cb(self, sensor, err, states):
+    def discrete_states_mask_cb(self, sensor, err, flags, states):
         if (self.destroyed):
             return
         if (err):
-            self.ui.set_item_text(self.treeroot, None)
+            self.reading_failed()
             return
-        self.ui.set_item_text(self.treeroot, states)
+        self.ui.set_item_text(self.treeroot,
+                              ' '.join(states_flags_to_list(flags)
+                                       + discrete_mask_to_list(states)))
+        self.set_metric("openipmi_sensor_reading_valid", True)
+        self.set_metric("openipmi_sensor_last_update_seconds", time.time())
+        self.set_metric("openipmi_sensor_discrete_states", states)
         return
         
     def sensor_get_event_enable_cb(self, sensor, err, states):
         if (self.destroyed):
             return
         if (err != 0):
-            self.ui.set_item_text(self.event_enables, None)
+            if (self.event_enables != None):
+                self.ui.set_item_text(self.event_enables, None)
+                pass
             return
-        self.ui.set_item_text(self.event_enables, states)
+        if (self.event_enables != None):
+            self.ui.set_item_text(self.event_enables, states)
+            pass
+        if (self.poll != None):
+            self.probe_caps(sensor)
+            self.poll.set_events(self.events_enabled(states))
+            pass
         return
 
+    def events_enabled(self, states):
+        # Threshold crossings only get reported if events are on and
+        # some assertion event we support is enabled.
+        st = states.split()
+        if ("events" not in st):
+            return False
+        if (self.event_support == OpenIPMI.EVENT_SUPPORT_ENTIRE_SENSOR):
+            return len(self.events_supported) > 0
+        for i in st:
+            if (i in self.events_supported) and (i[-1] == 'a'):
+                return True
+            pass
+        return False
+
     def sensor_get_hysteresis_cb(self, sensor, err, positive, negative):
         if (self.destroyed):
             return
+        if (self.hysteresis == None):
+            return
         if (err != 0):
             self.ui.set_item_text(self.hysteresis, None)
             return
@@ -705,17 +988,33 @@ class Sensor:
         if (self.destroyed):
             return
         if (err != 0):
-            self.ui.set_item_text(self.thresholds, None)
+            if (self.thresholds != None):
+                self.ui.set_item_text(self.thresholds, None)
+                pass
             return
-        self.ui.set_item_text(self.thresholds, th)
+        if (self.thresholds != None):
+            self.ui.set_item_text(self.thresholds, th)
+            pass
+        vals = [ ]
+        for i in th.split(":"):
+            i = i.split()
+            if (len(i) == 2):
+                vals.append(float(i[1]))
+                self.set_metric("openipmi_sensor_threshold", float(i[1]),
+                                self.metric_labels + ",threshold=\""
+                                + i[0] + "\"")
+                pass
+            pass
+        if (self.poll != None):
+            self.poll.set_thresholds(vals)
+            pass
         return
 
     def threshold_event_cb(self, sensor, event_spec, raw_set, raw,
                            value_set, value, event):
         if (self.destroyed):
             return OpenIPMI.EVENT_NOT_HANDLED
-        self.handle_threshold_states(event_spec)
-        sensor.get_value(self)
+        sensor.get_value_mask(self)
         return OpenIPMI.EVENT_NOT_HANDLED
         
     def discrete_event_cb(self, sensor, event_spec, severity, old_severity,
@@ -0,0 +1,364 @@
+# _view.py
+#
+# Display-independent view of the OpenIPMI object model
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+# The Domain, Entity, MC, Sensor, Control and Connection objects only
+# talk to their display through the "ui" object they are given.  The
+# Tix GUI (gui.IPMIGUI) is one implementation of that interface; View
+# below is another that keeps the same information without any
+# display, for running the model headless.  The gui_* modules need Tk,
+# so the model only imports them inside the menu and dialog handlers.
+
+from openipmigui import _oi_logging
+from openipmigui import _sched
+from openipmigui import _limiter
+from openipmigui import _metrics
+from openipmigui import _index
+
+class ViewItem:
+    def __init__(self, item):
+        self.treestr = item
+        return
+
+    pass
+
+class View:
+    def __init__(self, mainhandler, refresh_time=10.0, info_refresh_time=600.0,
+                 poll_min_time=2000, poll_max_time=60000,
+                 mc_max_in_flight=2, conn_max_in_flight=8,
+                 conn_read_rate=50.0, conn_read_burst=20):
+        self.mainhandler = mainhandler
+        self.in_destroy = False
+        self.logevents = False
+        self.itemval = 0
+        self.treedata = { }
+        self.children = { }
+        self.parents = { }
+        self.treedata["D"] = ViewItem("D")
+        self.children["D"] = set()
+        self.setup_item("D", active=True)
+
+        # Sensors and controls are polled at the refresh time (or
+        # their adaptive period), everything else that can be
+        # refreshed is treated like a hidden GUI row and polled
+        # rarely.
+        self.sched = _sched.Scheduler(refresh_time,
+                                      hidden_period=info_refresh_time)
+        self.limiter = _limiter.RequestLimiter(mc_max_in_flight,
+                                               conn_max_in_flight,
+                                               conn_read_rate,
+                                               conn_read_burst)
+        self.poll_min_time = poll_min_time
+        self.poll_max_time = poll_max_time
+        self.metrics = _metrics.Snapshot()
+        self.index = _index.ObjectIndex()
+        self.selarchive = None
+        return
+
+    def run(self):
+        """Do whatever polling is due, returns the number of seconds
+        until something else is due."""
+        self.sched.run()
+        self.limiter.run()
+        if (self.limiter.pending()):
+            return 0.2
+        delay = self.sched.next_due()
+        if (delay == None):
+            delay = self.sched.class_period[_sched.PRIO_VISIBLE]
+            pass
+        return delay
+
+    def ReportError(self, str):
+        _oi_logging.error(str)
+        return
+
+    def new_log(self, log):
+        self.mainhandler.log("INFO", log)
+        return
+
+    # Tree handling.  Items use the same dotted keys as the GUI, but an
+    # entity keeps its key when it moves, so parents are tracked.
+    def parent_item(self, item):
+        return self.parents.get(item)
+
+    def new_item(self, parent, data, suffix=None):
+        if (suffix == None):
+            item = parent + "." + str(self.itemval)
+            self.itemval += 1
+        else:
+            item = parent + "." + suffix
+            pass
+        if (data == None):
+            data = ViewItem(item)
+            pass
+        self.treedata[item] = data
+        self.children[item] = set()
+        self.parents[item] = parent
+        if (parent in self.children):
+            self.children[parent].add(item)
+            pass
+        return (item, data)
+
+    def setup_item(self, item, active=False, type=None):
+        data = self.treedata[item]
+        data.active = active
+        data.num_warning = 0
+        data.num_severe = 0
+        data.num_critical = 0
+        data.itemvalue = None
+        data.impt_data = None
+        return
+
+    def cleanup_item(self, item):
+        data = self.treedata[item]
+        parent = self.parent_item(item)
+        if (parent == None):
+            return
+        for i in range(0, data.num_warning):
+            self.decr_item_warning(parent)
+            pass
+        for i in range(0, data.num_severe):
+            self.decr_item_severe(parent)
+            pass
+        for i in range(0, data.num_critical):
+            self.decr_item_critical(parent)
+            pass
+        return
+
+    def delete_item(self, item):
+        if (item not in self.treedata):
+            return
+        self.cleanup_item(item)
+        parent = self.parent_item(item)
+        self.forget_item(item)
+        if (parent in self.children):
+            self.children[parent].discard(item)
+            pass
+        return
+
+    def forget_item(self, item):
+        for child in list(self.children[item]):
+            self.forget_item(child)
+            pass
+        self.sched.remove(item)
+        del self.children[item]
+        del self.parents[item]
+        del self.treedata[item]
+        return
+
+    def move_item(self, item, new_parent):
+        old_parent = self.parent_item(item)
+        if (old_parent == new_parent):
+            return
+        data = self.treedata[item]
+        for name in ("num_warning", "num_severe", "num_critical"):
+            count = getattr(data, name)
+            if (count != 0):
+                self.adjust_count(old_parent, name, -count)
+                self.adjust_count(new_parent, name, count)
+                pass
+            pass
+        self.children[old_parent].discard(item)
+        self.children[new_parent].add(item)
+        self.parents[item] = new_parent
+        return
+
+    def sched_add(self, item, data, prio):
+        if (hasattr(data, "DoUpdate")):
+            self.sched.add(item, data, prio)
+            pass
+        return
+
+    def add_object(self, parent, o, active, prio=None, subitems=()):
+        o.name_str = str(o)
+        (item, data) = self.new_item(parent, o)
+        o.treeroot = item
+        self.setup_item(item, active=active)
+        for s in subitems:
+            (sitem, sdata) = self.new_item(item, None, s)
+            self.setup_item(sitem, active=True)
+            pass
+        if (prio != None):
+            self.sched_add(item, o, prio)
+            pass
+        return
+
+    def add_domain(self, d):
+        self.add_object("D", d, True, subitems=("E", "M", "C"))
+        return
+
+    def remove_domain(self, d):
+        if (hasattr(d, "treeroot")):
+            self.delete_item(d.treeroot)
+            pass
+        return
+
+    def add_connection(self, d, c):
+        self.add_object(d.treeroot + ".C", c, True)
+        return
+
+    def add_port(self, c, p):
+        self.add_object(c.treeroot, p, True)
+        return
+
+    def remove_port(self, p):
+        if (hasattr(p, "treeroot")):
+            self.delete_item(p.treeroot)
+            pass
+        return
+
+    def add_entity(self, d, e, parent=None):
+        if (parent == None):
+            parent = d.treeroot + ".E"
+        else:
+            parent = parent.treeroot
+            pass
+        self.add_object(parent, e, False, subitems=("S", "C"))
+        return
+
+    def reparent_entity(self, d, e, parent):
+        if (parent == None):
+            parent = d.treeroot + ".E"
+        else:
+            parent = parent.treeroot
+            pass
+        self.move_item(e.treeroot, parent)
+        return
+
+    def remove_entity(self, e):
+        if (hasattr(e, "treeroot")):
+            self.delete_item(e.treeroot)
+            pass
+        return
+
+    def add_mc(self, d, m):
+        self.add_object(d.treeroot + ".M", m, False)
+        return
+
+    def remove_mc(self, m):
+        if (hasattr(m, "treeroot")):
+            self.delete_item(m.treeroot)
+            pass
+        return
+
+    def add_sensor(self, e, s):
+        self.add_object(e.treeroot + ".S", s, True, _sched.PRIO_VISIBLE)
+        return
+
+    def remove_sensor(self, s):
+        if (hasattr(s, "treeroot")):
+            self.delete_item(s.treeroot)
+            pass
+        return
+
+    def add_control(self, e, c):
+        self.add_object(e.treeroot + ".C", c, True, _sched.PRIO_VISIBLE)
+        return
+
+    def remove_control(self, c):
+        if (hasattr(c, "treeroot")):
+            self.delete_item(c.treeroot)
+            pass
+        return
+
+    def append_item(self, o, name, value, data=None, parent=None):
+        if (parent == None):
+            parent = o.treeroot
+            pass
+        (item, data) = self.new_item(parent, data)
+        data.name_str = name
+        data.itemvalue = value
+        self.sched_add(item, data, _sched.PRIO_HIDDEN)
+        return item
+
+    def prepend_item(self, o, name, value, data=None):
+        return self.append_item(o, name, value, data)
+
+    def set_item_text(self, item, value):
+        if (item in self.treedata):
+            self.treedata[item].itemvalue = value
+            pass
+        return
+
+    def set_item_active(self, item):
+        self.treedata[item].active = True
+        return
+
+    def set_item_inactive(self, item):
+        self.treedata[item].active = False
+        return
+
+    def adjust_count(self, item, name, delta):
+        while (item != None):
+            if (item not in self.treedata):
+                return
+            data = self.treedata[item]
+            setattr(data, name, getattr(data, name) + delta)
+            item = self.parent_item(item)
+            pass
+        return
+
+    def incr_item_warning(self, item):
+        self.adjust_count(item, "num_warning", 1)
+        return
+
+    def decr_item_warning(self, item):
+        self.adjust_count(item, "num_warning", -1)
+        return
+
+    def incr_item_severe(self, item):
+        self.adjust_count(item, "num_severe", 1)
+        return
+
+    def decr_item_severe(self, item):
+        self.adjust_count(item, "num_severe", -1)
+        return
+
+    def incr_item_critical(self, item):
+        self.adjust_count(item, "num_critical", 1)
+        return
+
+    def decr_item_critical(self, item):
+        self.adjust_count(item, "num_critical", -1)
+        return
+
+    def set_poll_period(self, item, period):
+        self.sched.set_period(item, period)
+        return
+
+    # There is no watch list without a display
+    def add_impt_data(self, type, name, obj=None):
+        return
+
+    def remove_impt_data(self, data):
+        return
+
+    pass
@@ -38,10 +38,15 @@ except:
 import OpenIPMI
 from openipmigui import _saveprefs
 from openipmigui import _oi_logging
+from openipmigui import _sched
+from openipmigui import _limiter
+from openipmigui import _metrics
+from openipmigui import _index
 from openipmigui import gui_domainDialog
 from openipmigui import gui_errstr
 from openipmigui import gui_cmdwin
 from openipmigui import gui_list
+from openipmigui import gui_filter
 from openipmigui import gui_popup
 from openipmigui import gui_winsys
 
@@ -57,6 +62,20 @@ init_impt_objs = [ ]
 
 refresh_timer_time = 10000
 
+# Limits on outstanding sensor and control reads.  The rate is reads
+# per second per connection.
+init_mc_max_in_flight = 2
+init_conn_max_in_flight = 8
+init_conn_read_rate = 50.0
+init_conn_read_burst = 20
+
+# Bounds for the adaptive poll period of analog sensors, in ms
+init_poll_min_time = 2000
+init_poll_max_time = 60000
+
+# How many times a second queued tree updates are sent to Tk
+init_update_rate = 10
+
 class IPMITreeDummyItem:
     def __init__(self, treestr):
         self.treestr = treestr
@@ -64,6 +83,27 @@ class IPMITreeDummyItem:
 
     pass
 
+class TreeNode:
+    # The model of a row in the object tree.  Rows only get an HList
+    # entry while they are shown, meaning all their parents are open,
+    # so the text and styles are kept here and pushed to the widget
+    # when the row is shown.  The item keys never change, the HList
+    # path of a row is built from its current parents when it is
+    # shown, so a subtree can be moved without touching the keys.
+    def __init__(self, text, style, openable, parent):
+        self.text = text
+        self.parent = parent
+        self.path = None
+        self.style = style
+        self.value = ""
+        self.children = [ ]
+        self.openable = openable
+        self.expanded = False
+        self.shown = False
+        return
+
+    pass
+
 class IPMICloser:
     def __init__(self, ui, count):
         self.ui = ui
@@ -111,6 +151,8 @@ class ImptObj:
 
     pass
 
+# The Tix view of the object model.  _view.View implements the same
+# interface without a display.
 class IPMIGUI(Tix.Frame):
     def __init__(self, top, mainhandler):
         Tix.Frame.__init__(self, top, bd=2, relief=Tix.RAISED)
@@ -180,6 +222,8 @@ class IPMIGUI(Tix.Frame):
                              command = lambda self=self: self.CollapseAll() )
         top.bind_all("<Control-C>", self.CollapseAll)
         top.bind_all("<Control-c>", self.CollapseAll)
+        viewmenu.add_command(label="Request Statistics", underline=0,
+                             command = lambda self=self: self.LogStats() )
 
         setb = Tix.Menubutton(self, text="Settings", underline=0, takefocus=0)
         viewmenu = Tix.Menu(setb, tearoff=0)
@@ -204,13 +248,35 @@ class IPMIGUI(Tix.Frame):
         objpane = hpane.add("objects", size=init_bsashposition)
         evpane = hpane.add("events")
 
+        filterbar = Tix.Frame(objpane)
+        Tix.Label(filterbar, text="Filter:").pack(side=Tix.LEFT)
+        self.filterentry = Tix.Entry(filterbar)
+        self.filterentry.pack(side=Tix.LEFT, fill=Tix.X, expand=1)
+        self.filterentry.bind("<Return>", self.ApplyFilter)
+        filterbar.pack(side=Tix.TOP, fill=Tix.X)
+        self.filterlist = None
+
         self.tree = Tix.Tree(objpane, options="hlist.columns 2")
+        self.tree.configure(opencmd=self.TreeOpen, closecmd=self.TreeClose)
         # FIXME: This doesn't work, and I don't know why
         self.tree.hlist.configure(selectbackground="beige")
         self.tree.hlist.add("D", itemtype=Tix.TEXT, text="Domains")
+        self.tree.hlist.item_create("D", 1, itemtype=Tix.TEXT, text="")
         self.tree.setmode("D", "none")
         self.treedata = { }
         self.treedata["D"] = IPMITreeDummyItem("D")
+        self.nodes = { }
+        self.dirty = set()
+        self.dirty_impt = set()
+        self.recolor = set()
+        self.pending_counts = { }
+        self.flush_id = None
+        self.flush_time_ms = int(1000 / init_update_rate)
+        self.nodes["D"] = TreeNode("Domains", self.active_style, False, None)
+        self.nodes["D"].shown = True
+        self.nodes["D"].path = "D"
+        self.paths = { "D" : "D" }
+        self.nodes["D"].expanded = True
         self.setup_item("D", active=True)
         self.tree.pack(side=Tix.TOP, fill=Tix.BOTH, expand=1)
         self.tree.hlist.bind("<Button-3>", self.TreeMenu)
@@ -263,9 +329,23 @@ class IPMIGUI(Tix.Frame):
         self.impt_objs["sensor"] = { }
         self.impt_objs["entity"] = { }
         
-        self.last_scan = None
+        # Anything in the tree with a DoUpdate method gets polled from
+        # the scheduler.  Hidden items are parked until they are shown.
+        self.sched = _sched.Scheduler(refresh_timer_time / 1000.0)
+        self.limiter = _limiter.RequestLimiter(init_mc_max_in_flight,
+                                               init_conn_max_in_flight,
+                                               init_conn_read_rate,
+                                               init_conn_read_burst)
+        self.poll_min_time = init_poll_min_time
+        self.poll_max_time = init_poll_max_time
+        # Kept up to date by the model for the metrics exporter
+        self.metrics = _metrics.Snapshot()
+        # Lookups for the filter bar, also kept up to date by the model
+        self.index = _index.ObjectIndex()
+        # Set by the main program if SELs are archived
+        self.selarchive = None
         self.timer_timeout_ms = 200
-        top.after(self.timer_timeout_ms, self.Timeout)
+        self.timer_id = top.after(self.timer_timeout_ms, self.Timeout)
 
         for i in init_impt_objs:
             self.add_impt_data(i[0], i[1])
@@ -314,6 +394,9 @@ class IPMIGUI(Tix.Frame):
 
     def setup_impt_data(self, data, obj):
         data.obj = obj
+        if (hasattr(obj, "treeroot")):
+            self.sched.set_prio(obj.treeroot, _sched.PRIO_WATCHED)
+            pass
         self.set_impt_active_change(obj)
         self.imptobjs.SetColumnStyle(obj.impt_data.key, 0, self.active_style)
         self.set_impt_data_text(obj)
@@ -357,53 +440,261 @@ class IPMIGUI(Tix.Frame):
         del self.impt_objs[data.type][data.name]
         if (obj != None):
             obj.impt_data = None
+            if (hasattr(obj, "treeroot")):
+                self.sched.set_prio(obj.treeroot,
+                                    self.visible_prio(obj.treeroot))
+                pass
             pass
         return
 
     def Timeout(self):
         if (self.in_destroy):
             return
-        callcount = 0
-        checkcount = 0
-        if (self.last_scan != None):
-            next = self.last_scan
+        self.sched.run()
+        self.limiter.run()
+        delay = self.sched.next_due()
+        if (self.limiter.pending()):
+            # Reads are waiting on the rate limit
+            ms = self.timer_timeout_ms
+        elif (delay == None):
+            ms = refresh_timer_time
+        else:
+            # Always give the rest of the GUI a chance to run, and
+            # wake up at least every refresh period.
+            ms = int(delay * 1000)
+            if (ms < self.timer_timeout_ms):
+                ms = self.timer_timeout_ms
+            elif (ms > refresh_timer_time):
+                ms = refresh_timer_time
+                pass
+            pass
+        self.timer_id = self.top.after(ms, self.Timeout)
+        return
+
+    def KickTimer(self):
+        # Something just became due, don't wait for the current timer.
+        if (self.in_destroy):
+            return
+        self.top.after_cancel(self.timer_id)
+        self.timer_id = self.top.after(self.timer_timeout_ms, self.Timeout)
+        return
+
+    def visible_prio(self, item):
+        if (self.nodes[item].shown):
+            return _sched.PRIO_VISIBLE
+        return _sched.PRIO_HIDDEN
+
+    def sched_add(self, item, data):
+        if (not hasattr(data, "DoUpdate")):
+            return
+        if (hasattr(data, "impt_data") and (data.impt_data != None)):
+            prio = _sched.PRIO_WATCHED
+        else:
+            prio = self.visible_prio(item)
+            pass
+        self.sched.add(item, data, prio)
+        return
+
+    def set_poll_period(self, item, period):
+        self.sched.set_period(item, period)
+        return
+
+    def sched_set_visible(self, item, visible):
+        prio = self.sched.get_prio(item)
+        if (prio != None) and (prio != _sched.PRIO_WATCHED):
+            if (visible):
+                self.sched.set_prio(item, _sched.PRIO_VISIBLE)
+            else:
+                self.sched.set_prio(item, _sched.PRIO_HIDDEN)
+                pass
+            pass
+        return
+
+    # Tree model handling.  Everything goes into self.nodes, HList
+    # entries are created when a row's parent is opened and deleted
+    # when it is closed.
+    def add_node(self, parent, item, data, text, value="", style=None,
+                 openable=False, at_start=False):
+        if (style == None):
+            style = self.active_style
+            pass
+        node = TreeNode(text, style, openable, parent)
+        node.value = value
+        self.nodes[item] = node
+        self.treedata[item] = data
+        self.link_node(parent, item, at_start)
+        return node
+
+    def link_node(self, parent, item, at_start=False):
+        pnode = self.nodes[parent]
+        if (at_start):
+            pnode.children.insert(0, item)
         else:
-            # Scan important objects first
-            next = self.tree.hlist.info_next("D")
-            for i in self.impt_objs.values():
-                for j in i.values():
-                    if (j.obj != None) and hasattr(j.obj, "DoUpdate"):
-                        callcount = callcount + 1
-                        j.obj.DoUpdate()
-                        pass
-                    checkcount = checkcount + 1
+            pnode.children.append(item)
+            pass
+        if (pnode.expanded):
+            if (pnode.shown):
+                if (at_start):
+                    self.show_node(item, 0)
+                else:
+                    self.show_node(item)
                     pass
                 pass
             pass
-        while (callcount < 100) and (checkcount < 1000) and (next != ""):
-            if (self.tree.hlist.info_hidden(next) == "1"):
-                # Not on the screen, ignore it
-                next = self.tree.hlist.info_next(next)
-                continue
-            data = self.treedata[next]
-            if (data != None) and (hasattr(data, "DoUpdate")):
-                callcount = callcount + 1
-                data.DoUpdate()
+        elif (not pnode.openable):
+            pnode.openable = True
+            if (pnode.shown):
+                self.tree.setmode(pnode.path, "open")
                 pass
-            next = self.tree.hlist.info_next(next)
-            checkcount = checkcount + 1
             pass
-            
-        if (next != ""):
-            self.last_scan = next
-            self.top.after(self.timer_timeout_ms, self.Timeout)
+        return
+
+    def show_node(self, item, at=None):
+        node = self.nodes[item]
+        path = self.nodes[node.parent].path + "." + item[item.rfind(".")+1:]
+        node.path = path
+        self.paths[path] = item
+        if (at == None):
+            self.tree.hlist.add(path, itemtype=Tix.TEXT, text=node.text,
+                                style=node.style)
         else:
-            self.last_scan = None
-            self.top.after(refresh_timer_time, self.Timeout)
+            self.tree.hlist.add(path, itemtype=Tix.TEXT, text=node.text,
+                                style=node.style, at=at)
+            pass
+        self.tree.hlist.item_create(path, 1, itemtype=Tix.TEXT,
+                                    text=node.value, style=self.active_style)
+        node.shown = True
+        self.sched_set_visible(item, True)
+        if (node.expanded):
+            self.tree.setmode(path, "close")
+            for child in node.children:
+                self.show_node(child)
+                pass
+            pass
+        elif (node.openable):
+            self.tree.setmode(path, "open")
+        else:
+            self.tree.setmode(path, "none")
             pass
-        
         return
-        
+
+    def unshow_node(self, item):
+        # The caller removes the HList entries
+        node = self.nodes[item]
+        node.shown = False
+        del self.paths[node.path]
+        node.path = None
+        self.sched_set_visible(item, False)
+        for child in node.children:
+            if (self.nodes[child].shown):
+                self.unshow_node(child)
+                pass
+            pass
+        return
+
+    def set_item_style(self, item, style):
+        node = self.nodes[item]
+        if (node.style != style):
+            node.style = style
+            if (node.shown):
+                self.mark_dirty(item)
+                pass
+            pass
+        return
+
+    def set_item_value(self, item, value):
+        node = self.nodes[item]
+        if (node.value != value):
+            node.value = value
+            if (node.shown):
+                self.mark_dirty(item)
+                pass
+            pass
+        return
+
+    def TreeOpen(self, path):
+        # Replaces the default Tix open command, so show the children.
+        # Objects can add children from HandleExpand, they are shown
+        # along with the rest.
+        item = self.paths[path]
+        data = self.treedata[item]
+        if (hasattr(data, "HandleExpand")):
+            data.HandleExpand(None)
+            pass
+        node = self.nodes[item]
+        node.expanded = True
+        for child in node.children:
+            self.show_node(child)
+            pass
+        self.KickTimer()
+        return
+
+    def TreeClose(self, path):
+        item = self.paths[path]
+        node = self.nodes[item]
+        node.expanded = False
+        for child in node.children:
+            if (self.nodes[child].shown):
+                self.unshow_node(child)
+                pass
+            pass
+        self.tree.hlist.delete_offsprings(path)
+        return
+
+    def forget_item(self, item):
+        for child in self.nodes[item].children:
+            self.forget_item(child)
+            pass
+        self.sched.remove(item)
+        del self.nodes[item]
+        del self.treedata[item]
+        return
+
+    def delete_tree_item(self, item):
+        # Drop the row and everything under it from the model, the
+        # scheduler and, if it is shown, the widget.
+        if (item not in self.nodes):
+            return
+        node = self.nodes[item]
+        parent = node.parent
+        if (node.shown):
+            path = node.path
+            self.unshow_node(item)
+            self.tree.hlist.delete_entry(path)
+            pass
+        self.forget_item(item)
+        if (parent in self.nodes):
+            self.nodes[parent].children.remove(item)
+            pass
+        return
+
+    def move_subtree(self, item, new_parent):
+        # Re-link a row and everything under it to a new parent.  Only
+        # the severity counts of the old and new parents change, the
+        # rows under it keep their keys and state.
+        node = self.nodes[item]
+        old_parent = node.parent
+        if (old_parent == new_parent):
+            return
+        data = self.treedata[item]
+        self.propagate_counts()
+        counts = [ data.num_warning, data.num_severe, data.num_critical ]
+        if (node.shown):
+            path = node.path
+            self.unshow_node(item)
+            self.tree.hlist.delete_entry(path)
+            pass
+        self.nodes[old_parent].children.remove(item)
+        node.parent = new_parent
+        self.link_node(new_parent, item)
+        if (counts != [ 0, 0, 0 ]):
+            self.add_counts(old_parent, self.treedata[old_parent],
+                            [ -counts[0], -counts[1], -counts[2] ])
+            self.add_counts(new_parent, self.treedata[new_parent], counts)
+            self.queue_flush()
+            pass
+        return
+
     def quit(self, event=None):
         self.mainhandler.destroy()
         return
@@ -427,31 +718,86 @@ class IPMIGUI(Tix.Frame):
         self.mainhandler.savePrefs()
         return
 
+    def ApplyFilter(self, event=None):
+        text = self.filterentry.get().strip()
+        if (text == ""):
+            return
+        try:
+            objs = self.index.find(text)
+        except ValueError as e:
+            self.ReportError(str(e))
+            return
+        if (self.filterlist == None):
+            self.filterlist = gui_filter.FilterResults(self)
+            pass
+        self.filterlist.Fill(text, objs)
+        return
+
+    def ShowItem(self, item):
+        # Open everything above the item and scroll to it
+        if (item not in self.nodes):
+            return
+        above = [ ]
+        parent = self.parent_item(item)
+        while (parent != None):
+            above.insert(0, parent)
+            parent = self.parent_item(parent)
+            pass
+        for i in above:
+            node = self.nodes[i]
+            if (not node.expanded) and (node.path != None):
+                self.tree.open(node.path)
+                pass
+            pass
+        path = self.nodes[item].path
+        if (path != None):
+            self.tree.hlist.see(path)
+            self.tree.hlist.selection_clear()
+            self.tree.hlist.selection_set(path)
+            pass
+        return
+
     def ExpandItem(self, item):
-        children = self.tree.hlist.info_children(item)
-        for child in children:
-            self.tree.open(child)
-            self.ExpandItem(child)
+        for child in list(self.nodes[item].children):
+            node = self.nodes[child]
+            if (node.openable):
+                if (not node.expanded):
+                    self.tree.open(node.path)
+                    pass
+                self.ExpandItem(child)
+                pass
             pass
         return
         
     def ExpandAll(self, event=None):
-        self.tree.open("D")
         self.ExpandItem("D")
         return
         
-    def CollapseItem(self, item):
-        children = self.tree.hlist.info_children(item)
-        for child in children:
-            self.tree.close(child)
-            self.ExpandItem(child)
+    def CollapseAll(self, event=None):
+        for child in self.nodes["D"].children:
+            node = self.nodes[child]
+            if (node.expanded):
+                self.tree.close(node.path)
+                pass
+            pass
+        for (item, node) in self.nodes.items():
+            if (item != "D"):
+                node.expanded = False
+                pass
             pass
         return
         
-    def CollapseAll(self, event=None):
-        self.CollapseItem("D")
+    def LogStats(self, event=None):
+        l = self.limiter
+        self.new_log("Outstanding read statistics:")
+        for k in sorted(l.conn_stats.keys()):
+            self.new_log("  connection " + k + ": " + str(l.conn_stats[k]))
+            pass
+        for k in sorted(l.mc_stats.keys()):
+            self.new_log("  MC " + k + ": " + str(l.mc_stats[k]))
+            pass
         return
-        
+
     def EnableEvents(self, event=None):
         self.logevents = self.logeventsv.get() != 0
         print("logevents = " + str(self.logevents))
@@ -496,22 +842,23 @@ class IPMIGUI(Tix.Frame):
         else:
             data.impt_data = None
             pass
-        self.tree.hlist.item_create(item, 1, itemtype=Tix.TEXT, text="",
-                                    style=self.active_style)
+        self.set_item_value(item, "")
         if (not active):
-            self.tree.hlist.item_configure(item, 0, style=self.inactive_style)
+            self.set_item_style(item, self.inactive_style)
             pass
         else:
-            self.tree.hlist.item_configure(item, 0, style=self.active_style)
+            self.set_item_style(item, self.active_style)
             pass
         return
 
     def cleanup_item(self, item):
         if (self.in_destroy):
             return
-        data = self.treedata[item]
+        data = self.treedata.get(item)
         if (data == None):
             return
+        # Get the counts from below before passing them up
+        self.propagate_counts()
         if (data.impt_data != None):
             self.cleanup_impt_data(data)
             pass
@@ -539,129 +886,78 @@ class IPMIGUI(Tix.Frame):
         item = "D." + str(self.itemval)
         self.itemval += 1
         d.treeroot = item
-        self.tree.hlist.add(d.treeroot, itemtype=Tix.TEXT, text=d.name_str)
-        self.tree.setmode(d.treeroot, "open")
-        self.tree.close(d.treeroot)
-        self.treedata[d.treeroot] = d
+        self.add_node("D", item, d, d.name_str, openable=True)
         self.setup_item(d.treeroot, active=True)
         
         lstr = d.treeroot + ".E"
-        self.tree.hlist.add(lstr, itemtype=Tix.TEXT, text="Entities")
-        self.tree.setmode(lstr, "none")
-        self.tree.close(lstr)
-        self.tree.hlist.hide_entry(lstr)
-        self.treedata[lstr] = IPMITreeDummyItem(lstr)
+        self.add_node(item, lstr, IPMITreeDummyItem(lstr), "Entities")
         self.setup_item(lstr, active=True)
         
         lstr = d.treeroot + ".M"
-        self.tree.hlist.add(lstr, itemtype=Tix.TEXT, text="MCs")
-        self.tree.setmode(lstr, "none")
-        self.tree.close(lstr)
-        self.tree.hlist.hide_entry(lstr)
-        self.treedata[lstr] = IPMITreeDummyItem(lstr)
+        self.add_node(item, lstr, IPMITreeDummyItem(lstr), "MCs")
         self.setup_item(lstr, active=True)
         
         lstr = d.treeroot + ".C"
-        self.tree.hlist.add(lstr, itemtype=Tix.TEXT, text="Connections")
-        self.tree.setmode(lstr, "none")
-        self.tree.close(lstr)
-        self.tree.hlist.hide_entry(lstr)
-        self.treedata[lstr] = IPMITreeDummyItem(lstr)
+        self.add_node(item, lstr, IPMITreeDummyItem(lstr), "Connections")
         self.setup_item(lstr, active=True)
         
         return
 
-    def item_sethide(self, parent, item):
-        mode = self.tree.getmode(parent)
-        if (mode == "open"):
-            self.tree.hlist.hide_entry(item)
-        elif (mode == "close"):
-            pass
-        else:
-            self.tree.setmode(parent, "open")
-            self.tree.hlist.hide_entry(item)
-            pass
-        return
-
-    def prepend_item(self, o, name, value, data=None):
-        if (self.in_destroy):
-            return
-        item = o.treeroot + '.' + str(self.itemval)
+    def add_info_item(self, parent, name, value, data, at_start):
+        item = parent + '.' + str(self.itemval)
         if (data == None):
             data = IPMITreeDummyItem(item)
             pass
         data.name_str = name
         self.itemval += 1
-        self.tree.hlist.add(item, itemtype=Tix.TEXT, text=name + ":", at=0)
-        mode = self.tree.getmode(o.treeroot)
-        self.item_sethide(o.treeroot, item)
         if (value == None):
-            self.tree.hlist.item_create(item, 1, itemtype=Tix.TEXT, text="",
-                                        style=self.active_style)
-            self.tree.hlist.item_configure(item, 0, style=self.inactive_style)
+            self.add_node(parent, item, data, name + ":",
+                          style=self.inactive_style, at_start=at_start)
         else:
-            self.tree.hlist.item_create(item, 1, itemtype=Tix.TEXT, text=value,
-                                        style=self.active_style)
-            self.tree.hlist.item_configure(item, 0, style=self.active_style)
+            self.add_node(parent, item, data, name + ":", value=value,
+                          at_start=at_start)
             pass
-        self.treedata[item] = data
+        self.sched_add(item, data)
         return item
 
+    def prepend_item(self, o, name, value, data=None):
+        if (self.in_destroy):
+            return
+        return self.add_info_item(o.treeroot, name, value, data, True)
+
     def append_item(self, o, name, value, data=None, parent=None):
         if (self.in_destroy):
             return
         if (parent == None):
             parent = o.treeroot
             pass
-        item = parent + '.' + str(self.itemval)
-        if (data == None):
-            data = IPMITreeDummyItem(item)
-            pass
-        data.name_str = name
-        self.itemval += 1
-        self.tree.hlist.add(item, itemtype=Tix.TEXT, text=name + ":")
-        mode = self.tree.getmode(parent)
-        if (mode == "open"):
-            self.tree.hlist.hide_entry(item)
-        elif (mode == "close"):
-            pass
-        else:
-            self.tree.setmode(parent, "open")
-            self.tree.hlist.hide_entry(item)
-            pass
-        if (value == None):
-            self.tree.hlist.item_create(item, 1, itemtype=Tix.TEXT, text="",
-                                        style=self.active_style)
-            self.tree.hlist.item_configure(item, 0, style=self.inactive_style)
-        else:
-            self.tree.hlist.item_create(item, 1, itemtype=Tix.TEXT, text=value,
-                                        style=self.active_style)
-            self.tree.hlist.item_configure(item, 0, style=self.active_style)
-            pass
-        self.treedata[item] = data
-        return item
+        return self.add_info_item(parent, name, value, data, False)
 
     def set_item_text(self, item, value):
         if (self.in_destroy):
             return
-        data = self.treedata[item]
+        # The item may have gone with its domain or entity
+        data = self.treedata.get(item)
+        if (data == None):
+            return
         data.itemvalue = value
         if (hasattr(data, "impt_data") and (data.impt_data != None)):
-            self.set_impt_data_text(data)
+            self.dirty_impt.add(data)
+            self.queue_flush()
             pass
         if (value == None):
-            self.tree.hlist.item_configure(item, 1, text="")
-            self.tree.hlist.item_configure(item, 0, style=self.inactive_style)
+            self.set_item_value(item, "")
+            self.set_item_style(item, self.inactive_style)
             pass
         else:
-            self.tree.hlist.item_configure(item, 1, text=value)
+            self.set_item_value(item, value)
             if (hasattr(data, "active")):
                 if (data.active):
                     self.set_item_color(item)
                     pass
                 pass
             else:
-                self.tree.hlist.item_configure(item, 0, style=self.active_style)
+                self.set_item_style(item, self.active_style)
                 pass
             pass
         return
@@ -669,27 +965,31 @@ class IPMIGUI(Tix.Frame):
     def set_item_inactive(self, item):
         if (self.in_destroy):
             return
-        data = self.treedata[item]
+        data = self.treedata.get(item)
+        if (data == None):
+            return
         data.active = False
         if (hasattr(data, "impt_data") and (data.impt_data != None)):
             self.set_impt_active_change(data)
             pass
-        self.tree.hlist.item_configure(item, 0, style=self.inactive_style)
+        self.set_item_style(item, self.inactive_style)
         return
 
     def set_item_active(self, item):
         if (self.in_destroy):
             return
-        data = self.treedata[item]
+        data = self.treedata.get(item)
+        if (data == None):
+            return
         data.active = True
         self.set_item_color(item)
         return
 
     def parent_item(self, item):
-        idx = item.rfind(".")
-        if (idx == -1):
+        node = self.nodes.get(item)
+        if (node == None):
             return None
-        return item[0:idx]
+        return node.parent
         
     def set_item_color(self, item):
         data = self.treedata[item]
@@ -705,161 +1005,168 @@ class IPMIGUI(Tix.Frame):
         if (hasattr(data, "impt_data") and (data.impt_data != None)):
             self.set_impt_style(data, style)
             pass
-        self.tree.hlist.item_configure(item, 0, style=style)
+        self.set_item_style(item, style)
         return
         
     def incr_item_warning(self, item):
         if (self.in_destroy):
             return
-        data = self.treedata[item]
-        if (data == None):
-            return
-        parent = self.parent_item(item)
-        if (parent != None):
-           self.incr_item_warning(parent); 
-           pass
-        data.num_warning = data.num_warning + 1
-        if (not data.active):
-            return
-        if (data.num_critical > 0):
-            return
-        if (data.num_severe > 0):
-            return
-        if (data.num_warning == 1):
-            self.tree.hlist.item_configure(item, 0, style=self.warn_style)
-            pass
+        self.adjust_count(item, 0, 1)
         return
         
     def decr_item_warning(self, item):
         if (self.in_destroy):
             return
-        data = self.treedata[item]
-        if (data == None):
-            return
-        parent = self.parent_item(item)
-        if (parent != None):
-           self.decr_item_warning(parent); 
-           pass
-        data.num_warning = data.num_warning - 1
-        if (not data.active):
-            return
-        if (data.num_critical > 0):
-            return
-        if (data.num_severe > 0):
-            return
-        if (data.num_warning > 0):
-            return
-        self.tree.hlist.item_configure(item, 0, style=self.active_style)
+        self.adjust_count(item, 0, -1)
         return
         
     def incr_item_severe(self, item):
         if (self.in_destroy):
             return
-        data = self.treedata[item]
-        if (data == None):
-            return
-        parent = self.parent_item(item)
-        if (parent != None):
-           self.incr_item_severe(parent); 
-           pass
-        data.num_severe = data.num_severe + 1
-        if (not data.active):
-            return
-        if (data.num_critical > 0):
-            return
-        if (data.num_severe == 1):
-            self.tree.hlist.item_configure(item, 0, style=self.severe_style)
-            pass
+        self.adjust_count(item, 1, 1)
         return
         
     def decr_item_severe(self, item):
         if (self.in_destroy):
             return
-        data = self.treedata[item]
-        if (data == None):
-            return
-        parent = self.parent_item(item)
-        if (parent != None):
-           self.decr_item_severe(parent); 
-           pass
-        data.num_severe = data.num_severe - 1
-        if (not data.active):
-            return
-        if (data.num_critical > 0):
-            return
-        if (data.num_severe > 0):
-            return
-        if (data.num_warning > 0):
-            self.tree.hlist.item_configure(item, 0, style=self.warn_style)
-            return
-        self.tree.hlist.item_configure(item, 0, style=self.active_style)
+        self.adjust_count(item, 1, -1)
         return
         
     def incr_item_critical(self, item):
         if (self.in_destroy):
             return
-        data = self.treedata[item]
-        if (data == None):
-            return
-        parent = self.parent_item(item)
-        if (parent != None):
-           self.incr_item_critical(parent); 
-           pass
-        data.num_critical = data.num_critical + 1
-        if (not data.active):
-            return
-        if (data.num_critical == 1):
-            self.tree.hlist.item_configure(item, 0, style=self.critical_style)
-            pass
+        self.adjust_count(item, 2, 1)
         return
         
     def decr_item_critical(self, item):
         if (self.in_destroy):
             return
-        data = self.treedata[item]
+        self.adjust_count(item, 2, -1)
+        return
+
+    # Tree updates are queued and sent to Tk at most init_update_rate
+    # times a second, so many updates to an item cost one widget
+    # change.  A severity change is applied to its item right away,
+    # but only passed up to the parents when the queue is flushed, so
+    # each ancestor is counted and restyled once per flush however
+    # many of its children changed.
+    def queue_flush(self):
+        if (self.flush_id == None):
+            self.flush_id = self.top.after(self.flush_time_ms,
+                                           self.FlushUpdates)
+            pass
+        return
+
+    def mark_dirty(self, item):
+        self.dirty.add(item)
+        self.queue_flush()
+        return
+
+    def adjust_count(self, item, which, delta):
+        data = self.treedata.get(item)
         if (data == None):
             return
+        counts = [ 0, 0, 0 ]
+        counts[which] = delta
+        self.add_counts(item, data, counts)
+        self.queue_flush()
+        return
+
+    def add_counts(self, item, data, counts):
+        data.num_warning += counts[0]
+        data.num_severe += counts[1]
+        data.num_critical += counts[2]
+        self.recolor.add(item)
         parent = self.parent_item(item)
         if (parent != None):
-           self.decr_item_critical(parent); 
-           pass
-        data.num_critical = data.num_critical - 1
-        if (not data.active):
-            return
-        if (data.num_critical > 0):
-            return
-        if (data.num_severe > 0):
-            self.tree.hlist.item_configure(item, 0, style=self.severe_style)
-            return
-        if (data.num_warning > 0):
-            self.tree.hlist.item_configure(item, 0, style=self.warn_style)
+            depth = self.item_depth(parent)
+            if (depth not in self.pending_counts):
+                self.pending_counts[depth] = { }
+                pass
+            pending = self.pending_counts[depth]
+            if (parent in pending):
+                p = pending[parent]
+                p[0] += counts[0]
+                p[1] += counts[1]
+                p[2] += counts[2]
+            else:
+                pending[parent] = list(counts)
+                pass
+            pass
+        return
+
+    def item_depth(self, item):
+        # Keys don't follow the tree once an entity has been moved, so
+        # walk the parents.
+        depth = 0
+        node = self.nodes.get(item)
+        while (node != None) and (node.parent != None):
+            depth += 1
+            node = self.nodes.get(node.parent)
+            pass
+        return depth
+
+    def propagate_counts(self):
+        # Deepest first, so a parent has everything from below before
+        # it passes it on.
+        while (len(self.pending_counts) > 0):
+            depth = max(self.pending_counts.keys())
+            pending = self.pending_counts.pop(depth)
+            for (item, counts) in pending.items():
+                data = self.treedata.get(item)
+                if (data != None):
+                    self.add_counts(item, data, counts)
+                    pass
+                pass
+            pass
+        return
+
+    def FlushUpdates(self):
+        self.flush_id = None
+        if (self.in_destroy):
             return
-        self.tree.hlist.item_configure(item, 0, style=self.active_style)
+        self.propagate_counts()
+        recolor = self.recolor
+        self.recolor = set()
+        for item in recolor:
+            data = self.treedata.get(item)
+            if (data != None) and (data.active):
+                self.set_item_color(item)
+                pass
+            pass
+        dirty = self.dirty
+        self.dirty = set()
+        for item in dirty:
+            node = self.nodes.get(item)
+            if (node != None) and (node.shown):
+                self.tree.hlist.item_configure(node.path, 0, style=node.style)
+                self.tree.hlist.item_configure(node.path, 1, text=node.value)
+                pass
+            pass
+        dirty = self.dirty_impt
+        self.dirty_impt = set()
+        for data in dirty:
+            if (data.impt_data != None):
+                self.set_impt_data_text(data)
+                pass
+            pass
         return
-        
+
     def TreeMenu(self, event):
         w = event.widget
-        item = w.nearest(event.y)
-        data = self.treedata[item]
+        item = self.paths.get(w.nearest(event.y))
+        data = self.treedata.get(item)
         if (data != None) and (hasattr(data, "HandleMenu")):
             data.HandleMenu(event)
             pass
         return
 
-    def TreeExpanded(self, event):
-        item = event.GetItem()
-        data = self.tree.GetPyData(item)
-        if (data != None) and (hasattr(data, "HandleExpand")):
-            data.HandleExpand(event)
-            pass
-        return
-
     def remove_domain(self, d):
         if (self.in_destroy):
             return
         if (hasattr(d, "treeroot")):
             self.cleanup_item(d.treeroot)
-            self.tree.hlist.delete_entry(d.treeroot)
+            self.delete_tree_item(d.treeroot)
             pass
         return
 
@@ -871,11 +1178,7 @@ class IPMIGUI(Tix.Frame):
         self.itemval += 1
         c.treeroot = item
         c.name_str = str(c)
-        self.tree.hlist.add(item, itemtype=Tix.TEXT, text=c.name_str)
-        self.tree.setmode(item, "none")
-        self.tree.close(item)
-        self.item_sethide(parent, item)
-        self.treedata[item] = c
+        self.add_node(parent, item, c, c.name_str)
         self.setup_item(item, active=True)
         return
         
@@ -886,11 +1189,7 @@ class IPMIGUI(Tix.Frame):
         self.itemval += 1
         p.treeroot = item
         p.name_str = str(p)
-        self.tree.hlist.add(item, itemtype=Tix.TEXT, text=p.name_str)
-        self.tree.setmode(item, "none")
-        self.tree.close(item)
-        self.item_sethide(c.treeroot, item)
-        self.treedata[item] = p
+        self.add_node(c.treeroot, item, p, p.name_str)
         self.setup_item(item, active=True)
         return
         
@@ -899,8 +1198,7 @@ class IPMIGUI(Tix.Frame):
             return
         if (hasattr(p, "treeroot")):
             self.cleanup_item(p.treeroot)
-            self.tree.hlist.delete_entry(p.treeroot)
-            del self.treedata[p.treeroot]
+            self.delete_tree_item(p.treeroot)
             pass
         return
 
@@ -917,34 +1215,27 @@ class IPMIGUI(Tix.Frame):
         item = parent + '.' + str(self.itemval)
         self.itemval += 1
         e.treeroot = item
-        self.tree.hlist.add(item, itemtype=Tix.TEXT, text=e.name_str)
-        self.tree.setmode(item, "open")
-        self.tree.close(item)
-        self.item_sethide(parent, item)
-        self.treedata[item] = e
+        self.add_node(parent, item, e, e.name_str, openable=True)
         self.setup_item(item, type="entity")
 
         lstr = item + ".S"
-        self.tree.hlist.add(lstr, itemtype=Tix.TEXT, text="Sensors")
-        self.tree.setmode(lstr, "none")
-        self.tree.close(lstr)
-        self.tree.hlist.hide_entry(lstr)
-        self.treedata[lstr] = IPMITreeDummyItem(lstr)
+        self.add_node(item, lstr, IPMITreeDummyItem(lstr), "Sensors")
         self.setup_item(lstr, active=True)
 
         lstr = item + ".C"
-        self.tree.hlist.add(lstr, itemtype=Tix.TEXT, text="Controls")
-        self.tree.setmode(lstr, "none")
-        self.tree.close(lstr)
-        self.tree.hlist.hide_entry(lstr)
-        self.treedata[lstr] = IPMITreeDummyItem(lstr)
+        self.add_node(item, lstr, IPMITreeDummyItem(lstr), "Controls")
         self.setup_item(lstr, active=True)
         return
 
     def reparent_entity(self, d, e, parent):
         if (self.in_destroy):
             return
-        self.add_entity(d, e, parent)
+        if (parent == None):
+            parent = d.treeroot + ".E"
+        else:
+            parent = parent.treeroot
+            pass
+        self.move_subtree(e.treeroot, parent)
         return
     
     def remove_entity(self, e):
@@ -952,8 +1243,7 @@ class IPMIGUI(Tix.Frame):
             return
         if (hasattr(e, "treeroot")):
             self.cleanup_item(e.treeroot)
-            self.tree.hlist.delete_entry(e.treeroot)
-            del self.treedata[e.treeroot]
+            self.delete_tree_item(e.treeroot)
             pass
         return
 
@@ -965,11 +1255,7 @@ class IPMIGUI(Tix.Frame):
         item = parent + "." + str(self.itemval)
         self.itemval += 1
         m.treeroot = item
-        self.tree.hlist.add(item, itemtype=Tix.TEXT, text=m.name_str)
-        self.tree.setmode(item, "none")
-        self.tree.close(item)
-        self.item_sethide(parent, item)
-        self.treedata[item] = m
+        self.add_node(parent, item, m, m.name_str)
         self.setup_item(item)
         return
 
@@ -978,8 +1264,7 @@ class IPMIGUI(Tix.Frame):
             return
         if (hasattr(m, "treeroot")):
             self.cleanup_item(m.treeroot)
-            self.tree.hlist.delete_entry(m.treeroot)
-            del self.treedata[m.treeroot]
+            self.delete_tree_item(m.treeroot)
             pass
         return
 
@@ -991,12 +1276,11 @@ class IPMIGUI(Tix.Frame):
         item = parent + "." + str(self.itemval)
         self.itemval += 1
         s.treeroot = item
-        self.tree.hlist.add(item, itemtype=Tix.TEXT, text=s.name_str)
-        self.tree.setmode(item, "none")
-        self.tree.close(item)
-        self.item_sethide(parent, item)
-        self.treedata[item] = s
+        # The sensor's detail rows are added when it is first opened,
+        # so it has to look openable without any children.
+        self.add_node(parent, item, s, s.name_str, openable=True)
         self.setup_item(item, active=True, type="sensor")
+        self.sched_add(item, s)
         return
 
     def remove_sensor(self, s):
@@ -1004,8 +1288,7 @@ class IPMIGUI(Tix.Frame):
             return
         if (hasattr(s, "treeroot")):
             self.cleanup_item(s.treeroot)
-            self.tree.hlist.delete_entry(s.treeroot)
-            del self.treedata[s.treeroot]
+            self.delete_tree_item(s.treeroot)
             pass
         return
 
@@ -1017,12 +1300,9 @@ class IPMIGUI(Tix.Frame):
         item =  parent + "." + str(self.itemval)
         self.itemval += 1
         c.treeroot = item
-        self.tree.hlist.add(item, itemtype=Tix.TEXT, text=c.name_str)
-        self.tree.setmode(item, "none")
-        self.tree.close(item)
-        self.item_sethide(parent, item)
-        self.treedata[item] = c
+        self.add_node(parent, item, c, c.name_str)
         self.setup_item(item, active=True, type="control")
+        self.sched_add(item, c)
         return
 
     def remove_control(self, c):
@@ -1030,8 +1310,7 @@ class IPMIGUI(Tix.Frame):
             return
         if (hasattr(c, "treeroot")):
             self.cleanup_item(c.treeroot)
-            self.tree.hlist.delete_entry(c.treeroot)
-            del self.treedata[c.treeroot]
+            self.delete_tree_item(c.treeroot)
             pass
         return
 
@@ -1051,6 +1330,8 @@ class IPMIGUI(Tix.Frame):
         #elem.setAttribute("treenamewidth", str(self.tree.GetColumnWidth(0)))
         elem.setAttribute("logevents", str(self.logevents))
         elem.setAttribute("fullevents", str(self.fulleventsv != 0))
+        elem.setAttribute("pollmintime", str(self.poll_min_time))
+        elem.setAttribute("pollmaxtime", str(self.poll_max_time))
         for i in list(self.impt_objs.values()):
             for j in list(i.values()):
                 o = doc.createElement("watch")
@@ -1095,6 +1376,8 @@ class _GUIRestore(_saveprefs.RestoreHandler):
         global init_fullevents
         global init_logevents
         global init_impt_objs
+        global init_poll_min_time
+        global init_poll_max_time
         
         for i in range(0, node.attributes.length):
             attr = node.attributes.item(i)
@@ -1114,6 +1397,10 @@ class _GUIRestore(_saveprefs.RestoreHandler):
                 init_logevents = GetAttrBool(attr, init_logevents)
             elif (attr.nodeName == "fullevents"):
                 init_fullevents = GetAttrBool(attr, init_fullevents)
+            elif (attr.nodeName == "pollmintime"):
+                init_poll_min_time = GetAttrInt(attr, init_poll_min_time)
+            elif (attr.nodeName == "pollmaxtime"):
+                init_poll_max_time = GetAttrInt(attr, init_poll_max_time)
                 pass
             pass
         for i in node.childNodes:
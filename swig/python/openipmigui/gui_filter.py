@@ -0,0 +1,107 @@
+# gui_filter.py
+#
+# A window showing the objects matching the filter bar
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+
+try:
+    import Tix
+except:
+    import tkinter
+    from tkinter import tix as Tix
+from openipmigui import gui_list
+from openipmigui import gui_popup
+
+# Don't fill the list with a whole fleet
+max_results = 1000
+
+class FilterItem:
+    def __init__(self, ui, obj):
+        self.ui = ui
+        self.obj = obj
+        return
+
+    def HandleMenu(self, event, key, point):
+        gui_popup.popup(self.ui, event, [ ("Show in tree", self.Show) ],
+                        point)
+        return
+
+    def Show(self, event):
+        if (hasattr(self.obj, "treeroot")):
+            self.ui.ShowItem(self.obj.treeroot)
+            pass
+        return
+
+    pass
+
+class FilterResults(gui_list.List):
+    def __init__(self, ui):
+        self.ui = ui
+        gui_list.List.__init__(self, "Filter Results",
+                               [ ("Kind", 80), ("Name", 250), ("Type", 150),
+                                 ("State", 100) ])
+        return
+
+    def Fill(self, text, objs):
+        self.title("Filter Results: " + text)
+        self.DeleteAllItems()
+        index = self.ui.index
+        rows = [ ]
+        for obj in objs:
+            rows.append((index.get(obj, "kind"), index.get(obj, "name"), obj))
+            pass
+        rows.sort(key=lambda r: (str(r[0]), str(r[1])))
+        for (kind, name, obj) in rows[0:max_results]:
+            state = index.get(obj, "severity")
+            units = index.get(obj, "units")
+            if (state == None):
+                state = units
+            elif (units != None):
+                state = state + " (" + units + ")"
+                pass
+            self.Append(kind, [ name, index.get(obj, "type"), state ],
+                        FilterItem(self.ui, obj))
+            pass
+        if (len(rows) > max_results):
+            self.SetError("Showing " + str(max_results) + " of "
+                          + str(len(rows)) + " matches")
+        else:
+            self.SetError(str(len(rows)) + " matches")
+            pass
+        return
+
+    def cancel(self):
+        self.Close()
+        return
+
+    def do_on_close(self):
+        self.ui.filterlist = None
+        return
+
+    pass
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+
+# openipmipoller.py
+#
+# Headless OpenIPMI sensor poller
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+#
+# This runs the same domain/entity/MC/sensor model as openipmigui, but
+# with a view that keeps no display (openipmigui/_view.py).  Domains
+# are opened from the GUI's saved preferences file and the sensors are
+# polled through the same scheduler and request limiter the GUI uses.
+
+import os
+import sys
+import signal
+import time
+import OpenIPMI
+from openipmigui import _domain
+from openipmigui import _saveprefs
+from openipmigui import _view
+from openipmigui import _metrics
+from openipmigui import _selarchive
+
+shutdown = False
+
+def handle_shutdown(signum, frame):
+    global shutdown
+    shutdown = True
+    return
+
+class PollerHandler:
+    def __init__(self, preffile, log_file):
+        self.defaultDomains = [ ]
+        self.pref_taghash = { }
+        self.domains = { }
+        self.preffile = preffile
+        self.log_file = log_file
+        return
+
+    def domain_change_cb(self, op, domain):
+        if (op == "added"):
+            self.domains[domain.get_name()].connected(domain)
+        elif (op == "removed"):
+            self.domains[domain.get_name()].remove()
+            pass
+        return
+
+    def SetUI(self, ui):
+        self.ui = ui;
+        return
+
+    def log(self, level, log):
+        if (self.log_file != None):
+            self.log_file.write(level + ": " + log + "\n")
+            self.log_file.flush()
+            pass
+        return
+
+    def report(self, out):
+        # Dump the last value of every sensor
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        for d in list(self.domains.values()):
+            for e in list(d.entities.values()):
+                for s in list(e.sensors.values()):
+                    out.write(now + " " + s.name + ": "
+                              + str(s.itemvalue) + "\n")
+                    pass
+                pass
+            pass
+        out.flush()
+        return
+
+    pass
+
+class DomainCloser:
+    def __init__(self, count):
+        self.count = count
+        return
+
+    def domain_cb(self, domain):
+        domain.close(self)
+        return
+
+    def domain_close_done_cb(self):
+        self.count = self.count - 1
+        return
+
+    def wait_done(self):
+        while (self.count > 0):
+            OpenIPMI.wait_io(1000)
+            pass
+        return
+
+    pass
+
+def usage():
+    print("openipmipoller [options]")
+    print("  -p <file>           The preferences file to read domains from")
+    print("  --refresh <ms>      Default poll period")
+    print("  --info-refresh <ms> Poll period for non-sensor information")
+    print("  --pollmin <ms>      Minimum adaptive sensor poll period")
+    print("  --pollmax <ms>      Maximum adaptive sensor poll period")
+    print("  --report <secs>     Print all sensor values this often")
+    print("  --metrics-port <n>  Serve Prometheus metrics on this port")
+    print("  --metrics-addr <a>  Address for metrics, default 127.0.0.1")
+    print("  --sel-archive <f>   Archive the SELs to this SQLite file")
+    print("  --logstdout         Send logs to stdout instead of stderr")
+    print("  --dmsg, --drawmsg   Enable message debugging")
+    return
+
+def run(args):
+    preffile = os.path.join(os.environ['HOME'], '.openipmigui.startup')
+    log_file = sys.stderr
+    refresh_time = 10000
+    info_refresh_time = 600000
+    poll_min_time = 2000
+    poll_max_time = 60000
+    report_time = None
+    metrics_port = None
+    metrics_addr = "127.0.0.1"
+    sel_archive = None
+    debug_msg = False
+    debug_rawmsg = False
+
+    # Skip program name.
+    carg = 1
+
+    try:
+        while (carg < len(args)):
+            arg = args[carg]
+            carg += 1
+            if (arg == "--dmsg"):
+                debug_msg = True
+            elif (arg == "--drawmsg"):
+                debug_rawmsg = True
+            elif (arg == "--logstdout"):
+                log_file = sys.stdout
+            elif (arg == '-p'):
+                preffile = args[carg]
+                carg += 1
+            elif (arg == '--refresh'):
+                refresh_time = int(args[carg])
+                carg += 1
+            elif (arg == '--info-refresh'):
+                info_refresh_time = int(args[carg])
+                carg += 1
+            elif (arg == '--pollmin'):
+                poll_min_time = int(args[carg])
+                carg += 1
+            elif (arg == '--pollmax'):
+                poll_max_time = int(args[carg])
+                carg += 1
+            elif (arg == '--report'):
+                report_time = float(args[carg])
+                carg += 1
+            elif (arg == '--metrics-port'):
+                metrics_port = int(args[carg])
+                carg += 1
+            elif (arg == '--metrics-addr'):
+                metrics_addr = args[carg]
+                carg += 1
+            elif (arg == '--sel-archive'):
+                sel_archive = args[carg]
+                carg += 1
+            else:
+                print("Unknown argument: " + arg)
+                usage()
+                return 1
+            pass
+        pass
+    except IndexError:
+        print("No value given for " + arg)
+        usage()
+        return 1
+    except ValueError:
+        print("Invalid value given for " + arg)
+        usage()
+        return 1
+
+    rv = OpenIPMI.init()
+    if (rv != 0):
+        print("Unable to initialize OpenIPMI")
+        return 1
+
+    if (debug_rawmsg):
+        OpenIPMI.enable_debug_rawmsg()
+        pass
+    if (debug_msg):
+        OpenIPMI.enable_debug_msg()
+        pass
+
+    mainhandler = PollerHandler(preffile, log_file)
+    _domain._DomainRestore(mainhandler)
+    _saveprefs.restore(mainhandler, preffile)
+    if (len(mainhandler.defaultDomains) == 0):
+        print("No domains found in " + preffile)
+        return 1
+
+    ui = _view.View(mainhandler,
+                    refresh_time=refresh_time / 1000.0,
+                    info_refresh_time=info_refresh_time / 1000.0,
+                    poll_min_time=poll_min_time,
+                    poll_max_time=poll_max_time)
+    mainhandler.SetUI(ui)
+
+    if (sel_archive != None):
+        ui.selarchive = _selarchive.open_archive(sel_archive)
+        if (ui.selarchive == None):
+            return 1
+        pass
+
+    metrics_server = None
+    if (metrics_port != None):
+        metrics_server = _metrics.start_server(ui.metrics, metrics_port,
+                                               metrics_addr)
+        if (metrics_server == None):
+            return 1
+        pass
+
+    OpenIPMI.add_domain_change_handler(_domain.DomainWatcher(mainhandler))
+    OpenIPMI.add_domain_change_handler(mainhandler)
+    OpenIPMI.set_log_handler(mainhandler)
+
+    _domain.RestoreDomains(mainhandler)
+
+    signal.signal(signal.SIGINT, handle_shutdown)
+    signal.signal(signal.SIGTERM, handle_shutdown)
+
+    next_report = None
+    if (report_time != None):
+        next_report = time.time() + report_time
+        pass
+    while (not shutdown):
+        delay = ui.run()
+        if (next_report != None):
+            now = time.time()
+            if (now >= next_report):
+                mainhandler.report(sys.stdout)
+                next_report = now + report_time
+                pass
+            if (next_report - now < delay):
+                delay = next_report - now
+                pass
+            pass
+        # Wake up at least once a second to notice shutdown requests
+        if (delay > 1.0):
+            delay = 1.0
+            pass
+        OpenIPMI.wait_io(int(delay * 1000))
+        pass
+
+    ui.in_destroy = True
+    closer = DomainCloser(len(mainhandler.domains))
+    for d in list(mainhandler.domains.values()):
+        d.domain_id.to_domain(closer)
+        pass
+    closer.wait_done()
+    if (metrics_server != None):
+        metrics_server.shutdown()
+        pass
+    if (ui.selarchive != None):
+        ui.selarchive.close()
+        pass
+    OpenIPMI.shutdown_everything()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv))
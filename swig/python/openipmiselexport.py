@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+
+# openipmiselexport.py
+#
+# Export the SELs of OpenIPMI domains to JSON lines or CSV
+#
+# Author: MontaVista Software, Inc.
+#         Corey Minyard <minyard@mvista.com>
+#         source@mvista.com
+#
+# Copyright 2026 MontaVista Software Inc.
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License
+#  as published by the Free Software Foundation; either version 2 of
+#  the License, or (at your option) any later version.
+#
+#
+#  THIS SOFTWARE IS PROVIDED ``AS IS'' AND ANY EXPRESS OR IMPLIED
+#  WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF
+#  MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+#  IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT, INDIRECT,
+#  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+#  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS
+#  OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+#  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+#  TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+#  USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this program; if not, write to the Free
+#  Software Foundation, Inc., 675 Mass Ave, Cambridge, MA 02139, USA.
+#
+#
+# The domains are read from the GUI's saved preferences file and all
+# opened at once.  Each domain's SELs are written out as soon as the
+# domain is fully up, one event at a time, then the domain is closed.
+
+import os
+import sys
+import time
+import OpenIPMI
+from openipmigui import _domain
+from openipmigui import _saveprefs
+from openipmigui import _selexport
+from openipmigui import _selstream
+from openipmigui import _misc
+from openipmigui import _index
+
+class ExportHandler:
+    def __init__(self, log_file):
+        self.defaultDomains = [ ]
+        self.pref_taghash = { }
+        self.log_file = log_file
+        return
+
+    def log(self, level, log):
+        self.log_file.write(level + ": " + log + "\n")
+        self.log_file.flush()
+        return
+
+    pass
+
+class Output:
+    """Where the rows go, either one stream for all the domains or a
+    file per domain in a directory."""
+    def __init__(self, format, outfile, outdir):
+        self.format = format
+        self.outdir = outdir
+        self.f = None
+        self.w = None
+        if (outdir == None):
+            if (outfile == None):
+                self.f = sys.stdout
+            else:
+                self.f = open(outfile, "w")
+                pass
+            self.w = _selexport.writer(self.f, format)
+            pass
+        return
+
+    def export(self, domain, flt):
+        if (self.outdir == None):
+            return _selexport.export_domain(domain, self.w, flt)
+        filename = os.path.join(self.outdir,
+                                domain.get_name() + "." + self.format)
+        f = open(filename, "w")
+        try:
+            return _selexport.export_domain(domain,
+                                            _selexport.writer(f, self.format),
+                                            flt)
+        finally:
+            f.close()
+            pass
+        return
+
+    def close(self):
+        if ((self.f != None) and (self.f != sys.stdout)):
+            self.f.close()
+            pass
+        return
+
+    pass
+
+class DomainExport:
+    def __init__(self, name, output, flt, log_file):
+        self.name = name
+        self.output = output
+        self.flt = flt
+        self.log_file = log_file
+        self.domain_id = None
+        self.closing = False
+        self.done = False
+        self.err = False
+        return
+
+    def conn_change_cb(self, domain, err, connum, portnum, anything_connected):
+        if (err):
+            self.log_file.write(self.name + ": connection error ("
+                                + str(connum) + "," + str(portnum) + "): "
+                                + OpenIPMI.get_error_string(err) + "\n")
+            pass
+        return
+
+    def domain_up_cb(self, domain):
+        try:
+            count = self.output.export(domain, self.flt)
+            self.log_file.write(self.name + ": exported " + str(count)
+                                + " events\n")
+        except EnvironmentError as e:
+            self.log_file.write(self.name + ": " + str(e) + "\n")
+            self.err = True
+            pass
+        self.close(domain)
+        return
+
+    def domain_cb(self, domain):
+        self.close(domain)
+        return
+
+    def close(self, domain):
+        if (not self.closing):
+            self.closing = True
+            domain.close(self)
+            pass
+        return
+
+    def domain_close_done_cb(self):
+        self.done = True
+        return
+
+    pass
+
+def usage():
+    print("openipmiselexport [options]")
+    print("  -p <file>           The preferences file to read domains from")
+    print("  -d <name>           Only export this domain, may be repeated")
+    print("  -o <file>           Write all the domains to this file, default")
+    print("                      is standard output")
+    print("  --dir <dir>         Write each domain to <dir>/<domain>.<format>")
+    print("  -f <format>         Output format, jsonl (default) or csv")
+    print("  --mc <chan>.<addr>  Only events from this MC (hex), may be repeated")
+    print("  --type <n>          Only events of this record type, may be repeated")
+    print("  --sensor <pattern>  Only events from matching sensors, may be repeated")
+    print("  --severity <s>      Only events of at least this severity: "
+          + ", ".join(_index.severity_names))
+    print("  --start <time>      Only events at or after this time")
+    print("  --end <time>        Only events at or before this time")
+    print("  --timeout <secs>    Give up on domains not up by then, default 120")
+    print("  --dmsg, --drawmsg   Enable message debugging")
+    return
+
+def parse_mc(text):
+    (chan, addr) = text.split(".")
+    return (int(chan, 16), int(addr, 16))
+
+def run(args):
+    preffile = os.path.join(os.environ['HOME'], '.openipmigui.startup')
+    log_file = sys.stderr
+    names = None
+    outfile = None
+    outdir = None
+    format = None
+    mcs = None
+    types = None
+    sensors = None
+    severity = None
+    start = None
+    end = None
+    timeout = 120.0
+    debug_msg = False
+    debug_rawmsg = False
+
+    # Skip program name.
+    carg = 1
+
+    try:
+        while (carg < len(args)):
+            arg = args[carg]
+            carg += 1
+            if (arg == "--dmsg"):
+                debug_msg = True
+            elif (arg == "--drawmsg"):
+                debug_rawmsg = True
+            elif (arg == '-p'):
+                preffile = args[carg]
+                carg += 1
+            elif (arg == '-d'):
+                if (names == None):
+                    names = [ ]
+                    pass
+                names.append(args[carg])
+                carg += 1
+            elif (arg == '-o'):
+                outfile = args[carg]
+                carg += 1
+            elif (arg == '--dir'):
+                outdir = args[carg]
+                carg += 1
+            elif (arg == '-f'):
+                format = args[carg]
+                carg += 1
+                if (format not in _selexport.formats):
+                    raise ValueError()
+            elif (arg == '--mc'):
+                if (mcs == None):
+                    mcs = [ ]
+                    pass
+                mcs.append(parse_mc(args[carg]))
+                carg += 1
+            elif (arg == '--type'):
+                if (types == None):
+                    types = [ ]
+                    pass
+                types.append(int(args[carg], 0))
+                carg += 1
+            elif (arg == '--sensor'):
+                if (sensors == None):
+                    sensors = [ ]
+                    pass
+                sensors.append(args[carg])
+                carg += 1
+            elif (arg == '--severity'):
+                severity = args[carg]
+                carg += 1
+                if (severity not in _index.severity_names):
+                    raise ValueError()
+            elif (arg == '--start'):
+                start = _misc.parse_time(args[carg])
+                carg += 1
+            elif (arg == '--end'):
+                end = _misc.parse_time(args[carg])
+                carg += 1
+            elif (arg == '--timeout'):
+                timeout = float(args[carg])
+                carg += 1
+            else:
+                print("Unknown argument: " + arg)
+                usage()
+                return 1
+            pass
+        pass
+    except IndexError:
+        print("No value given for " + arg)
+        usage()
+        return 1
+    except ValueError:
+        print("Invalid value given for " + arg)
+        usage()
+        return 1
+
+    if ((outfile != None) and (outdir != None)):
+        print("Only one of -o and --dir may be given")
+        return 1
+    if (format == None):
+        if (outfile != None):
+            format = _selexport.format_for_file(outfile)
+        else:
+            format = "jsonl"
+            pass
+        pass
+
+    flt = _selstream.SELFilter(mc_keys=mcs, sensors=sensors, types=types,
+                               start=start, end=end, severity=severity)
+
+    rv = OpenIPMI.init()
+    if (rv != 0):
+        print("Unable to initialize OpenIPMI")
+        return 1
+
+    if (debug_rawmsg):
+        OpenIPMI.enable_debug_rawmsg()
+        pass
+    if (debug_msg):
+        OpenIPMI.enable_debug_msg()
+        pass
+
+    mainhandler = ExportHandler(log_file)
+    _domain._DomainRestore(mainhandler)
+    _saveprefs.restore(mainhandler, preffile)
+    domains = [ d for d in mainhandler.defaultDomains
+                if ((names == None) or (d[0] in names)) ]
+    if (len(domains) == 0):
+        print("No domains found in " + preffile)
+        return 1
+
+    try:
+        output = Output(format, outfile, outdir)
+    except EnvironmentError as e:
+        print(str(e))
+        return 1
+
+    OpenIPMI.set_log_handler(mainhandler)
+
+    # Open them all at once, they come up in parallel and are each
+    # written out when they are ready.
+    exports = [ ]
+    for d in domains:
+        exp = DomainExport(d[0], output, flt, log_file)
+        exp.domain_id = OpenIPMI.open_domain3(d[0], [],
+                                              _domain.ConnectionArgs(d[1]),
+                                              exp, exp)
+        if (exp.domain_id == None):
+            log_file.write(d[0] + ": unable to open domain\n")
+            exp.err = True
+            continue
+        exports.append(exp)
+        pass
+
+    timed_out = False
+    end_time = time.time() + timeout
+    while ([ e for e in exports if not e.done ]):
+        if ((not timed_out) and (time.time() >= end_time)):
+            timed_out = True
+            for e in exports:
+                if (not e.closing):
+                    log_file.write(e.name + ": not up in time, skipped\n")
+                    e.err = True
+                    if (e.domain_id.to_domain(e) != 0):
+                        e.done = True
+                        pass
+                    pass
+                pass
+            pass
+        OpenIPMI.wait_io(1000)
+        pass
+
+    output.close()
+    OpenIPMI.shutdown_everything()
+    if ([ e for e in exports if e.err ] or (len(exports) != len(domains))):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv))